@@ -1,85 +1,71 @@
 import sys
-from PySide6.QtCore import Qt, QRect, Property, QPropertyAnimation
-from PySide6.QtWidgets import QApplication, QPushButton, QGraphicsDropShadowEffect, QMainWindow
-from PySide6.QtGui import QColor, QPainter, QBrush, QPen, QFont
+from PySide6.QtCore import Qt, QSize, Property, QEasingCurve
+from PySide6.QtWidgets import QApplication, QPushButton, QMainWindow
+from PySide6.QtGui import QColor, QPainter, QPen, QFont, QPalette
+
+from animationTicker import shared_ticker
+from buttonRenderer import button_pixmap, shadow_margins
 
 
 class AnimatedButton(QPushButton):
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
         
-        self.setFixedSize(160, 60)
+        # 按鈕本體 160x60，四周保留陰影的邊界
+        self.setFixedSize(QSize(160, 60).grownBy(shadow_margins()))
         self.normal_color = QColor("#4ade80")  # 正常狀態的顏色
         self.hover_color = QColor("#67e8a9")   # 懸停狀態的顏色
         self.current_color = self.normal_color
+        self._scale_factor = 1.0  # 按鈕本體的縮放因子
 
         # 設置圓角按鈕
         self.setStyleSheet("border-radius: 20px; font-size: 14px; color: white;")
-        
-        # 添加陰影效果
-        self.shadow_effect = QGraphicsDropShadowEffect(self)
-        self.shadow_effect.setBlurRadius(20)
-        self.shadow_effect.setXOffset(5)
-        self.shadow_effect.setYOffset(5)
-        self.shadow_effect.setColor(QColor("#b0bec5"))
-        self.setGraphicsEffect(self.shadow_effect)
-        
-        # 設置動畫
-        self.color_animation = QPropertyAnimation(self, b"button_color")
-        self.color_animation.setDuration(200)
-        
-        self.scale_animation = QPropertyAnimation(self, b"geometry")
-        self.scale_animation.setDuration(100)
-  
+
+        # 顏色與縮放動畫由視窗共用的動畫時鐘推進（見 animationTicker），按鈕本身不持有計時器
+        self.color_duration = 200
+        self.scale_duration = 100
+
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)  # 開啟抗鋸齒
-        rect = self.rect()
+        face = self.rect().marginsRemoved(shadow_margins())
 
-        # 使用當前顏色繪製按鈕背景
-        painter.setBrush(QBrush(self.current_color))
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(rect, 20, 20)  # 設置圓角
+        # 貼上以當前顏色與縮放預先繪製的背景與陰影（快取在 QPixmapCache），再繪製文字
+        painter.drawPixmap(0, 0, button_pixmap(face.size(), self.current_color, self._scale_factor,
+                                               ratio=self.devicePixelRatioF()))
+        painter.setPen(self.palette().color(QPalette.ButtonText))
+        painter.setFont(self.font())
+        painter.drawText(face, Qt.AlignCenter, self.text())
+        painter.end()
 
-        super().paintEvent(event)
+    def animate_color(self, color):
+        # 從目前的顏色開始動畫，取代進行中的顏色動畫
+        shared_ticker(self).animate(self, "current_color", color, self.color_duration)
 
-    def enterEvent(self, event):
-        self.color_animation.setStartValue(self.current_color)
-        self.color_animation.setEndValue(self.hover_color)
-        self.color_animation.start()
+    def animate_scale(self, factor):
+        # 以縮放按鈕本體代替改變 geometry，按鈕的大小與位置不變，不會觸發重新排版
+        shared_ticker(self).animate(self, "_scale_factor", factor, self.scale_duration, QEasingCurve.OutBack)
 
-        # 放大動畫
-        self.scale_animation.setStartValue(self.geometry())
-        self.scale_animation.setEndValue(self.geometry().adjusted(-5, -5, 5, 5))  # 放大
-        self.scale_animation.start()
+    def enterEvent(self, event):
+        self.animate_color(self.hover_color)
+        self.animate_scale(1.05)  # 放大
 
         super().enterEvent(event)
 
     def leaveEvent(self, event):
-        self.color_animation.setStartValue(self.current_color)
-        self.color_animation.setEndValue(self.normal_color)
-        self.color_animation.start()
-
-        # 縮小動畫
-        self.scale_animation.setStartValue(self.geometry())
-        self.scale_animation.setEndValue(self.geometry().adjusted(5, 5, -5, -5))  # 恢復
-        self.scale_animation.start()
+        self.animate_color(self.normal_color)
+        self.animate_scale(1.0)  # 恢復
 
         super().leaveEvent(event)
 
     def mousePressEvent(self, event):
         # 點擊按鈕時的縮小動畫
-        self.scale_animation.setStartValue(self.geometry())
-        self.scale_animation.setEndValue(self.geometry().adjusted(5, 5, -5, -5))  # 按下時縮小
-        self.scale_animation.start()
+        self.animate_scale(0.95)
 
         super().mousePressEvent(event)
 
     def mouseReleaseEvent(self, event):
         # 釋放按鈕時的回彈動畫
-        self.scale_animation.setStartValue(self.geometry())
-        self.scale_animation.setEndValue(self.geometry().adjusted(-5, -5, 5, 5))  # 回彈
-        self.scale_animation.start()
+        self.animate_scale(1.05)
 
         super().mouseReleaseEvent(event)
 
@@ -0,0 +1,158 @@
+# 每個視窗共用的動畫時鐘：一個計時器在同一幀推進所有進行中的動畫，並合併成一次區域重繪
+from PySide6.QtCore import QObject, QTimer, QElapsedTimer, QEasingCurve, QPoint, QRect, Qt
+from PySide6.QtGui import QColor, QRegion
+
+# 每一幀的間隔（毫秒），約 60 幀每秒
+FRAME_INTERVAL = 16
+
+
+def interpolate(start, end, progress):
+    """
+    在兩個值之間插值，支援數字與 QColor。
+
+    參數:
+    start (float or QColor): 起始值。
+    end (float or QColor): 結束值。
+    progress (float): 經過緩動曲線後的進度，OutBack 等曲線可能略超出 0 到 1。
+
+    返回:
+    return (float or QColor): 插值結果。
+    """
+    if isinstance(start, QColor):
+        def channel(a, b):
+            return min(max(round(a + (b - a) * progress), 0), 255)
+        return QColor(channel(start.red(), end.red()), channel(start.green(), end.green()),
+                      channel(start.blue(), end.blue()), channel(start.alpha(), end.alpha()))
+    return start + (end - start) * progress
+
+
+class AnimationTrack:
+    """
+    一個進行中的動畫：在 duration 毫秒內把目標物件的某個屬性從 start 變到 end。
+
+    屬性:
+    - target (QWidget): 被動畫的元件。
+    - attribute (str): 屬性名稱，每一幀以 setattr 設定，不會個別觸發重繪。
+    - start, end: 起始值與結束值。
+    - duration (int): 動畫時間（毫秒）。
+    - easing (QEasingCurve): 緩動曲線。
+    - started (int): 開始時動畫時鐘的時間（毫秒）。
+    """
+
+    def __init__(self, target, attribute, start, end, duration, easing, started):
+        self.target = target
+        self.attribute = attribute
+        self.start = start
+        self.end = end
+        self.duration = duration
+        self.easing = QEasingCurve(easing)
+        self.started = started
+
+    def advance(self, now):
+        """
+        把屬性設定為目前時間的值。
+
+        參數:
+        now (int): 動畫時鐘的時間（毫秒）。
+
+        返回:
+        return (bool): 動畫是否已結束。
+        """
+        progress = min((now - self.started) / self.duration, 1.0) if self.duration > 0 else 1.0
+        setattr(self.target, self.attribute, interpolate(self.start, self.end, self.easing.valueForProgress(progress)))
+        return progress >= 1.0
+
+
+class AnimationTicker(QObject):
+    """
+    視窗共用的動畫時鐘，取代每個按鈕各自擁有的 QPropertyAnimation。
+    只有一個計時器，每一幀推進所有進行中的動畫，把變動的元件範圍合併成一個區域，
+    對視窗呼叫一次 update；沒有進行中的動畫時計時器停止，靜止的按鈕不佔用任何計時器或事件。
+
+    參數:
+    window (QWidget): 所屬的視窗，動畫時鐘是它的子物件，隨視窗一起釋放。
+    """
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        # 進行中的動畫，鍵為 (目標物件, 屬性名稱)；同一屬性開始新動畫時取代舊的
+        self.tracks = {}
+        self.clock = QElapsedTimer()
+        self.clock.start()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(FRAME_INTERVAL)
+        self.timer.timeout.connect(self.tick)
+
+    def animate(self, target, attribute, end, duration, easing=QEasingCurve.Linear):
+        """
+        從屬性目前的值開始動畫到 end，取代同一屬性進行中的動畫。
+
+        參數:
+        target (QWidget): 被動畫的元件，必須是所屬視窗中的元件。
+        attribute (str): 屬性名稱。
+        end (float or QColor): 結束值。
+        duration (int): 動畫時間（毫秒）。
+        easing (QEasingCurve.Type, optional): 緩動曲線，默認為線性。
+        """
+        self.tracks[(target, attribute)] = AnimationTrack(target, attribute, getattr(target, attribute), end,
+                                                          duration, easing, self.clock.elapsed())
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def stop(self, target, attribute=None):
+        """
+        停止元件的動畫，屬性保持目前的值。
+
+        參數:
+        target (QWidget): 元件。
+        attribute (str, optional): 屬性名稱，None 表示停止此元件的所有動畫。
+        """
+        for key in [key for key in self.tracks if key[0] is target and attribute in (None, key[1])]:
+            del self.tracks[key]
+
+    def is_animating(self, target=None):
+        """
+        檢查是否有進行中的動畫。
+
+        參數:
+        target (QWidget, optional): 只檢查此元件，None 表示檢查全部。
+
+        返回:
+        return (bool): 有進行中的動畫時返回 True。
+        """
+        return any(target is None or key[0] is target for key in self.tracks)
+
+    def tick(self):
+        """
+        推進一幀：更新所有動畫的屬性，並把變動的元件合併成一次視窗重繪。
+        """
+        now = self.clock.elapsed()
+        region = QRegion()
+        for key, track in list(self.tracks.items()):
+            if track.advance(now):
+                del self.tracks[key]
+            if track.target.isVisible():
+                region += QRect(track.target.mapTo(self.window, QPoint(0, 0)), track.target.size())
+        if not region.isEmpty():
+            self.window.update(region)
+        if not self.tracks:
+            self.timer.stop()
+
+
+def shared_ticker(widget):
+    """
+    取得元件所在視窗的動畫時鐘，第一次使用時建立。
+
+    參數:
+    widget (QWidget): 視窗中的任一元件。
+
+    返回:
+    return (AnimationTicker): 視窗共用的動畫時鐘。
+    """
+    window = widget.window()
+    ticker = window.findChild(AnimationTicker, options=Qt.FindDirectChildrenOnly)
+    if ticker is None:
+        ticker = AnimationTicker(window)
+    return ticker
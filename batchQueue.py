@@ -0,0 +1,197 @@
+# 批次操作佇列：將多個新增檔案、刪除分支與推送操作合併成最少次數的 Git 命令
+import subprocess
+
+# 佇列中的操作類型
+ADD = "add"
+DELETE_BRANCH = "delete_branch"
+PUSH = "push"
+# 單一命令列的長度上限（字元），Windows 的 CreateProcess 最多接受 32767 個字元
+MAX_COMMAND_LENGTH = 30000
+
+
+class BatchOperation:
+    """
+    佇列中的一個操作。
+
+    參數:
+    kind (str): 操作類型，ADD、DELETE_BRANCH 或 PUSH。
+    target (str): 檔案路徑、分支名稱或要推送的 refspec。
+    remote (str, optional): 推送的遠端名稱或網址，只有 PUSH 使用。
+    """
+
+    def __init__(self, kind, target, remote=None):
+        self.kind = kind
+        self.target = target
+        self.remote = remote
+
+    def describe(self):
+        """
+        產生顯示在佇列列表中的描述。
+
+        返回:
+        return (str): 操作的描述，例如「推送 main 到 origin」。
+        """
+        if self.kind == ADD:
+            return f"新增檔案 {self.target}"
+        if self.kind == DELETE_BRANCH:
+            return f"刪除分支 {self.target}"
+        return f"推送 {self.target} 到 {self.remote}"
+
+
+class BatchCommand:
+    """
+    合併後的一次 Git 命令。
+
+    參數:
+    args (list of str): 不含 "git" 的命令參數。
+    operations (list of BatchOperation): 這次命令涵蓋的操作。
+    parallel (bool, optional): 是否可以與其他可並行的命令同時執行，推送到不同遠端時為 True。
+    """
+
+    def __init__(self, args, operations, parallel=False):
+        self.args = args
+        self.operations = operations
+        self.parallel = parallel
+
+    def command_line(self):
+        """
+        產生顯示用的命令列。
+
+        返回:
+        return (str): 例如 "git branch -d a b c"。
+        """
+        return " ".join(["git"] + self.args)
+
+
+class BatchResult:
+    """
+    一次 Git 命令的執行結果。
+
+    參數:
+    command (BatchCommand): 執行的命令。
+    returncode (int): 返回碼。
+    output (str): 標準輸出與標準錯誤輸出合併後的內容。
+    failed (list of BatchOperation, optional): 沒有完成的操作，默認為失敗時全部、成功時沒有。
+    """
+
+    def __init__(self, command, returncode, output, failed=None):
+        self.command = command
+        self.returncode = returncode
+        self.output = output
+        if failed is None:
+            failed = list(command.operations) if returncode != 0 else []
+        self.failed = failed
+
+    def succeeded(self):
+        """
+        檢查命令是否成功。
+
+        返回:
+        return (bool): 返回碼為 0 時返回 True。
+        """
+        return self.returncode == 0
+
+
+def _chunked(prefix, operations):
+    """
+    將同一類操作的目標接在固定參數後面，命令列超過長度上限時拆成多個命令。
+
+    參數:
+    prefix (list of str): 固定的命令參數，例如 ["add", "--"]。
+    operations (list of BatchOperation): 要合併的操作。
+
+    返回:
+    return (list of tuple): 每個命令的 (參數列表, 涵蓋的操作)。
+    """
+    chunks = []
+    args, covered = list(prefix), []
+    length = len(" ".join(["git"] + prefix))
+    for operation in operations:
+        if covered and length + 1 + len(operation.target) > MAX_COMMAND_LENGTH:
+            chunks.append((args, covered))
+            args, covered = list(prefix), []
+            length = len(" ".join(["git"] + prefix))
+        args.append(operation.target)
+        covered.append(operation)
+        length += 1 + len(operation.target)
+    if covered:
+        chunks.append((args, covered))
+    return chunks
+
+
+def plan_batch(operations):
+    """
+    將佇列中的操作合併成最少次數的 Git 命令：所有新增檔案合併成 `git add -- f1 f2 ...`，
+    所有刪除分支合併成 `git branch -d a b c`，推送到同一個遠端的 refspec 合併成一次 `git push --atomic`，
+    推送到不同遠端的命令則標記為可以並行執行。重複的操作只保留一次。
+
+    參數:
+    operations (list of BatchOperation): 佇列中的操作，依加入順序排列。
+
+    返回:
+    return (list of BatchCommand): 依執行順序排列的命令，先新增檔案、再刪除分支，最後推送。
+    """
+    seen = set()
+    adds, deletes, pushes = [], [], {}
+    for operation in operations:
+        key = (operation.kind, operation.target, operation.remote)
+        if key in seen:
+            continue
+        seen.add(key)
+        if operation.kind == ADD:
+            adds.append(operation)
+        elif operation.kind == DELETE_BRANCH:
+            deletes.append(operation)
+        elif operation.kind == PUSH:
+            pushes.setdefault(operation.remote, []).append(operation)
+        else:
+            raise ValueError(f"不支援的操作類型：{operation.kind}")
+
+    commands = [BatchCommand(args, covered) for args, covered in _chunked(["add", "--"], adds)]
+    commands += [BatchCommand(args, covered) for args, covered in _chunked(["branch", "-d"], deletes)]
+    for remote, operations in pushes.items():
+        # --atomic 讓同一個遠端的所有 ref 一起更新或一起失敗，不會只推送一半
+        commands += [BatchCommand(args, covered, parallel=True)
+                     for args, covered in _chunked(["push", "--atomic", "--porcelain", remote], operations)]
+    return commands
+
+
+def run_batch(commands, cwd=None, on_result=None):
+    """
+    執行 plan_batch 產生的命令，不經過 Shell。本地命令依序執行，可並行的推送命令同時啟動，
+    推送到多個遠端的時間只取決於最慢的遠端。
+
+    參數:
+    commands (list of BatchCommand): 要執行的命令。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    on_result (callable, optional): 每個命令結束時以 BatchResult 呼叫的函數，可能在背景執行緒中呼叫。
+
+    返回:
+    return (list of BatchResult): 與 commands 順序相同的執行結果。
+    """
+    results = [None] * len(commands)
+
+    def finish(index, process):
+        output, _ = process.communicate()
+        command = commands[index]
+        failed = None
+        if process.returncode != 0 and command.args[0] == "branch":
+            # git branch -d 遇到未合併的分支時仍會刪除其他分支，以刪除後剩下的分支判斷哪些沒有完成
+            remaining = subprocess.run(["git", "for-each-ref", "--format=%(refname:short)", "refs/heads"], cwd=cwd,
+                                       capture_output=True, text=True).stdout.split()
+            failed = [operation for operation in command.operations if operation.target in remaining]
+        results[index] = BatchResult(command, process.returncode, output.decode(errors="replace").strip(), failed)
+        if on_result is not None:
+            on_result(results[index])
+
+    def start(command):
+        return subprocess.Popen(["git"] + command.args, cwd=cwd, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    for index, command in enumerate(commands):
+        if not command.parallel:
+            finish(index, start(command))
+    parallel = [(index, start(command)) for index, command in enumerate(commands) if command.parallel]
+    for index, process in parallel:
+        finish(index, process)
+    return results
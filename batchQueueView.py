@@ -0,0 +1,262 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QComboBox,
+                               QLineEdit, QListWidget, QAbstractItemView, QPlainTextEdit)
+from PySide6.QtCore import Signal
+
+from batchQueue import ADD, DELETE_BRANCH, PUSH, BatchOperation, plan_batch, run_batch
+
+# 操作類型選單的顯示名稱
+KIND_LABELS = [("新增檔案", ADD), ("刪除分支", DELETE_BRANCH), ("推送分支", PUSH)]
+
+
+class BatchQueueDialog(QDialog):
+    """
+    批次操作視窗。使用者可以一次排入多個新增檔案、刪除分支或推送操作，
+    執行時合併成最少次數的 Git 命令，並在同一個區域顯示所有命令的結果。
+
+    候選列表直接取自記憶體中的倉庫狀態：新增檔案時列出尚未暫存的變更與未追蹤的檔案，
+    刪除或推送時列出所有本地分支，可以一次選取多個項目加入佇列。
+
+    參數:
+    repo_state (RepositoryState): 共用的倉庫狀態。
+    executor (GitCommandExecutor): 用來在背景執行命令的執行器。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    remote (str, optional): 預設的推送遠端，默認為 origin。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+
+    訊號:
+    - resultReady (object): 一個命令執行完畢時的 BatchResult，由背景執行緒發出。
+    """
+    resultReady = Signal(object)
+
+    def __init__(self, repo_state, executor, cwd=None, remote="origin", parent=None):
+        super().__init__(parent)
+        self.repo_state = repo_state
+        self.executor = executor
+        self.cwd = cwd
+        self.setWindowTitle("批次操作")
+        self.resize(640, 640)
+        # 佇列中的操作，順序與佇列列表相同
+        self.operations = []
+
+        # 操作類型、候選項目與手動輸入
+        self.kind_menu = QComboBox(self)
+        for label, kind in KIND_LABELS:
+            self.kind_menu.addItem(label, kind)
+        self.kind_menu.currentIndexChanged.connect(self.update_candidates)
+        self.remote_entry = QLineEdit(remote, self)
+        self.remote_entry.setToolTip("推送到多個遠端時以空白分隔，各遠端會同時推送")
+        self.candidate_list = QListWidget(self)
+        self.candidate_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.target_entry = QLineEdit(self)
+        self.target_entry.setPlaceholderText("或輸入檔案路徑、分支名稱")
+        self.target_entry.returnPressed.connect(self.add_entered)
+        add_selected_button = QPushButton("加入選取項目", self)
+        add_selected_button.clicked.connect(self.add_selected)
+        add_entered_button = QPushButton("加入", self)
+        add_entered_button.clicked.connect(self.add_entered)
+
+        # 佇列與結果
+        self.queue_list = QListWidget(self)
+        self.queue_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        remove_button = QPushButton("移除選取項目", self)
+        remove_button.clicked.connect(self.remove_selected)
+        clear_button = QPushButton("清空佇列", self)
+        clear_button.clicked.connect(self.clear_queue)
+        self.run_button = QPushButton("執行", self)
+        self.run_button.clicked.connect(self.run)
+        self.result_view = QPlainTextEdit(self)
+        self.result_view.setReadOnly(True)
+        self.status_label = QLabel("", self)
+        self.status_label.setStyleSheet("color: #2C662D; font-size: 12px;")
+
+        options = QGridLayout()
+        options.addWidget(QLabel("操作:", self), 0, 0)
+        options.addWidget(self.kind_menu, 0, 1)
+        options.addWidget(QLabel("遠端:", self), 1, 0)
+        options.addWidget(self.remote_entry, 1, 1)
+        entry_layout = QHBoxLayout()
+        entry_layout.addWidget(self.target_entry, 1)
+        entry_layout.addWidget(add_entered_button)
+        entry_layout.addWidget(add_selected_button)
+        queue_buttons = QHBoxLayout()
+        queue_buttons.addWidget(remove_button)
+        queue_buttons.addWidget(clear_button)
+        queue_buttons.addStretch(1)
+        queue_buttons.addWidget(self.run_button)
+        layout = QVBoxLayout(self)
+        layout.addLayout(options)
+        layout.addWidget(self.candidate_list, 2)
+        layout.addLayout(entry_layout)
+        layout.addWidget(QLabel("佇列:", self))
+        layout.addWidget(self.queue_list, 2)
+        layout.addLayout(queue_buttons)
+        layout.addWidget(self.result_view, 2)
+        layout.addWidget(self.status_label)
+
+        # 背景執行緒發出的結果以佇列方式傳回主執行緒顯示
+        self.resultReady.connect(self.show_result)
+        self.repo_state.changed.connect(self.update_candidates)
+        self.update_candidates()
+
+    def current_kind(self):
+        """
+        取得目前選擇的操作類型。
+
+        返回:
+        return (str): ADD、DELETE_BRANCH 或 PUSH。
+        """
+        return self.kind_menu.currentData()
+
+    def update_candidates(self):
+        """
+        依照操作類型從倉庫狀態更新候選列表。
+        """
+        kind = self.current_kind()
+        self.remote_entry.setEnabled(kind == PUSH)
+        if kind == ADD:
+            candidates = [change.path for change in self.repo_state.snapshot.changes
+                          if change.worktree_status not in (".", "!")]
+        else:
+            candidates = self.repo_state.branch_names()
+        self.candidate_list.clear()
+        self.candidate_list.addItems(candidates)
+
+    def enqueue(self, targets):
+        """
+        以目前的操作類型將目標加入佇列。推送操作會對每個遠端各加入一個操作。
+
+        參數:
+        targets (list of str): 檔案路徑或分支名稱。
+        """
+        kind = self.current_kind()
+        remotes = self.remote_entry.text().split() if kind == PUSH else [None]
+        if not remotes:
+            self.status_label.setText("請輸入要推送的遠端。")
+            return
+        for target in targets:
+            for remote in remotes:
+                operation = BatchOperation(kind, target, remote)
+                self.operations.append(operation)
+                self.queue_list.addItem(operation.describe())
+        self.update_summary()
+
+    def add_selected(self):
+        """
+        將候選列表中選取的項目加入佇列。
+        """
+        self.enqueue([item.text() for item in self.candidate_list.selectedItems()])
+        self.candidate_list.clearSelection()
+
+    def add_entered(self):
+        """
+        將手動輸入的目標加入佇列。
+        """
+        target = self.target_entry.text().strip()
+        if target:
+            self.enqueue([target])
+            self.target_entry.clear()
+
+    def remove_selected(self):
+        """
+        從佇列中移除選取的操作。
+        """
+        rows = sorted((self.queue_list.row(item) for item in self.queue_list.selectedItems()), reverse=True)
+        for row in rows:
+            self.queue_list.takeItem(row)
+            del self.operations[row]
+        self.update_summary()
+
+    def clear_queue(self):
+        """
+        清空佇列。
+        """
+        self.operations = []
+        self.queue_list.clear()
+        self.update_summary()
+
+    def update_summary(self):
+        """
+        在狀態列顯示佇列中的操作會合併成幾次 Git 命令。
+        """
+        if not self.operations:
+            self.status_label.setText("")
+            return
+        commands = plan_batch(self.operations)
+        self.status_label.setText(f"{len(self.operations)} 個操作，將以 {len(commands)} 次 Git 命令執行")
+
+    def run(self):
+        """
+        將佇列合併成 Git 命令並在背景執行，執行期間停用執行按鈕。
+        """
+        if not self.operations:
+            self.status_label.setText("佇列是空的。")
+            return
+        commands = plan_batch(self.operations)
+        self.run_button.setEnabled(False)
+        self.result_view.clear()
+        self.status_label.setText(f"正在執行 {len(commands)} 次 Git 命令...")
+        # 新增檔案與刪除分支會改變倉庫，以寫入任務執行，不會與其他 Git 命令同時進行；
+        # 推送只更新遠端，之後另外以唯讀任務執行，網路很慢時也不會擋住其他讀取
+        local = [command for command in commands if not command.parallel]
+        pushes = [command for command in commands if command.parallel]
+        if local:
+            self.executor.submit_call(lambda: run_batch(local, self.cwd, on_result=self.resultReady.emit),
+                                      read_only=False, on_success=lambda results: self.run_pushes(pushes, results),
+                                      on_failure=self.batch_failed)
+        else:
+            self.run_pushes(pushes, [])
+
+    def run_pushes(self, pushes, results):
+        """
+        本地命令完成後，以唯讀任務同時執行所有推送命令。
+
+        參數:
+        pushes (list of BatchCommand): 推送命令。
+        results (list of BatchResult): 本地命令的結果。
+        """
+        if not pushes:
+            self.batch_finished(results)
+            return
+        self.executor.submit_call(lambda: run_batch(pushes, self.cwd, on_result=self.resultReady.emit),
+                                  on_success=lambda push_results: self.batch_finished(results + push_results),
+                                  on_failure=self.batch_failed)
+
+    def show_result(self, result):
+        """
+        將一個命令的結果附加到結果區域。
+
+        參數:
+        result (BatchResult): 命令的執行結果。
+        """
+        mark = "✔" if result.succeeded() else "✘"
+        self.result_view.appendPlainText(f"{mark} {result.command.command_line()}")
+        if result.output:
+            self.result_view.appendPlainText(result.output)
+        self.result_view.appendPlainText("")
+
+    def batch_finished(self, results):
+        """
+        所有命令執行完畢後，從佇列移除已成功的操作，只保留失敗的操作以便修正後重試。
+
+        參數:
+        results (list of BatchResult): 所有命令的結果。
+        """
+        self.run_button.setEnabled(True)
+        failed = [operation for result in results for operation in result.failed]
+        self.operations = [operation for operation in self.operations if operation in failed]
+        self.queue_list.clear()
+        self.queue_list.addItems([operation.describe() for operation in self.operations])
+        succeeded = sum(result.succeeded() for result in results)
+        self.status_label.setText(f"完成：{succeeded} 次命令成功，{len(results) - succeeded} 次失敗")
+        self.repo_state.refresh()
+
+    def batch_failed(self, error):
+        """
+        無法執行批次命令時顯示錯誤訊息，例如找不到 Git。
+
+        參數:
+        error (str): 錯誤訊息。
+        """
+        self.run_button.setEnabled(True)
+        self.status_label.setText(f"無法執行批次操作：{error}")
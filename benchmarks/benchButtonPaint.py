@@ -0,0 +1,63 @@
+# 比較動畫按鈕以陰影效果繪製與以快取圖片繪製時，每一幀動畫的繪製時間
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QApplication, QGridLayout, QWidget
+
+from benchUtils import measure, report
+from gitFlow import AnimatedButton
+
+
+def make_window(cached, buttons):
+    """
+    建立一個排列多個動畫按鈕的視窗，與主視窗的按鈕格線相同。
+    """
+    window = QWidget()
+    layout = QGridLayout(window)
+    for i in range(buttons):
+        layout.addWidget(AnimatedButton(f"按鈕 {i}", window, cached=cached), i // 2, i % 2)
+    window.show()
+    QApplication.processEvents()
+    return window, window.findChildren(AnimatedButton)
+
+
+def play_hover(buttons, frames):
+    """
+    模擬所有按鈕同時播放一次懸停動畫：每一幀改變顏色與縮放並立即重繪。
+    """
+    def run():
+        for frame in range(frames):
+            progress = frame / (frames - 1)
+            for button in buttons:
+                normal, hover = button.normal_color, button.hover_color
+                button._scale_factor = 1.0 + 0.05 * progress
+                button.current_color = QColor.fromRgbF(
+                    normal.redF() + (hover.redF() - normal.redF()) * progress,
+                    normal.greenF() + (hover.greenF() - normal.greenF()) * progress,
+                    normal.blueF() + (hover.blueF() - normal.blueF()) * progress)
+                button.repaint()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="動畫按鈕繪製的基準測試")
+    parser.add_argument("--buttons", type=int, default=12, help="視窗中的按鈕數量")
+    parser.add_argument("--frames", type=int, default=60, help="每次懸停動畫的幀數")
+    parser.add_argument("--repeat", type=int, default=10, help="重複的次數")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for cached, name in ((False, "陰影效果（每幀重新模糊）"), (True, "快取圖片")):
+        window, buttons = make_window(cached, args.buttons)
+        report(f"{name} {args.frames} 幀", measure(play_hover(buttons, args.frames), args.repeat))
+        window.close()
+        # 處理關閉事件，讓下一組按鈕在沒有其他視窗的情況下測量
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main()
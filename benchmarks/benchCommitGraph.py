@@ -0,0 +1,82 @@
+# 測量精簡提交歷史結構（CommitStore / LaneLayout）的建立時間與記憶體用量
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from commitGraph import LaneLayout
+
+
+def synthetic_history(commits, branches, seed=0):
+    """
+    產生依照拓撲順序（由新到舊）排列的合成提交歷史，包含多條分支與合併。
+
+    參數:
+    commits (int): commit 數量。
+    branches (int): 同時進行的分支數量。
+    seed (int, optional): 亂數種子。
+
+    返回:
+    return (list of tuple): (commit 雜湊值, 父 commit 雜湊值列表) 的列表。
+    """
+    rng = random.Random(seed)
+    oids = [rng.randbytes(20).hex() for _ in range(commits)]
+    history = []
+    for i, oid in enumerate(oids):
+        parents = []
+        if i + branches < commits:
+            parents.append(oids[i + branches])
+        if i % 7 == 0 and i + 1 < commits:
+            # 每隔幾個 commit 產生一次合併
+            parents.append(oids[i + 1])
+        history.append((oid, parents))
+    return history
+
+
+def current_rss():
+    """
+    讀取目前行程的常駐記憶體（RSS），無法讀取時返回 None。
+
+    返回:
+    return (int or None): 位元組數。
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="精簡提交歷史結構的基準測試")
+    parser.add_argument("--commits", type=int, default=1000000, help="commit 數量")
+    parser.add_argument("--branches", type=int, default=8, help="同時進行的分支數量")
+    args = parser.parse_args()
+
+    history = synthetic_history(args.commits, args.branches)
+    rss_before = current_rss()
+    start = time.perf_counter()
+    layout = LaneLayout()
+    for oid, parents in history:
+        layout.add(oid, parents)
+    elapsed = time.perf_counter() - start
+    rss_after = current_rss()
+
+    start = time.perf_counter()
+    for first in range(0, args.commits, max(1, args.commits // 1000)):
+        layout.edges_in_rows(first, first + 40)
+    query = (time.perf_counter() - start) / 1000
+
+    print(f"commit 數量：{len(layout)}，泳道數量：{layout.width}")
+    print(f"建立佈局：{elapsed:.2f} 秒")
+    print(f"CommitStore 陣列：{layout.store.nbytes() / 2 ** 20:.1f} MB")
+    if rss_before is not None:
+        print(f"建立佈局後 RSS 增加：{(rss_after - rss_before) / 2 ** 20:.1f} MB")
+    print(f"查詢一個畫面的邊：{query * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# 比較以 commit-graph 世代編號計算的祖先關係查詢與 Git 命令列的延遲，並確認兩者的結果相同
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchUtils import make_repo, measure, report, git
+from gitAncestry import DatabaseAncestry
+from gitObjectDb import GitObjectDatabase, find_git_dir
+
+
+def verify(repo, ancestry, pairs):
+    """
+    以 Git 命令列的結果確認 merge-base、is-ancestor 與領先落後數量都相同。
+
+    參數:
+    repo (str): 倉庫路徑。
+    ancestry (DatabaseAncestry): 要確認的查詢物件。
+    pairs (list of tuple): 要比對的 commit 組合。
+    """
+    for first, second in pairs:
+        # 沒有共同歷史時 git merge-base 以結束碼 1 表示，輸出為空
+        expected = sorted(subprocess.run(["git", "merge-base", "--all", first, second], cwd=repo,
+                                         capture_output=True, text=True).stdout.split())
+        assert sorted(ancestry.merge_bases(first, second)) == expected, f"merge-base 不同：{first} {second}"
+        expected = subprocess.run(["git", "merge-base", "--is-ancestor", first, second], cwd=repo).returncode == 0
+        assert ancestry.is_ancestor(first, second) == expected, f"is-ancestor 不同：{first} {second}"
+        expected = tuple(map(int, git(repo, "rev-list", "--left-right", "--count", f"{first}...{second}").split()))
+        assert ancestry.ahead_behind(first, second) == expected, f"領先落後數量不同：{first} {second}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="祖先關係查詢與 Git 命令列的延遲基準測試")
+    parser.add_argument("--commits", type=int, default=20000, help="測試倉庫的 commit 數量")
+    parser.add_argument("--repeat", type=int, default=200, help="每個項目重複的次數")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repo(repo, commits=args.commits)
+        git(repo, "commit-graph", "write", "--reachable")
+        oids = git(repo, "rev-list", "--all").split()
+        branches = git(repo, "for-each-ref", "--format=%(objectname)", "refs/heads").split()
+        ancestry = DatabaseAncestry(GitObjectDatabase(find_git_dir(repo)))
+        rng = random.Random(0)
+        verify(repo, ancestry, [(rng.choice(oids), rng.choice(oids)) for _ in range(100)])
+        print(f"測試倉庫：{args.commits} 個 commit，結果與 Git 命令列相同")
+
+        # 查詢成本與兩個 commit 分歧的歷史長度成正比：同一分支上相距不遠的 commit（例如分支與它的上游）
+        # 只走訪少數 commit，測試倉庫中各分支之間則分歧了數千個 commit
+        nearby = []
+        for branch in branches:
+            line = git(repo, "rev-list", "--first-parent", "-n", "100", branch).split()
+            for _ in range(20):
+                index = rng.randrange(len(line) - 20)
+                pair = [line[index], line[index + rng.randrange(1, 20)]]
+                rng.shuffle(pair)
+                nearby.append(tuple(pair))
+        branch_pairs = [(first, second) for first in branches for second in branches if first != second]
+
+        for label, pairs in (("鄰近 commit", nearby), ("分支端點", branch_pairs)):
+            counter = iter(range(10 ** 9))
+
+            def next_pair():
+                return pairs[next(counter) % len(pairs)]
+
+            report(f"merge-base（git，{label}）",
+                   measure(lambda: subprocess.run(["git", "merge-base", *next_pair()], cwd=repo, capture_output=True),
+                           args.repeat))
+            report(f"merge-base（世代編號，{label}）", measure(lambda: ancestry.merge_base(*next_pair()), args.repeat))
+            report(f"is-ancestor（git，{label}）",
+                   measure(lambda: subprocess.run(["git", "merge-base", "--is-ancestor", *next_pair()], cwd=repo),
+                           args.repeat))
+            report(f"is-ancestor（世代編號，{label}）", measure(lambda: ancestry.is_ancestor(*next_pair()), args.repeat))
+            report(f"領先落後數量（git，{label}）",
+                   measure(lambda: git(repo, "rev-list", "--left-right", "--count", "{}...{}".format(*next_pair())),
+                           args.repeat))
+            report(f"領先落後數量（世代編號，{label}）", measure(lambda: ancestry.ahead_behind(*next_pair()), args.repeat))
+        ancestry.database.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# 比較直接讀取 .git 的物件資料庫與 Git 命令列的讀取延遲，並確認兩者的結果相同
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchUtils import make_repo, measure, report, git
+from gitObjectDb import GitObjectDatabase, find_git_dir
+from gitWorkerPool import GitProcessPool
+
+
+def verify(repo, database, samples=200):
+    """
+    以 Git 命令列的結果確認物件資料庫讀到的 refs、物件內容與走訪順序都相同。
+
+    參數:
+    repo (str): 倉庫路徑。
+    database (GitObjectDatabase): 要確認的物件資料庫。
+    samples (int, optional): 抽樣比對的物件數量。
+    """
+    tips = database.ref_tips()
+    expected_tips = sorted({line.split()[0] for line in git(repo, "show-ref", "--head", "--dereference").splitlines()})
+    assert tips == expected_tips, "ref 端點不同"
+
+    objects = [line.split()[0] for line in git(repo, "rev-list", "--objects", "--all").splitlines()]
+    for oid in random.Random(0).sample(objects, min(samples, len(objects))):
+        obj_type, data = database.read_object(oid)
+        expected = subprocess.run(["git", "cat-file", obj_type, oid], cwd=repo, capture_output=True, check=True).stdout
+        assert data == expected, f"物件內容不同：{oid}"
+
+    walked = [oid for oid, _ in database.walk(tips)]
+    expected = git(repo, "log", "--stdin", "--pretty=format:%H", input="\n".join(tips).encode() + b"\n").split()
+    assert walked == expected, "走訪順序與 git log 不同"
+
+    excluded = walked[len(walked) // 3]
+    walked = [oid for oid, _ in database.walk(tips, [excluded])]
+    expected = git(repo, "log", "--stdin", "--pretty=format:%H",
+                   input="\n".join(tips + ["^" + excluded]).encode() + b"\n").split()
+    assert walked == expected, "排除起點後的結果與 git log 不同"
+
+
+def timed(func):
+    """
+    執行一次函數並返回耗時（秒）。
+    """
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="物件資料庫與 Git 命令列的讀取延遲基準測試")
+    parser.add_argument("--commits", type=int, default=20000, help="測試倉庫的 commit 數量")
+    parser.add_argument("--repeat", type=int, default=200, help="每個項目重複的次數")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repo(repo, commits=args.commits)
+        oids = git(repo, "rev-list", "--all").split()
+        database = GitObjectDatabase(find_git_dir(repo))
+        pool = GitProcessPool(repo)
+        pool.read_commit("HEAD")
+        verify(repo, database)
+        print(f"測試倉庫：{args.commits} 個 commit，結果與 Git 命令列相同")
+
+        counter = iter(range(10 ** 9))
+
+        def next_oid():
+            return oids[next(counter) % len(oids)]
+
+        report("讀取 commit（常駐行程池）", measure(lambda: pool.read_commit(next_oid()), args.repeat))
+        report("讀取 commit（物件資料庫）", measure(lambda: database.read_commit(next_oid()), args.repeat))
+        report("列出分支（行程池）", measure(pool.list_branches, args.repeat))
+        report("列出分支（物件資料庫）", measure(database.list_branches, args.repeat))
+        report("ref 端點（git show-ref）",
+               measure(lambda: git(repo, "show-ref", "--head", "--dereference"), args.repeat))
+        report("ref 端點（物件資料庫）", measure(database.ref_tips, args.repeat))
+
+        tips = database.ref_tips()
+        stdin_data = "\n".join(tips).encode() + b"\n"
+        print(f"走訪全部歷史（git log）：{timed(lambda: git(repo, 'log', '--stdin', '--pretty=format:%H %P', input=stdin_data)):.2f} 秒")
+        print(f"走訪全部歷史（物件資料庫）：{timed(lambda: list(database.walk(tips))):.2f} 秒")
+        git(repo, "commit-graph", "write", "--reachable")
+        print(f"走訪全部歷史（git log，有 commit-graph）：{timed(lambda: git(repo, 'log', '--stdin', '--pretty=format:%H %P', input=stdin_data)):.2f} 秒")
+        print(f"走訪全部歷史（物件資料庫，有 commit-graph）：{timed(lambda: list(database.walk(tips))):.2f} 秒")
+        database.close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# 比較常駐 Git 行程池與每次呼叫都啟動新行程的延遲
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchUtils import make_repo, measure, report, git
+from gitWorkerPool import GitProcessPool
+
+
+def spawn_per_call(command, cwd):
+    """
+    模擬 run_git_command 的做法：每次呼叫都透過 Shell 啟動新的 Git 行程。
+    """
+    if os.name == "nt":
+        return subprocess.run(command, shell=True, cwd=cwd, capture_output=True, text=True)
+    return subprocess.run(command, shell=True, executable="/bin/bash", cwd=cwd, capture_output=True, text=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常駐 Git 行程池的延遲基準測試")
+    parser.add_argument("--commits", type=int, default=2000, help="測試倉庫的 commit 數量")
+    parser.add_argument("--repeat", type=int, default=200, help="每個項目重複的次數")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repo(repo, commits=args.commits)
+        oids = git(repo, "rev-list", "--all").split()
+        pool = GitProcessPool(repo)
+        # 預先啟動常駐行程，讓測量只包含每次查詢的延遲
+        pool.read_commit("HEAD")
+
+        counter = iter(range(10 ** 9))
+
+        def next_oid():
+            return oids[next(counter) % len(oids)]
+
+        print(f"測試倉庫：{args.commits} 個 commit，每項重複 {args.repeat} 次")
+        report("讀取 commit（每次啟動 git cat-file）",
+               measure(lambda: spawn_per_call(f"git cat-file commit {next_oid()}", repo), args.repeat))
+        report("讀取 commit（常駐行程池）",
+               measure(lambda: pool.read_commit(next_oid()), args.repeat))
+        report("列出分支（每次啟動 git branch）",
+               measure(lambda: spawn_per_call("git branch", repo), args.repeat))
+        report("列出分支（行程池，不經過 Shell）",
+               measure(pool.list_branches, args.repeat))
+        report("最近 100 筆歷史（每次啟動 git log）",
+               measure(lambda: spawn_per_call("git log -n 100 --pretty=format:'%H %P'", repo), args.repeat // 10))
+        report("最近 100 筆歷史（常駐行程池）",
+               measure(lambda: pool.log(["HEAD"], max_count=100), args.repeat // 10))
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# 以本機的 bare 倉庫作為遠端，確認背景 fetch 排程的同時進行數量上限、失敗後的等待時間與清除已刪除的分支，
+# 並測量每次 fetch 的延遲
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PySide6.QtCore import QCoreApplication
+
+from benchUtils import git
+from prefetchScheduler import MAX_BACKOFF, PrefetchScheduler
+
+
+class MeasuredScheduler(PrefetchScheduler):
+    """
+    記錄同時進行的 fetch 數量與每次 fetch 耗時的排程。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.durations = []
+
+    def fetch_remote(self, remote):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            super().fetch_remote(remote)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                self.durations.append((time.perf_counter() - start) * 1000)
+
+
+def wait_until(condition, timeout):
+    """
+    處理事件直到條件成立，逾時時拋出例外。
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("等待逾時")
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+
+
+def make_remotes(root, count):
+    """
+    建立數個 bare 倉庫作為遠端，每個都有 master 與 old 兩個分支。
+
+    返回:
+    return (list of str): bare 倉庫的路徑。
+    """
+    seed = os.path.join(root, "seed")
+    os.makedirs(seed)
+    git(seed, "init", "-q", "-b", "master")
+    with open(os.path.join(seed, "file.txt"), "w") as f:
+        f.write("seed\n")
+    git(seed, "add", "file.txt")
+    git(seed, "-c", "user.name=Bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "seed")
+    git(seed, "branch", "old")
+    remotes = []
+    for i in range(count):
+        bare = os.path.join(root, f"remote{i}.git")
+        git(root, "init", "-q", "--bare", bare)
+        git(seed, "push", "-q", bare, "master", "old")
+        remotes.append(bare)
+    return remotes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="背景 fetch 排程的確認與延遲測試")
+    parser.add_argument("--remotes", type=int, default=6, help="可以 fetch 的遠端數量")
+    parser.add_argument("--max-concurrent", type=int, default=2, help="同時進行的 fetch 數量上限")
+    parser.add_argument("--interval", type=float, default=0.5, help="成功後再次 fetch 的間隔（秒）")
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)  # noqa: F841
+    with tempfile.TemporaryDirectory() as root:
+        remotes = make_remotes(root, args.remotes)
+        local = os.path.join(root, "local")
+        os.makedirs(local)
+        git(local, "init", "-q", "-b", "master")
+        for i, bare in enumerate(remotes):
+            git(local, "remote", "add", f"r{i}", bare)
+        # 不存在的遠端每次都會失敗，用來確認等待時間加倍
+        git(local, "remote", "add", "broken", os.path.join(root, "missing.git"))
+
+        scheduler = MeasuredScheduler(cwd=local, interval=args.interval, max_concurrent=args.max_concurrent)
+        fetched, failures = set(), []
+        scheduler.fetched.connect(lambda remote: fetched.add(remote))
+        scheduler.failed.connect(lambda remote, error: failures.append(
+            (scheduler.failures[remote], scheduler.next_due[remote] - time.monotonic())))
+        scheduler.start()
+
+        names = {f"r{i}" for i in range(args.remotes)}
+        wait_until(lambda: names <= fetched and len(failures) >= 3, timeout=60)
+        refs = git(local, "for-each-ref", "--format=%(refname)", "refs/remotes").split()
+        assert all(f"refs/remotes/{name}/old" in refs for name in names), "沒有取得所有遠端的分支"
+        assert scheduler.max_in_flight <= args.max_concurrent, f"同時進行 {scheduler.max_in_flight} 個 fetch"
+        for count, delay in failures:
+            expected = min(args.interval * 2 ** count, MAX_BACKOFF)
+            assert expected - 0.5 <= delay <= expected + 0.1, f"第 {count} 次失敗後等待 {delay:.2f} 秒，應為 {expected}"
+        print(f"{args.remotes} 個遠端都已 fetch，最多同時 {scheduler.max_in_flight} 個，"
+              f"失敗後的等待時間：{', '.join(f'{delay:.1f}s' for _, delay in failures[:3])}")
+
+        # 在遠端刪除分支後立即 fetch，遠端追蹤分支應被清除
+        git(root, "--git-dir", remotes[0], "branch", "-q", "-D", "old")
+        fetched.clear()
+        scheduler.fetch_now()
+        wait_until(lambda: "r0" in fetched, timeout=30)
+        refs = git(local, "for-each-ref", "--format=%(refname)", "refs/remotes/r0").split()
+        assert "refs/remotes/r0/old" not in refs, "遠端已刪除的分支沒有被清除"
+        print("遠端刪除的分支已清除")
+
+        scheduler.stop()
+        durations = scheduler.durations
+        print(f"{'每次 fetch（本機 bare 倉庫）':<40} 平均 {statistics.mean(durations):8.2f} ms   "
+              f"中位數 {statistics.median(durations):8.2f} ms   共 {len(durations)} 次")
+
+
+if __name__ == "__main__":
+    main()
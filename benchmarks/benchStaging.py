@@ -0,0 +1,117 @@
+# 比較 `git add . && git commit` 與選擇性暫存在大型工作目錄中的提交時間
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchUtils import git
+from stagingEngine import commit_selected, read_changes
+
+
+def make_tree(path, files, per_dir=1000):
+    """
+    使用 `git fast-import` 建立一個只有一個 commit、含有大量小檔案的倉庫，並取出到工作目錄。
+
+    參數:
+    path (str): 倉庫的路徑。
+    files (int): 檔案數量。
+    per_dir (int, optional): 每個目錄的檔案數量，默認為 1000。
+    """
+    git(path, "init", "-q", "-b", "master")
+    stream = ["commit refs/heads/master\ncommitter Bench <bench@example.com> 1700000000 +0000\ndata 4\ninit\n"]
+    for i in range(files):
+        content = f"file {i}\n"
+        stream.append(f"M 644 inline dir{i // per_dir}/file{i}.txt\ndata {len(content)}\n{content}\n")
+    git(path, "fast-import", "--quiet", input="".join(stream).encode())
+    git(path, "checkout", "-q", "-f", "master")
+
+
+def prepare(path, files, changes, assets, asset_mb, per_dir=1000):
+    """
+    修改部分檔案並加入未追蹤的大型二進位檔案，模擬實際工作中的工作目錄。
+
+    返回:
+    return (list of str): 修改的檔案路徑，即要提交的路徑。
+    """
+    step = max(1, files // changes)
+    changed = [f"dir{i // per_dir}/file{i}.txt" for i in range(0, files, step)][:changes]
+    for name in changed:
+        with open(os.path.join(path, name), "a") as f:
+            f.write("changed\n")
+    os.makedirs(os.path.join(path, "assets"), exist_ok=True)
+    for i in range(assets):
+        with open(os.path.join(path, "assets", f"asset{i}.bin"), "wb") as f:
+            f.write(os.urandom(asset_mb * 1024 * 1024))
+    return changed
+
+
+def restore(path, base):
+    """
+    恢復到測試前的狀態：移除提交、還原修改並刪除未追蹤的檔案。
+    """
+    git(path, "reset", "-q", "--hard", base)
+    git(path, "clean", "-q", "-f", "-d")
+
+
+def timed(func):
+    """
+    執行一次函數並返回耗時（毫秒）。
+    """
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="選擇性暫存與 git add . 的提交時間基準測試")
+    parser.add_argument("--files", type=int, default=100000, help="工作目錄中的檔案數量")
+    parser.add_argument("--changes", type=int, default=20, help="每次提交修改的檔案數量")
+    parser.add_argument("--assets", type=int, default=4, help="未追蹤的大型二進位檔案數量")
+    parser.add_argument("--asset-mb", type=int, default=32, help="每個二進位檔案的大小（MB）")
+    parser.add_argument("--repeat", type=int, default=3, help="重複的次數")
+    parser.add_argument("--untracked-cache", action="store_true", help="啟用 core.untrackedCache")
+    parser.add_argument("--fsmonitor", action="store_true", help="啟用內建的 core.fsmonitor（需要 Git 支援）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        start = time.perf_counter()
+        make_tree(repo, args.files)
+        print(f"測試倉庫：{args.files} 個檔案，建立耗時 {time.perf_counter() - start:.1f} 秒")
+        git(repo, "config", "user.name", "Bench")
+        git(repo, "config", "user.email", "bench@example.com")
+        if args.untracked_cache:
+            git(repo, "config", "core.untrackedCache", "true")
+        if args.fsmonitor:
+            git(repo, "config", "core.fsmonitor", "true")
+        base = git(repo, "rev-parse", "HEAD")
+        # 第一次 status 寫入快取與 index 的狀態資訊，之後的測試都從相同的狀態開始
+        git(repo, "status", "--porcelain")
+
+        prepare(repo, args.files, args.changes, args.assets, args.asset_mb)
+        status_ms = timed(lambda: read_changes(repo))
+        print(f"git status --porcelain -z：{status_ms:8.1f} ms，{len(read_changes(repo))} 個變更")
+        restore(repo, base)
+
+        shell = {"shell": True} if os.name == "nt" else {"shell": True, "executable": "/bin/bash"}
+        cases = [
+            ("git add . && git commit", lambda paths: subprocess.run(
+                "git add . && git commit -q -m bench", cwd=repo, check=True, capture_output=True, **shell)),
+            ("選擇性暫存（只暫存修改的檔案）", lambda paths: commit_selected(set(paths), "bench", cwd=repo)),
+        ]
+        for name, commit in cases:
+            samples = []
+            for _ in range(args.repeat):
+                paths = prepare(repo, args.files, args.changes, args.assets, args.asset_mb)
+                samples.append(timed(lambda: commit(paths)))
+                committed = git(repo, "diff-tree", "--no-commit-id", "--name-only", "-r", "HEAD").splitlines()
+                restore(repo, base)
+            samples.sort()
+            print(f"{name:<32} 中位數 {samples[len(samples) // 2]:9.1f} ms   提交 {len(committed)} 個檔案")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# 測量主視窗的啟動時間：從啟動 Python 到主視窗第一次繪製的時間，以及當時的記憶體用量
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchUtils import make_repo
+
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# 在新的行程中執行：匯入主程式、建立主視窗，並在第一次繪製時回報結果
+CHILD_SCRIPT = r"""
+import json, os, sys, time
+sys.path.insert(0, os.environ["BENCH_PACKAGE_DIR"])
+spawned = float(os.environ["BENCH_SPAWNED"])
+if os.environ.get("BENCH_EAGER"):
+    # 模擬在啟動時就匯入分支圖表相關模組
+    import commitGraphView, batchQueueView, repoDashboard, gitAncestry
+from PySide6.QtCore import QObject, QEvent, QTimer
+from PySide6.QtWidgets import QApplication
+import gitFlow
+import_ms = (time.time() - spawned) * 1000
+
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 為單位，macOS 以 byte 為單位
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+class FirstPaint(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint and not hasattr(self, "result"):
+            self.result = {"import_ms": import_ms, "paint_ms": (time.time() - spawned) * 1000,
+                           "rss_mb": max_rss_mb(), "graph_loaded": "commitGraphView" in sys.modules}
+            QTimer.singleShot(0, app.quit)
+        return False
+
+app = QApplication(sys.argv)
+window = gitFlow.GitManagerApp()
+watcher = FirstPaint()
+window.installEventFilter(watcher)
+window.show()
+app.exec()
+print(json.dumps(watcher.result))
+window.close()
+"""
+
+
+def run_once(repo, eager):
+    """
+    在新的行程中啟動一次主視窗。
+
+    參數:
+    repo (str): 作為工作目錄的測試倉庫。
+    eager (bool): 是否在啟動時就匯入分支圖表相關模組。
+
+    返回:
+    return (dict): 匯入完成與第一次繪製的時間（毫秒）、最大常駐記憶體（MB），以及圖表模組是否已載入。
+    """
+    env = dict(os.environ, BENCH_PACKAGE_DIR=PACKAGE_DIR, BENCH_SPAWNED=repr(time.time()))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if eager:
+        env["BENCH_EAGER"] = "1"
+    result = subprocess.run([sys.executable, "-c", CHILD_SCRIPT], cwd=repo, env=env, capture_output=True, text=True,
+                            check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="主視窗啟動時間與記憶體的基準測試")
+    parser.add_argument("--repeat", type=int, default=10, help="每種模式啟動的次數")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as repo:
+        make_repo(repo, commits=200)
+        for eager, name in ((True, "啟動時匯入圖表模組"), (False, "延遲匯入")):
+            samples = [run_once(repo, eager) for _ in range(args.repeat)]
+            print(f"{name:<24} 匯入完成 {statistics.median(s['import_ms'] for s in samples):7.1f} ms   "
+                  f"第一次繪製 {statistics.median(s['paint_ms'] for s in samples):7.1f} ms   "
+                  f"記憶體 {statistics.median(s['rss_mb'] for s in samples):6.1f} MB   "
+                  f"圖表模組已載入 {any(s['graph_loaded'] for s in samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# 基準測試共用的輔助函數
+import subprocess
+import statistics
+import time
+
+
+def git(cwd, *args, input=None):
+    """
+    在指定目錄中執行 Git 命令並返回標準輸出。
+
+    參數:
+    cwd (str): 執行命令的目錄。
+    args (str): Git 命令的參數。
+    input (bytes, optional): 傳給標準輸入的資料。
+
+    返回:
+    return (str): 命令的標準輸出。
+    """
+    result = subprocess.run(["git", *args], cwd=cwd, input=input, capture_output=True, check=True)
+    return result.stdout.decode().strip()
+
+
+def make_repo(path, commits=1000, branches=10):
+    """
+    使用 `git fast-import` 快速建立一個含有多個分支與合併的測試倉庫。
+
+    參數:
+    path (str): 倉庫的路徑。
+    commits (int, optional): 要建立的 commit 數量，默認為 1000。
+    branches (int, optional): 要建立的分支數量，默認為 10。
+    """
+    git(path, "init", "-q", "-b", "master")
+    stream = []
+    for i in range(1, commits + 1):
+        # 每個分支輪流前進，並定期合併回 master
+        branch = "master" if i % branches == 0 else f"feature-{i % branches}"
+        stream.append(f"commit refs/heads/{branch}\nmark :{i}\n"
+                      f"committer Bench <bench@example.com> {1700000000 + i} +0000\n"
+                      f"data {len(str(i)) + 7}\ncommit {i}\n")
+        if i > branches:
+            stream.append(f"from :{i - branches}\n")
+            if branch == "master" and i > 2 * branches:
+                stream.append(f"merge :{i - 1}\n")
+        stream.append(f"M 644 inline file{i % 50}.txt\ndata {len(str(i))}\n{i}\n\n")
+    git(path, "fast-import", "--quiet", input="".join(stream).encode())
+    git(path, "checkout", "-q", "-f", "master")
+
+
+def measure(func, repeat):
+    """
+    重複執行函數並統計每次呼叫的耗時。
+
+    參數:
+    func (callable): 要測量的函數。
+    repeat (int): 重複次數。
+
+    返回:
+    return (dict): 平均值與中位數（毫秒）。
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"mean": statistics.mean(samples), "median": statistics.median(samples)}
+
+
+def report(name, stats):
+    """
+    輸出一行基準測試結果。
+
+    參數:
+    name (str): 測試項目名稱。
+    stats (dict): measure 的返回值。
+    """
+    print(f"{name:<40} 平均 {stats['mean']:8.2f} ms   中位數 {stats['median']:8.2f} ms")
@@ -0,0 +1,105 @@
+# 動畫按鈕的背景快取：陰影與圓角背景預先繪製成 QPixmap，動畫的每一幀只需要貼上
+from PySide6.QtCore import Qt, QMargins, QRectF, QSize
+from PySide6.QtGui import QColor, QImage, QPainter, QPixmap, QPixmapCache
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsPixmapItem, QGraphicsDropShadowEffect
+import math
+
+# 陰影的模糊半徑、Y 軸偏移與顏色，與原本的 QGraphicsDropShadowEffect 相同
+SHADOW_BLUR = 20
+SHADOW_OFFSET = 5
+SHADOW_COLOR = "#b0bec5"
+# 陰影超出按鈕本體的範圍（模糊半徑的一半，再加上放大動畫超出的部分）
+SHADOW_MARGIN = 12
+# 顏色與縮放的量化間隔：動畫中相近的值共用同一張快取，肉眼看不出差別
+COLOR_STEP = 4
+SCALE_STEP = 0.005
+
+
+def shadow_margins():
+    """
+    取得按鈕本體四周保留給陰影的邊界。陰影向下偏移，因此上方較窄、下方較寬。
+
+    返回:
+    return (QMargins): 左、上、右、下的邊界。
+    """
+    return QMargins(SHADOW_MARGIN, SHADOW_MARGIN - SHADOW_OFFSET, SHADOW_MARGIN, SHADOW_MARGIN + SHADOW_OFFSET)
+
+
+def _quantize_color(color):
+    """
+    將顏色的每個通道對齊到 COLOR_STEP 的倍數。
+    """
+    def channel(value):
+        return min(round(value / COLOR_STEP) * COLOR_STEP, 255)
+    return QColor(channel(color.red()), channel(color.green()), channel(color.blue()), channel(color.alpha()))
+
+
+def _render(face_size, radius, color, scale, ratio):
+    """
+    繪製一張含陰影的按鈕背景。陰影以 QGraphicsDropShadowEffect 在離屏場景中產生，
+    與直接套用在按鈕上的效果相同，但每個組合只需要模糊一次。
+    """
+    margins = shadow_margins()
+    width = face_size.width() + margins.left() + margins.right()
+    height = face_size.height() + margins.top() + margins.bottom()
+    device_size = QSize(math.ceil(width * ratio), math.ceil(height * ratio))
+
+    # 先以裝置像素繪製縮放後的圓角背景，縮放以按鈕本體的中心為基準
+    face = QImage(device_size, QImage.Format_ARGB32_Premultiplied)
+    face.fill(Qt.transparent)
+    painter = QPainter(face)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.scale(ratio, ratio)
+    painter.translate(margins.left() + face_size.width() / 2, margins.top() + face_size.height() / 2)
+    painter.scale(scale, scale)
+    painter.setBrush(color)
+    painter.setPen(Qt.NoPen)
+    painter.drawRoundedRect(QRectF(-face_size.width() / 2, -face_size.height() / 2,
+                                   face_size.width(), face_size.height()), radius, radius)
+    painter.end()
+
+    # 在離屏場景中加上陰影
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(face))
+    effect = QGraphicsDropShadowEffect()
+    effect.setBlurRadius(SHADOW_BLUR * ratio)
+    effect.setOffset(0, SHADOW_OFFSET * ratio)
+    effect.setColor(QColor(SHADOW_COLOR))
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+    scene.setSceneRect(QRectF(0, 0, device_size.width(), device_size.height()))
+    image = QImage(device_size, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    scene.render(painter, QRectF(image.rect()), scene.sceneRect())
+    painter.end()
+
+    pixmap = QPixmap.fromImage(image)
+    pixmap.setDevicePixelRatio(ratio)
+    return pixmap
+
+
+def button_pixmap(face_size, color, scale=1.0, radius=20, ratio=1.0):
+    """
+    取得含陰影的按鈕背景。結果以顏色與縮放的量化值為鍵存放在 QPixmapCache，
+    懸停與按下的動畫來回播放時，大部分的幀都直接使用快取，不必重新抗鋸齒與模糊。
+
+    參數:
+    face_size (QSize): 按鈕本體（不含陰影）的大小。
+    color (QColor): 背景顏色。
+    scale (float, optional): 按鈕本體的縮放比例，默認為 1.0。
+    radius (float, optional): 圓角半徑，默認為 20。
+    ratio (float, optional): 螢幕的裝置像素比，默認為 1.0。
+
+    返回:
+    return (QPixmap): 大小為按鈕本體加上 shadow_margins() 的圖片。
+    """
+    color = _quantize_color(color)
+    scale = round(scale / SCALE_STEP) * SCALE_STEP
+    key = (f"animated-button:{face_size.width()}x{face_size.height()}:{radius}:{color.rgba():08x}:"
+           f"{scale:.3f}:{ratio:g}")
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        pixmap = _render(face_size, radius, color, scale, ratio)
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
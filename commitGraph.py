@@ -0,0 +1,560 @@
+# 提交歷史圖表的資料結構與泳道（lane）佈局引擎
+from array import array
+from bisect import bisect_right
+
+
+def parse_log_line(line):
+    """
+    解析一行 `git log --pretty=format:'%H %P'` 的輸出。
+
+    參數:
+    line (str): 一行日誌輸出。
+
+    返回:
+    return (tuple or None): (commit 雜湊值, 父 commit 雜湊值列表)，空白行返回 None。
+    """
+    parts = line.split()
+    if not parts:
+        return None
+    return parts[0], parts[1:]
+
+
+class CommitStore:
+    """
+    以陣列儲存的精簡提交歷史。commit 雜湊值以二進位形式集中存放並對應到整數索引，
+    父 commit 的連結以 CSR（壓縮稀疏列）格式存放在 array 緩衝區中，
+    每個 commit 只需數十個位元組，一百萬筆歷史約佔數十 MB。
+
+    索引（index）是雜湊值第一次出現時分配的編號，父 commit 尚未載入時也會先分配索引；
+    列（row）則是 commit 被加入的順序，也就是圖表中由上到下的位置。
+
+    參數:
+    oid_size (int, optional): 雜湊值的位元組數，SHA-1 為 20，SHA-256 為 32，默認為 20。
+    """
+
+    # 雜湊表的初始大小，必須是 2 的次方
+    INITIAL_SLOTS = 1024
+
+    def __init__(self, oid_size=20):
+        self.oid_size = oid_size
+        # 依照索引排列的二進位雜湊值
+        self._oids = bytearray()
+        # 開放定址雜湊表，存放索引，-1 表示空位
+        self._table = array('i', [-1]) * self.INITIAL_SLOTS
+        self._mask = self.INITIAL_SLOTS - 1
+        # 索引與列之間的對應，尚未載入的 commit 列為 -1
+        self.row_of_index = array('i')
+        self.index_of_row = array('i')
+        # CSR 格式的父 commit 連結：第 row 列的父 commit 索引為
+        # parent_indices[parent_offsets[row]:parent_offsets[row + 1]]
+        self.parent_offsets = array('I', [0])
+        self.parent_indices = array('i')
+
+    def __len__(self):
+        return len(self.index_of_row)
+
+    def index_count(self):
+        """
+        返回已分配的索引數量（包含尚未載入的父 commit）。
+
+        返回:
+        return (int): 索引數量。
+        """
+        return len(self.row_of_index)
+
+    def _slot(self, oid):
+        """
+        找出雜湊值在雜湊表中的位置，雜湊值本身已是均勻分布，直接取前 8 個位元組。
+
+        參數:
+        oid (bytes): 二進位雜湊值。
+
+        返回:
+        return (int): 雜湊表中存放該雜湊值或應該存放它的空位位置。
+        """
+        size = self.oid_size
+        slot = int.from_bytes(oid[:8], "little") & self._mask
+        table = self._table
+        oids = self._oids
+        while True:
+            index = table[slot]
+            if index < 0 or oids[index * size:(index + 1) * size] == oid:
+                return slot
+            slot = (slot + 1) & self._mask
+
+    def lookup(self, oid):
+        """
+        查詢雜湊值對應的索引。
+
+        參數:
+        oid (bytes): 二進位雜湊值。
+
+        返回:
+        return (int): 索引，不存在時返回 -1。
+        """
+        return self._table[self._slot(oid)]
+
+    def intern(self, oid):
+        """
+        取得雜湊值的索引，不存在時分配新的索引。
+
+        參數:
+        oid (bytes): 二進位雜湊值。
+
+        返回:
+        return (int): 索引。
+        """
+        if not self._oids and len(oid) != self.oid_size:
+            # 第一個雜湊值決定倉庫使用的雜湊演算法長度
+            self.oid_size = len(oid)
+        slot = self._slot(oid)
+        index = self._table[slot]
+        if index >= 0:
+            return index
+        index = len(self.row_of_index)
+        self._oids += oid
+        self.row_of_index.append(-1)
+        self._table[slot] = index
+        if index * 2 >= len(self._table):
+            self._grow()
+        return index
+
+    def _grow(self):
+        """
+        將雜湊表擴大一倍並重新放入所有索引，保持負載率在一半以下。
+        """
+        self._table = array('i', [-1]) * (len(self._table) * 2)
+        self._mask = len(self._table) - 1
+        size = self.oid_size
+        for index in range(len(self.row_of_index)):
+            self._table[self._slot(bytes(self._oids[index * size:(index + 1) * size]))] = index
+
+    def add_commit(self, oid, parents):
+        """
+        加入下一列的 commit。
+
+        參數:
+        oid (bytes): commit 的二進位雜湊值。
+        parents (list of bytes): 父 commit 的二進位雜湊值列表。
+
+        返回:
+        return (int): 該 commit 所在的列，若已載入過則返回原本的列。
+        """
+        index = self.intern(oid)
+        if self.row_of_index[index] >= 0:
+            return self.row_of_index[index]
+        row = len(self.index_of_row)
+        self.row_of_index[index] = row
+        self.index_of_row.append(index)
+        for parent in parents:
+            self.parent_indices.append(self.intern(parent))
+        self.parent_offsets.append(len(self.parent_indices))
+        return row
+
+    def oid_bytes(self, index):
+        """
+        取得索引對應的二進位雜湊值。
+
+        參數:
+        index (int): 索引。
+
+        返回:
+        return (bytes): 二進位雜湊值。
+        """
+        size = self.oid_size
+        return bytes(self._oids[index * size:(index + 1) * size])
+
+    def oid(self, row):
+        """
+        取得某一列 commit 的十六進位雜湊值。
+
+        參數:
+        row (int): 列編號。
+
+        返回:
+        return (str): 十六進位雜湊值。
+        """
+        return self.oid_bytes(self.index_of_row[row]).hex()
+
+    def row_of(self, oid):
+        """
+        查詢十六進位雜湊值所在的列。
+
+        參數:
+        oid (str): 十六進位雜湊值。
+
+        返回:
+        return (int): 列編號，尚未載入時返回 -1。
+        """
+        index = self.lookup(bytes.fromhex(oid))
+        return self.row_of_index[index] if index >= 0 else -1
+
+    def parent_rows(self, row):
+        """
+        取得某一列 commit 的所有父 commit 所在的列。
+
+        參數:
+        row (int): 列編號。
+
+        返回:
+        return (list of int): 父 commit 的列，尚未載入的父 commit 為 -1。
+        """
+        return [self.row_of_index[index]
+                for index in self.parent_indices[self.parent_offsets[row]:self.parent_offsets[row + 1]]]
+
+    def is_ancestor(self, ancestor_row, descendant_row):
+        """
+        判斷一個 commit 是否為另一個 commit 的祖先（包含自己）。commit 依照拓撲順序加入時，
+        祖先一定在後代之後的列，因此走訪時可以略過比目標更後面的列。
+
+        參數:
+        ancestor_row (int): 可能是祖先的 commit 所在的列。
+        descendant_row (int): 可能是後代的 commit 所在的列。
+
+        返回:
+        return (bool): 是祖先時返回 True。
+        """
+        if ancestor_row == descendant_row:
+            return True
+        visited = bytearray(len(self))
+        stack = [descendant_row]
+        visited[descendant_row] = 1
+        while stack:
+            row = stack.pop()
+            for parent_row in self.parent_rows(row):
+                if parent_row == ancestor_row:
+                    return True
+                if 0 <= parent_row < ancestor_row and not visited[parent_row]:
+                    visited[parent_row] = 1
+                    stack.append(parent_row)
+        return False
+
+    def prepend(self, records):
+        """
+        將一批較新的 commit 放到最前面的列，原有的列依序往後移，用於合併快取之後新增的歷史。
+
+        參數:
+        records (list of tuple): 依照拓撲順序排列的 (二進位雜湊值, 父 commit 二進位雜湊值列表)。
+
+        返回:
+        return (int): 實際新增的 commit 數量。
+        """
+        new_rows = array('i')
+        new_offsets = array('I', [0])
+        new_parents = array('i')
+        for oid, parents in records:
+            index = self.intern(oid)
+            if self.row_of_index[index] != -1:
+                # 已經載入過或在這批中重複出現的 commit
+                continue
+            # 暫時標記為已加入，避免同一批中重複
+            self.row_of_index[index] = -2
+            new_rows.append(index)
+            for parent in parents:
+                new_parents.append(self.intern(parent))
+            new_offsets.append(len(new_parents))
+
+        shift = len(new_parents)
+        self.index_of_row = new_rows + self.index_of_row
+        self.parent_offsets = new_offsets + array('I', (offset + shift for offset in self.parent_offsets[1:]))
+        self.parent_indices = new_parents + self.parent_indices
+        # 重新計算索引對應的列
+        self.row_of_index = array('i', [-1]) * len(self.row_of_index)
+        for row, index in enumerate(self.index_of_row):
+            self.row_of_index[index] = row
+        return len(new_rows)
+
+    def state(self):
+        """
+        匯出所有內部陣列，供快取檔案儲存。
+
+        返回:
+        return (dict): 名稱對應到 array 或整數的字典。
+        """
+        return {"oid_size": self.oid_size, "oids": array('B', self._oids), "table": self._table,
+                "row_of_index": self.row_of_index, "index_of_row": self.index_of_row,
+                "parent_offsets": self.parent_offsets, "parent_indices": self.parent_indices}
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        從 state() 匯出的資料還原 CommitStore。
+
+        參數:
+        state (dict): state() 的返回值。
+
+        返回:
+        return (CommitStore): 還原後的提交歷史。
+        """
+        store = cls(state["oid_size"])
+        store._oids = bytearray(state["oids"])
+        store._table = state["table"]
+        store._mask = len(store._table) - 1
+        store.row_of_index = state["row_of_index"]
+        store.index_of_row = state["index_of_row"]
+        store.parent_offsets = state["parent_offsets"]
+        store.parent_indices = state["parent_indices"]
+        return store
+
+    def nbytes(self):
+        """
+        估計所有陣列緩衝區使用的記憶體。
+
+        返回:
+        return (int): 位元組數。
+        """
+        arrays = (self._table, self.row_of_index, self.index_of_row, self.parent_offsets, self.parent_indices)
+        return len(self._oids) + sum(len(a) * a.itemsize for a in arrays)
+
+
+class LaneLayout:
+    """
+    類似 `git log --graph` 的泳道佈局引擎，直接在 CommitStore 上運作。依照拓撲順序逐一加入 commit，
+    每個 commit 的泳道都在加入時決定，整體為線性時間。
+
+    屬性:
+    - store (CommitStore): 提交歷史。
+    - lanes (array): 每一列 commit 所在的泳道。
+    - edge_lanes, edge_parents (array): 每條邊經過的泳道與父 commit 的列（尚未載入時為 -1），
+      第 row 列發出的邊為 edge_offsets[row] 到 edge_offsets[row + 1]。
+    - width (int): 目前使用到的泳道數量。
+
+    參數:
+    store (CommitStore, optional): 已有的提交歷史，會立即為其中所有 commit 建立佈局。
+    """
+
+    # 邊的索引分段大小，用來快速找出跨越可見範圍的長邊
+    BUCKET_ROWS = 64
+
+    def __init__(self, store=None):
+        self.store = CommitStore() if store is None else store
+        self.lanes = array('H')
+        self.edge_offsets = array('I', [0])
+        self.edge_lanes = array('H')
+        self.edge_parents = array('i')
+        self.width = 0
+        # 每個泳道目前等待的父 commit 索引，-1 表示空閒
+        self._active = []
+        # 尚未載入的父 commit 索引對應到等待它的邊，每個元素為 (邊的索引, 子 commit 的列)
+        self._waiting = {}
+        # 每個分段中跨越該分段起點的長邊
+        self._buckets = {}
+        for row in range(len(self.store)):
+            self._place(row)
+
+    def __len__(self):
+        return len(self.lanes)
+
+    def oid(self, row):
+        """
+        取得某一列 commit 的十六進位雜湊值。
+
+        參數:
+        row (int): 列編號。
+
+        返回:
+        return (str): 十六進位雜湊值。
+        """
+        return self.store.oid(row)
+
+    def _free_lane(self):
+        """
+        取得最左邊的空閒泳道，沒有空閒泳道時新增一條。
+
+        返回:
+        return (int): 泳道編號。
+        """
+        for lane, expected in enumerate(self._active):
+            if expected < 0:
+                return lane
+        self._active.append(-1)
+        self.width = max(self.width, len(self._active))
+        return len(self._active) - 1
+
+    def add(self, oid, parents):
+        """
+        加入下一列的 commit。commit 應依照拓撲順序（子 commit 在父 commit 之前）加入。
+
+        參數:
+        oid (str): 十六進位的 commit 雜湊值。
+        parents (list of str): 十六進位的父 commit 雜湊值列表。
+
+        返回:
+        return (int): 該 commit 所在的列。
+        """
+        row = self.store.add_commit(bytes.fromhex(oid), [bytes.fromhex(parent) for parent in parents])
+        if row == len(self.lanes):
+            self._place(row)
+        return row
+
+    def _place(self, row):
+        """
+        為某一列的 commit 決定泳道，並建立它到父 commit 的邊。
+
+        參數:
+        row (int): 列編號，必須等於目前的列數。
+        """
+        store = self.store
+        edge_lanes = self.edge_lanes
+        edge_parents = self.edge_parents
+        waiting = self._waiting.pop(store.index_of_row[row], None)
+        if waiting:
+            # 已有泳道在等待這個 commit，選擇最左邊的泳道，其餘泳道在此匯合並釋放
+            for edge_id, child_row in waiting:
+                edge_parents[edge_id] = row
+                self._active[edge_lanes[edge_id]] = -1
+                if row // self.BUCKET_ROWS > child_row // self.BUCKET_ROWS:
+                    self._index_edge(edge_id, child_row, row)
+            lane = min(edge_lanes[edge_id] for edge_id, _ in waiting)
+        else:
+            # 沒有泳道在等待，表示這是某個分支的最新 commit，放在最左邊的空閒泳道
+            lane = self._free_lane()
+        self.lanes.append(lane)
+
+        start, end = store.parent_offsets[row], store.parent_offsets[row + 1]
+        for position in range(start, end):
+            parent = store.parent_indices[position]
+            parent_row = store.row_of_index[parent]
+            if 0 <= parent_row < row:
+                # 父 commit 出現在更早的列（非拓撲順序的輸出），只記錄這條邊而不佔用泳道
+                edge_lanes.append(lane)
+                edge_parents.append(parent_row)
+                continue
+            if position == start:
+                # 第一個父 commit 延續目前的泳道，若其他泳道也在等待它，會在父 commit 處匯合
+                transit = lane
+            elif parent in self._waiting:
+                # 其他泳道已經在等待這個合併進來的父 commit，沿用該泳道
+                transit = edge_lanes[self._waiting[parent][0][0]]
+            else:
+                # 合併進來的其他父 commit 使用新的泳道
+                transit = self._free_lane()
+            self._active[transit] = parent
+            self._waiting.setdefault(parent, []).append((len(edge_lanes), row))
+            edge_lanes.append(transit)
+            edge_parents.append(-1)
+        self.edge_offsets.append(len(edge_lanes))
+
+    def state(self):
+        """
+        匯出佈局結果與繼續加入 commit 所需的內部狀態，供快取檔案儲存。
+
+        返回:
+        return (dict): 名稱對應到 array 或整數的字典。
+        """
+        waiting_parents, waiting_edges, waiting_children = array('i'), array('i'), array('i')
+        for parent, waiting in self._waiting.items():
+            for edge_id, child_row in waiting:
+                waiting_parents.append(parent)
+                waiting_edges.append(edge_id)
+                waiting_children.append(child_row)
+        bucket_keys, bucket_offsets, bucket_edges = array('i'), array('I', [0]), array('I')
+        for bucket, edge_ids in self._buckets.items():
+            bucket_keys.append(bucket)
+            bucket_edges.extend(edge_ids)
+            bucket_offsets.append(len(bucket_edges))
+        return {"width": self.width, "lanes": self.lanes, "edge_offsets": self.edge_offsets,
+                "edge_lanes": self.edge_lanes, "edge_parents": self.edge_parents,
+                "active": array('i', self._active), "waiting_parents": waiting_parents,
+                "waiting_edges": waiting_edges, "waiting_children": waiting_children,
+                "bucket_keys": bucket_keys, "bucket_offsets": bucket_offsets, "bucket_edges": bucket_edges}
+
+    @classmethod
+    def from_state(cls, store, state):
+        """
+        從 state() 匯出的資料還原佈局，不需要重新計算。
+
+        參數:
+        store (CommitStore): 佈局所對應的提交歷史。
+        state (dict): state() 的返回值。
+
+        返回:
+        return (LaneLayout): 還原後的佈局。
+        """
+        layout = cls()
+        layout.store = store
+        layout.width = state["width"]
+        layout.lanes = state["lanes"]
+        layout.edge_offsets = state["edge_offsets"]
+        layout.edge_lanes = state["edge_lanes"]
+        layout.edge_parents = state["edge_parents"]
+        layout._active = list(state["active"])
+        for parent, edge_id, child_row in zip(state["waiting_parents"], state["waiting_edges"],
+                                              state["waiting_children"]):
+            layout._waiting.setdefault(parent, []).append((edge_id, child_row))
+        offsets = state["bucket_offsets"]
+        for position, bucket in enumerate(state["bucket_keys"]):
+            layout._buckets[bucket] = state["bucket_edges"][offsets[position]:offsets[position + 1]]
+        return layout
+
+    def edge_child(self, edge_id):
+        """
+        取得邊的子 commit 所在的列。
+
+        參數:
+        edge_id (int): 邊的索引。
+
+        返回:
+        return (int): 列編號。
+        """
+        return bisect_right(self.edge_offsets, edge_id) - 1
+
+    def _index_edge(self, edge_id, child_row, parent_row):
+        """
+        將跨越多個分段的長邊加入分段索引。
+
+        參數:
+        edge_id (int): 邊的索引。
+        child_row (int): 子 commit 的列。
+        parent_row (int): 父 commit 的列。
+        """
+        for bucket in range(child_row // self.BUCKET_ROWS + 1, parent_row // self.BUCKET_ROWS + 1):
+            self._buckets.setdefault(bucket, array('I')).append(edge_id)
+
+    def edges_in_rows(self, first, last):
+        """
+        找出所有需要在第 first 到第 last 列之間繪製的邊，只檢查可見範圍附近的資料。
+
+        參數:
+        first (int): 可見範圍的第一列。
+        last (int): 可見範圍的最後一列。
+
+        返回:
+        return (list of tuple): 每條邊為 (子 commit 的列, 經過的泳道, 父 commit 的列)。
+        """
+        if not self.lanes:
+            return []
+        last = min(last, len(self.lanes) - 1)
+        bucket = first // self.BUCKET_ROWS
+        bucket_start = bucket * self.BUCKET_ROWS
+        edges = []
+        # 從所在分段的起點開始出發的邊
+        for row in range(bucket_start, last + 1):
+            for edge_id in range(self.edge_offsets[row], self.edge_offsets[row + 1]):
+                edges.append((row, self.edge_lanes[edge_id], self.edge_parents[edge_id]))
+        # 在更早的分段出發並跨越此分段起點的邊，以及父 commit 尚未載入、仍在延伸中的邊
+        distant = [(edge_id, self.edge_child(edge_id)) for edge_id in self._buckets.get(bucket, ())]
+        for waiting in self._waiting.values():
+            distant.extend(waiting)
+        for edge_id, child_row in distant:
+            if child_row < bucket_start:
+                edges.append((child_row, self.edge_lanes[edge_id], self.edge_parents[edge_id]))
+        return edges
+
+
+def build_layout(lines):
+    """
+    從 `git log --pretty=format:'%H %P'` 的輸出行建立泳道佈局。
+
+    參數:
+    lines (iterable of str): 日誌輸出的每一行。
+
+    返回:
+    return (LaneLayout): 建立好的佈局。
+    """
+    layout = LaneLayout()
+    for line in lines:
+        record = parse_log_line(line)
+        if record:
+            layout.add(*record)
+    return layout
@@ -0,0 +1,554 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import QAbstractScrollArea, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton
+from PySide6.QtCore import Qt, QPointF, Signal
+from PySide6.QtGui import QColor, QPainter, QPen, QBrush, QFont, QPainterPath
+
+from commitGraph import LaneLayout
+from gitExecutor import GitCommandExecutor
+from gitAncestry import shared_ancestry
+from gitLogStream import GitLogStreamer, NativeLogStreamer
+from gitObjectDb import shared_database
+from graphCache import git_dir, read_ref_tips, cache_path, load_graph_cache, save_graph_cache, GraphCacheEntry
+
+# 每一列的高度與每條泳道的寬度（像素）
+ROW_HEIGHT = 22
+LANE_WIDTH = 16
+# commit 節點的半徑
+NODE_RADIUS = 4
+# 泳道使用的顏色，依照泳道編號循環使用
+LANE_COLORS = ["#2C662D", "#1E88E5", "#E53935", "#8E24AA", "#FB8C00", "#00897B", "#6D4C41", "#C0CA33"]
+
+
+class CommitGraphView(QAbstractScrollArea):
+    """
+    自行繪製的提交歷史圖表元件，只繪製目前可見的列，因此十萬筆以上的歷史也能流暢捲動。
+
+    參數:
+    parent (QWidget, optional): 父級窗口，默認為 None。
+
+    訊號:
+    - commitActivated (str): 使用者雙擊某個 commit 時發出，內容為 commit 雜湊值。
+    """
+    commitActivated = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # 目前顯示的泳道佈局
+        self.graph_layout = None
+        self.viewport().setStyleSheet("background-color: white;")
+        self.setFont(QFont("Consolas", 10))
+        self._pens = [QPen(QColor(color), 2) for color in LANE_COLORS]
+        self._brushes = [QBrush(QColor(color)) for color in LANE_COLORS]
+
+    def set_graph_layout(self, graph_layout):
+        """
+        設定要顯示的泳道佈局並重新繪製。
+
+        參數:
+        graph_layout (LaneLayout): 泳道佈局。
+        """
+        self.graph_layout = graph_layout
+        self.layout_changed()
+
+    def layout_changed(self):
+        """
+        在佈局新增列之後更新捲軸範圍並重新繪製。
+        """
+        rows = len(self.graph_layout) if self.graph_layout is not None else 0
+        width = self.graph_layout.width if self.graph_layout is not None else 0
+        self.verticalScrollBar().setPageStep(self.viewport().height())
+        self.verticalScrollBar().setSingleStep(ROW_HEIGHT)
+        self.verticalScrollBar().setRange(0, max(0, rows * ROW_HEIGHT - self.viewport().height()))
+        self.horizontalScrollBar().setPageStep(self.viewport().width())
+        self.horizontalScrollBar().setRange(0, max(0, (width + 8) * LANE_WIDTH - self.viewport().width()))
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        """
+        視窗大小改變時重新計算捲軸範圍。
+
+        參數:
+        event (QResizeEvent): 大小改變事件。
+        """
+        super().resizeEvent(event)
+        self.layout_changed()
+
+    def visible_rows(self):
+        """
+        計算目前可見的列範圍。
+
+        返回:
+        return (tuple): (第一列, 最後一列)。
+        """
+        top = self.verticalScrollBar().value()
+        first = top // ROW_HEIGHT
+        last = (top + self.viewport().height()) // ROW_HEIGHT
+        return first, last
+
+    def _point(self, row, lane):
+        """
+        將列與泳道轉換為畫面上的座標（尚未扣除捲動位移）。
+        """
+        return QPointF(lane * LANE_WIDTH + LANE_WIDTH / 2, row * ROW_HEIGHT + ROW_HEIGHT / 2)
+
+    def paintEvent(self, event):
+        """
+        只繪製可見範圍內的邊、節點與 commit 雜湊值。
+
+        參數:
+        event (QPaintEvent): 繪製事件對象。
+        """
+        if self.graph_layout is None or len(self.graph_layout) == 0:
+            return
+        graph = self.graph_layout
+        first, last = self.visible_rows()
+        last = min(last, len(graph) - 1)
+
+        painter = QPainter(self.viewport())
+        painter.setRenderHint(QPainter.Antialiasing)
+        # 依照捲軸位置平移畫布
+        painter.translate(-self.horizontalScrollBar().value(), -self.verticalScrollBar().value())
+
+        # 繪製邊：子 commit → 經過的泳道 → 父 commit
+        painter.setBrush(Qt.NoBrush)
+        for child_row, transit, parent_row in graph.edges_in_rows(first, last):
+            if 0 <= parent_row < child_row:
+                # 非拓撲順序造成的反向邊不繪製
+                continue
+            path = QPainterPath(self._point(child_row, graph.lanes[child_row]))
+            if parent_row == child_row + 1:
+                path.lineTo(self._point(parent_row, graph.lanes[parent_row]))
+            else:
+                path.lineTo(self._point(child_row + 1, transit))
+                if parent_row < 0:
+                    # 父 commit 尚未載入，延伸到可見範圍的底部
+                    path.lineTo(self._point(max(last, child_row) + 1, transit))
+                else:
+                    path.lineTo(self._point(parent_row - 1, transit))
+                    path.lineTo(self._point(parent_row, graph.lanes[parent_row]))
+            painter.setPen(self._pens[transit % len(self._pens)])
+            painter.drawPath(path)
+
+        # 繪製 commit 節點與縮寫的雜湊值
+        text_x = (graph.width + 1) * LANE_WIDTH
+        painter.setPen(Qt.NoPen)
+        for row in range(first, last + 1):
+            lane = graph.lanes[row]
+            painter.setBrush(self._brushes[lane % len(self._brushes)])
+            painter.drawEllipse(self._point(row, lane), NODE_RADIUS, NODE_RADIUS)
+        painter.setPen(QColor("#2C662D"))
+        for row in range(first, last + 1):
+            painter.drawText(text_x, row * ROW_HEIGHT, 400, ROW_HEIGHT, Qt.AlignVCenter, graph.oid(row)[:10])
+        painter.end()
+
+    def row_at(self, y):
+        """
+        取得畫面 y 座標所在的列。
+
+        參數:
+        y (int): 視窗內的 y 座標。
+
+        返回:
+        return (int): 列編號，超出範圍時返回 -1。
+        """
+        row = (y + self.verticalScrollBar().value()) // ROW_HEIGHT
+        if self.graph_layout is None or row >= len(self.graph_layout):
+            return -1
+        return row
+
+    def mouseDoubleClickEvent(self, event):
+        """
+        雙擊某一列時發出 commitActivated 訊號。
+
+        參數:
+        event (QMouseEvent): 滑鼠事件。
+        """
+        row = self.row_at(int(event.position().y()))
+        if row >= 0:
+            self.commitActivated.emit(self.graph_layout.oid(row))
+        super().mouseDoubleClickEvent(event)
+
+
+class CommitGraphWindow(QDialog):
+    """
+    分支圖表視窗。以串流方式載入提交歷史，先顯示第一個畫面，
+    使用者捲動到接近底部時再載入更早的歷史。
+
+    解析後的歷史與佈局會連同當時的 ref 端點一起快取在 .git 目錄下。再次開啟時，
+    若 ref 沒有改變就直接使用快取；若有改變，只讀取新增的 commit 並合併進快取。
+    按下「重新整理」時也以相同方式只讀取新增或移動的 ref 端點上尚未載入的 commit。
+
+    視窗可以重複使用：關閉時只是隱藏並停止讀取，再次以 resume 顯示時沿用已載入的佈局，
+    只讀取關閉期間新增的 commit，不會每次開啟都建立新的視窗與佈局。
+
+    參數:
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    executor (GitCommandExecutor, optional): 檢視 commit 變更時使用的執行器，默認為視窗自己的執行器。
+    """
+
+    # git log 的輸出格式：每行輸出 commit 與其父 commit 的雜湊值
+    LOG_FORMAT = "--pretty=format:%H %P"
+    # 每次捲動到接近底部時多載入的列數
+    PAGE_ROWS = 2000
+    # 讀取新增 commit 時不設上限
+    UNLIMITED_ROWS = 2 ** 62
+    # 是否允許直接讀取 .git 目錄的物件資料庫來載入歷史
+    NATIVE_BACKEND = True
+
+    def __init__(self, parent=None, cwd=None, executor=None):
+        super().__init__(parent)
+        self.cwd = cwd
+        self.executor = executor if executor is not None else GitCommandExecutor(self)
+        self.setWindowTitle("分支圖表")
+        self.resize(800, 600)
+
+        # 圖表元件、狀態列與重新整理按鈕
+        self.graph_view = CommitGraphView(self)
+        self.status_label = QLabel("載入中...", self)
+        self.status_label.setStyleSheet("color: #2C662D; font-size: 12px;")
+        self.refresh_button = QPushButton("重新整理", self)
+        self.refresh_button.clicked.connect(self.refresh)
+        # 雙擊選擇 commit 後可以檢視它的變更
+        self.diff_button = QPushButton("顯示變更", self)
+        self.diff_button.setEnabled(False)
+        self.diff_button.clicked.connect(self.show_commit_diff)
+        self.selected_oid = None
+        status_layout = QHBoxLayout()
+        status_layout.addWidget(self.status_label, 1)
+        status_layout.addWidget(self.diff_button)
+        status_layout.addWidget(self.refresh_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.graph_view)
+        layout.addLayout(status_layout)
+
+        self.graph_layout = LaneLayout()
+        self.graph_view.set_graph_layout(self.graph_layout)
+        self.streamer = None
+        self._complete = False
+        # 快取檔案路徑、目前的 ref 端點，以及串流載入的起點與已載入的列數
+        self.cache_file = None
+        self.tips = []
+        self.base_tips = []
+        self.base_rows = 0
+        # 從快取或上次載入之後新增的 commit 與讀取時的 ref 端點，合併完成前不會寫回快取
+        self._new_records = None
+        self._new_tips = None
+        self._dirty = False
+        # 捲動時檢查是否需要載入更多歷史
+        self.graph_view.verticalScrollBar().valueChanged.connect(self.check_load_more)
+        # 雙擊 commit 時顯示它與目前分支的關係
+        self.graph_view.commitActivated.connect(self.show_commit_relation)
+        self.graph_view.commitActivated.connect(self.select_commit)
+
+    def load(self):
+        """
+        載入提交歷史：優先使用快取，ref 改變時只讀取新增的 commit，沒有快取時從頭串流載入。
+        """
+        try:
+            self.cache_file = cache_path(git_dir(self.cwd))
+            tips = read_ref_tips(self.cwd)
+        except RuntimeError as e:
+            self.load_failed(str(e))
+            return
+
+        cache = load_graph_cache(self.cache_file)
+        if cache is None:
+            # 沒有快取，從所有 ref 開始串流載入
+            self.tips = self.base_tips = tips
+            self.start_base_stream()
+            return
+
+        self.set_graph_layout(cache.layout)
+        self.status_label.setText(f"已從快取載入 {len(cache.layout)} 個 commit")
+        self.tips = cache.tips
+        self.base_tips = cache.base_tips
+        self.base_rows = cache.base_rows
+        self._complete = cache.complete
+        if tips != self.tips:
+            # ref 有改變，只讀取從新端點可到達、但從快取端點無法到達的 commit
+            self.fetch_new_commits(tips)
+        elif self._complete:
+            self.load_finished()
+        else:
+            # 快取只包含部分歷史，繼續串流載入剩下的部分
+            self.start_base_stream()
+
+    def resume(self):
+        """
+        再次顯示視窗時呼叫：尚未載入時從頭載入，否則只讀取關閉期間新增的 commit，
+        並繼續關閉時被中斷的歷史載入。
+        """
+        if self.cache_file is None:
+            self.load()
+            return
+        self.refresh()
+        if self.streamer is None and not self._complete:
+            self.start_base_stream()
+
+    def set_graph_layout(self, graph_layout):
+        """
+        更換視窗顯示的佈局。
+
+        參數:
+        graph_layout (LaneLayout): 新的佈局。
+        """
+        self.graph_layout = graph_layout
+        self.graph_view.set_graph_layout(graph_layout)
+
+    def start_base_stream(self):
+        """
+        從串流起點繼續載入歷史，跳過已經載入的列數。
+        """
+        if not self.base_tips:
+            # 倉庫中還沒有任何 commit
+            self.load_finished()
+            return
+        self.streamer = self.create_streamer(self.base_tips, skip=self.base_rows)
+        self.streamer.recordsReady.connect(self.add_records)
+        self.streamer.finished.connect(self.load_finished)
+        self.streamer.failed.connect(self.load_failed)
+        # 已載入的列數足夠填滿畫面時先不讀取，等使用者捲動時再繼續
+        self.streamer.start(max(0, self.PAGE_ROWS - len(self.graph_layout)))
+
+    def create_streamer(self, include, exclude=(), skip=0):
+        """
+        建立讀取提交歷史的串流讀取器。倉庫有 commit-graph 時直接讀取 .git 目錄，
+        不必解壓縮 commit 物件，速度與 `git log` 相當且不必啟動行程；否則使用 `git log`。
+
+        參數:
+        include (list of str): 起點的雜湊值。
+        exclude (list of str, optional): 要排除的起點。
+        skip (int, optional): 略過最前面的 commit 數量。
+
+        返回:
+        return (GitLogStreamer): 尚未啟動的串流讀取器。
+        """
+        database = shared_database(self.cwd) if self.NATIVE_BACKEND else None
+        if database is not None and database.commit_graph() is not None:
+            return NativeLogStreamer(database, include, exclude, skip, parent=self)
+        # 以 ^<雜湊值> 排除已知端點可到達的 commit（舊版 Git 的 --stdin 不支援 --not）
+        stdin_data = "\n".join(list(include) + ["^" + tip for tip in exclude]) + "\n"
+        return GitLogStreamer([self.LOG_FORMAT, f"--skip={skip}", "--stdin"], cwd=self.cwd,
+                              stdin_data=stdin_data, parent=self)
+
+    def show_commit_relation(self, oid):
+        """
+        在狀態列顯示 commit 與 HEAD 的關係：是否已包含在目前分支中，或領先、落後目前分支多少個 commit。
+        只在倉庫有 commit-graph 時計算，查詢只走訪分歧的歷史，不會卡住介面。
+
+        參數:
+        oid (str): commit 雜湊值。
+        """
+        database = shared_database(self.cwd) if self.NATIVE_BACKEND else None
+        ancestry = shared_ancestry(self.cwd) if database is not None and database.commit_graph() is not None else None
+        if ancestry is None:
+            self.status_label.setText(f"commit {oid[:7]}")
+            return
+        try:
+            if ancestry.is_ancestor(oid, "HEAD"):
+                self.status_label.setText(f"commit {oid[:7]} 已包含在目前分支中")
+                return
+            ahead, behind = ancestry.ahead_behind(oid, "HEAD")
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        self.status_label.setText(f"commit {oid[:7]} 領先目前分支 {ahead} 個 commit，落後 {behind} 個 commit")
+
+    def select_commit(self, oid):
+        """
+        記錄雙擊選擇的 commit，讓「顯示變更」按鈕可以使用。
+
+        參數:
+        oid (str): commit 雜湊值。
+        """
+        self.selected_oid = oid
+        self.diff_button.setEnabled(True)
+
+    def show_commit_diff(self):
+        """
+        顯示選擇的 commit 與它第一個父 commit 之間的變更。
+        """
+        if self.selected_oid is None:
+            return
+        from diffView import DiffViewerDialog
+        from gitDiff import DiffSource
+        dialog = DiffViewerDialog(self.executor, DiffSource(self.selected_oid), f"commit {self.selected_oid[:7]} 的變更",
+                                  cwd=self.cwd, parent=self)
+        dialog.exec()
+        dialog.deleteLater()
+
+    def refresh(self):
+        """
+        重新讀取 ref 端點，只載入新增或移動的端點上尚未載入的 commit，
+        讓 fetch 或 commit 之後的重新整理只與新增的 commit 數量有關。
+        """
+        if self.cache_file is None or self._new_records is not None or not self.isVisible():
+            # 尚未開始載入、上一次的新增 commit 還在讀取中，或視窗已隱藏（再次顯示時由 resume 讀取）
+            return
+        try:
+            tips = read_ref_tips(self.cwd)
+        except RuntimeError as e:
+            self.status_label.setText(f"無法讀取 ref：{e}")
+            return
+        if tips == self.tips:
+            self.status_label.setText(f"沒有新的 commit，共 {len(self.graph_layout)} 個 commit")
+            return
+        self.fetch_new_commits(tips)
+
+    def fetch_new_commits(self, tips):
+        """
+        讀取從新的 ref 端點可到達、但從已知端點無法到達的 commit，已知端點是上次載入時的 ref
+        以及串流載入的起點，從它們可到達的 commit 不是已經載入，就是之後會由串流依序載入。
+
+        參數:
+        tips (list of str): 目前所有 ref 指向的物件。
+        """
+        store = self.graph_layout.store
+        # 只有尚未載入的端點需要走訪，指回已載入 commit 的端點（例如 reset 或刪除分支）不必讀取
+        new_tips = [tip for tip in tips if store.row_of(tip) < 0]
+        if not new_tips:
+            self.tips = tips
+            self._dirty = True
+            self.status_label.setText(f"沒有新的 commit，共 {len(self.graph_layout)} 個 commit")
+            return
+
+        if self.streamer is not None:
+            # 暫停從串流起點載入更早的歷史，先取出已讀到的記錄，合併後再從目前的列數繼續
+            self.streamer.stop()
+            self.add_records()
+            self.streamer = None
+        self._new_records = []
+        self._new_tips = tips
+        self.refresh_button.setEnabled(False)
+        self.status_label.setText("正在讀取新增的 commit...")
+        known_tips = sorted(set(self.tips) | set(self.base_tips if not self._complete else []))
+        self.streamer = self.create_streamer(new_tips, exclude=known_tips)
+        self.streamer.recordsReady.connect(self.collect_new_records)
+        self.streamer.finished.connect(self.merge_new_commits)
+        self.streamer.failed.connect(self.rebuild)
+        self.streamer.start(self.UNLIMITED_ROWS)
+
+    def collect_new_records(self):
+        """
+        暫存讀到的新增 commit，等全部讀完後再一次合併。
+        """
+        self._new_records.extend(self.streamer.take_records())
+
+    def merge_new_commits(self):
+        """
+        將新增的 commit 放到圖表最上方，並以線性時間重新計算佈局。
+        """
+        store = self.graph_layout.store
+        store.prepend([(bytes.fromhex(oid), [bytes.fromhex(parent) for parent in parents])
+                       for oid, parents in self._new_records])
+        self._new_records = None
+        self.tips, self._new_tips = self._new_tips, None
+        self._dirty = True
+        self.refresh_button.setEnabled(True)
+        self.set_graph_layout(LaneLayout(store))
+        self.status_label.setText(f"已載入 {len(self.graph_layout)} 個 commit，捲動以載入更多")
+        if self._complete:
+            self.load_finished()
+        else:
+            self.start_base_stream()
+
+    def rebuild(self, error=None):
+        """
+        快取無法合併（例如快取中的 commit 已被清除）時捨棄快取，從頭載入。
+
+        參數:
+        error (str, optional): 合併失敗的錯誤訊息。
+        """
+        self._new_records = None
+        self.tips, self._new_tips = self._new_tips, None
+        self.refresh_button.setEnabled(True)
+        self._complete = False
+        self.base_tips = self.tips
+        self.base_rows = 0
+        self.set_graph_layout(LaneLayout())
+        self.start_base_stream()
+
+    def add_records(self):
+        """
+        取出串流讀取器新解析的 commit，加入佈局並更新畫面。
+        """
+        if self.sender() not in (None, self.streamer):
+            # 重新整理前已停止的串流讀取器，其記錄已在停止時取出
+            return
+        records = self.streamer.take_records()
+        self.base_rows += len(records)
+        for oid, parents in records:
+            self.graph_layout.add(oid, parents)
+        self._dirty = True
+        self.graph_view.layout_changed()
+        self.status_label.setText(f"已載入 {len(self.graph_layout)} 個 commit，捲動以載入更多")
+
+    def check_load_more(self, value=None):
+        """
+        使用者捲動到距離底部不到兩頁時，要求再載入一頁歷史。
+
+        參數:
+        value (int, optional): 捲軸位置，由 valueChanged 訊號傳入。
+        """
+        if self.streamer is None or self._complete or self._new_records is not None:
+            return
+        first, last = self.graph_view.visible_rows()
+        if last + 2 * (last - first + 1) >= len(self.graph_layout):
+            self.streamer.request_more(self.PAGE_ROWS)
+
+    def load_finished(self):
+        """
+        所有歷史都已載入時更新狀態列。
+        """
+        if not self._complete:
+            self._complete = True
+            self._dirty = True
+        if len(self.graph_layout) == 0:
+            # 如果無法獲取分支圖表數據，顯示錯誤訊息
+            self.status_label.setText("無法取得分支圖表資料。")
+        else:
+            self.status_label.setText(f"共 {len(self.graph_layout)} 個 commit")
+
+    def load_failed(self, error):
+        """
+        git log 失敗時在狀態列顯示錯誤訊息。
+
+        參數:
+        error (str): 錯誤訊息。
+        """
+        self._complete = True
+        self._dirty = False
+        self.status_label.setText(f"無法取得分支圖表資料：{error}")
+
+    def save_cache(self):
+        """
+        將目前的歷史與佈局寫入快取。新增的 commit 尚未合併完成時不寫入，避免快取與 ref 不一致。
+        """
+        if not self._dirty or self._new_records is not None or self.cache_file is None:
+            return
+        entry = GraphCacheEntry(self.graph_layout, self.tips, self.base_tips, self.base_rows, self._complete)
+        try:
+            save_graph_cache(self.cache_file, entry)
+            self._dirty = False
+        except OSError:
+            # 快取只用於加速，寫入失敗時不影響使用
+            pass
+
+    def done(self, result):
+        """
+        關閉視窗時停止讀取並結束 Git 行程，並將載入的歷史寫入快取。視窗只是隱藏，
+        已載入的佈局保留給下次 resume 使用；尚未取出的記錄會在繼續載入時從 base_rows 重新讀取。
+
+        參數:
+        result (int): 對話框的結果代碼。
+        """
+        if self.streamer is not None:
+            self.streamer.stop()
+            self.streamer = None
+            if self._new_records is not None:
+                # 新增 commit 的讀取被中斷，下次開啟時重新讀取
+                self._new_records = self._new_tips = None
+                self.refresh_button.setEnabled(True)
+        self.save_cache()
+        super().done(result)
@@ -0,0 +1,306 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QPlainTextEdit, QSplitter,
+                               QTreeWidget, QTreeWidgetItem)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QFont, QSyntaxHighlighter, QTextCharFormat
+
+from gitDiff import PatchReader, highlight_blob, read_diff_files
+
+# 各種語法元素的文字顏色
+TOKEN_COLORS = {
+    "keyword": "#7c3aed",
+    "string": "#b45309",
+    "comment": "#6b7280",
+    "number": "#0e7490",
+}
+# 新增、刪除與 hunk 標頭的背景顏色
+LINE_BACKGROUNDS = {
+    "+": "#dcfce7",
+    "-": "#fee2e2",
+    "@": "#e0f2fe",
+}
+# 檔案狀態的說明
+STATUS_NAMES = {"M": "修改", "A": "新增", "D": "刪除", "R": "改名", "C": "複製", "T": "類型變更", "?": "未追蹤"}
+
+
+class PatchHighlighter(QSyntaxHighlighter):
+    """
+    patch 的標示：新增與刪除的行以背景顏色區分，並套用在背景執行緒中以 blob 為單位計算的語法標示。
+    highlightBlock 在 GUI 執行緒中只查表套用格式，不做任何語法分析。
+
+    參數:
+    document (QTextDocument): patch 的文件。
+    """
+
+    def __init__(self, document):
+        super().__init__(document)
+        # 每一行對應的 ("old" 或 "new", 行號)，以及舊內容與新內容每行的語法標示範圍
+        self.positions = []
+        self.spans = {"old": None, "new": None}
+        self._formats = {}
+
+    def _format(self, line_kind, token_kind=None):
+        """
+        取得（並快取）行背景與語法元素組合後的格式。
+        """
+        key = (line_kind, token_kind)
+        if key not in self._formats:
+            text_format = QTextCharFormat()
+            if line_kind in LINE_BACKGROUNDS:
+                text_format.setBackground(QColor(LINE_BACKGROUNDS[line_kind]))
+            if token_kind is not None:
+                text_format.setForeground(QColor(TOKEN_COLORS[token_kind]))
+            elif line_kind == "@":
+                text_format.setForeground(QColor("#0369a1"))
+            self._formats[key] = text_format
+        return self._formats[key]
+
+    def highlightBlock(self, text):
+        number = self.currentBlock().blockNumber()
+        position = self.positions[number] if number < len(self.positions) else None
+        if position is None:
+            # 檔頭與 hunk 標頭
+            if text.startswith("@@"):
+                self.setFormat(0, len(text), self._format("@"))
+            return
+        line_kind = text[:1]
+        if line_kind in LINE_BACKGROUNDS:
+            self.setFormat(0, len(text), self._format(line_kind))
+        side, line_number = position
+        spans = self.spans[side]
+        if spans is None or line_number - 1 >= len(spans):
+            return
+        # 語法標示的位置以檔案內容為準，patch 的每行前面多一個 +、- 或空白
+        for start, length, token_kind in spans[line_number - 1]:
+            self.setFormat(start + 1, length, self._format(line_kind, token_kind))
+
+
+class DiffViewerDialog(QDialog):
+    """
+    變更檢視視窗。先只讀取變更的檔案列表與行數（類似 `git diff --stat`），
+    選擇檔案時才讀取該檔案的 patch，且每次只讀取一頁，按下「載入更多」時再繼續；
+    即使是數百 MB 的產生檔案，也不會整份載入到文字元件中。語法標示在背景執行緒計算並以 blob 快取。
+
+    參數:
+    executor (GitCommandExecutor): 在背景讀取 diff 的執行器。
+    source (DiffSource): 要檢視的變更。
+    title (str): 視窗標題。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    accept_text (str, optional): 確認按鈕的文字，例如「提交」；None 時只有「關閉」按鈕。
+    selectable (bool, optional): 是否在每個檔案前顯示勾選框，讓使用者選擇要提交的檔案，默認為 False。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, executor, source, title, cwd=None, accept_text=None, selectable=False, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.source = source
+        self.cwd = cwd
+        self.selectable = selectable
+        self.setWindowTitle(title)
+        self.resize(900, 700)
+
+        self.summary_label = QLabel("正在讀取變更的檔案...", self)
+        self.summary_label.setStyleSheet("color: #2C662D; font-weight: bold;")
+        self.file_tree = QTreeWidget(self)
+        self.file_tree.setHeaderLabels(["檔案", "狀態", "新增", "刪除"])
+        self.file_tree.setRootIsDecorated(False)
+        self.file_tree.setUniformRowHeights(True)
+        self.file_tree.currentItemChanged.connect(lambda item, _: self.show_file(item))
+        self.patch_view = QPlainTextEdit(self)
+        self.patch_view.setReadOnly(True)
+        self.patch_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        font = QFont("monospace")
+        font.setStyleHint(QFont.Monospace)
+        self.patch_view.setFont(font)
+        self.highlighter = PatchHighlighter(self.patch_view.document())
+        self.page_label = QLabel("", self)
+        self.more_button = QPushButton("載入更多", self)
+        self.more_button.setVisible(False)
+        self.more_button.clicked.connect(self.load_page)
+
+        splitter = QSplitter(Qt.Vertical, self)
+        splitter.addWidget(self.file_tree)
+        splitter.addWidget(self.patch_view)
+        splitter.setSizes([200, 500])
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.page_label, 1)
+        buttons.addWidget(self.more_button)
+        if accept_text is not None:
+            self.accept_button = QPushButton(accept_text, self)
+            self.accept_button.clicked.connect(self.accept)
+            buttons.addWidget(self.accept_button)
+        close_button = QPushButton("取消" if accept_text is not None else "關閉", self)
+        close_button.clicked.connect(self.reject)
+        buttons.addWidget(close_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(splitter)
+        layout.addLayout(buttons)
+
+        # 目前顯示的檔案與 patch 讀取器；切換檔案時遞增 generation，捨棄舊檔案尚未送達的結果
+        self.files = []
+        self.reader = None
+        self.generation = 0
+        self.loaded_lines = 0
+        self.closed = False
+        executor.submit_call(lambda: read_diff_files(source, cwd), on_success=self.set_files,
+                             on_failure=lambda error: self.closed or self.summary_label.setText(f"無法讀取變更：{error}"))
+
+    def set_files(self, files):
+        """
+        顯示變更的檔案列表，並選取第一個檔案。
+
+        參數:
+        files (list of DiffFile): 變更的檔案。
+        """
+        # 讀取完成前視窗可能已經關閉並刪除
+        if self.closed:
+            return
+        self.files = files
+        if not files:
+            self.summary_label.setText("沒有任何變更。")
+            return
+        added = sum(f.added or 0 for f in files)
+        deleted = sum(f.deleted or 0 for f in files)
+        self.summary_label.setText(f"{len(files)} 個檔案，新增 {added} 行，刪除 {deleted} 行")
+        for diff_file in files:
+            name = diff_file.path if diff_file.path == diff_file.old_path else f"{diff_file.old_path} → {diff_file.path}"
+            counts = ("二進位", "") if diff_file.binary else \
+                ("" if diff_file.added is None else str(diff_file.added),
+                 "" if diff_file.deleted is None else str(diff_file.deleted))
+            item = QTreeWidgetItem([name, STATUS_NAMES.get(diff_file.status, diff_file.status), *counts])
+            item.setForeground(2, QColor("#15803d"))
+            item.setForeground(3, QColor("#b91c1c"))
+            item.setData(0, Qt.UserRole, self.file_tree.topLevelItemCount())
+            if self.selectable:
+                item.setCheckState(0, Qt.Checked)
+            self.file_tree.addTopLevelItem(item)
+        if self.selectable:
+            # 沒有勾選任何檔案時不能提交
+            self.file_tree.itemChanged.connect(
+                lambda item, column: self.accept_button.setEnabled(bool(self.selected_paths())))
+        self.file_tree.resizeColumnToContents(0)
+        self.file_tree.setCurrentItem(self.file_tree.topLevelItem(0))
+
+    def selected_paths(self):
+        """
+        取得勾選的檔案路徑，改名與複製的檔案同時包含新舊路徑。
+
+        返回:
+        return (set of str): 勾選的路徑，相對於倉庫根目錄。
+        """
+        paths = set()
+        for row in range(self.file_tree.topLevelItemCount()):
+            item = self.file_tree.topLevelItem(row)
+            if item.checkState(0) == Qt.Checked:
+                diff_file = self.files[item.data(0, Qt.UserRole)]
+                paths.update((diff_file.path, diff_file.old_path))
+        return paths
+
+    def show_file(self, item):
+        """
+        顯示檔案的 patch：關閉上一個檔案的讀取器，讀取第一頁並在背景計算語法標示。
+
+        參數:
+        item (QTreeWidgetItem): 選擇的檔案列，None 表示沒有選擇。
+        """
+        self.close_reader()
+        self.patch_view.clear()
+        self.highlighter.positions = []
+        self.highlighter.spans = {"old": None, "new": None}
+        self.loaded_lines = 0
+        self.more_button.setVisible(False)
+        if item is None:
+            return
+        diff_file = self.files[item.data(0, Qt.UserRole)]
+        if diff_file.binary:
+            self.page_label.setText("二進位檔案，不顯示內容")
+            return
+        self.page_label.setText("正在讀取...")
+        try:
+            self.reader = PatchReader(self.source, diff_file, self.cwd)
+        except OSError as e:
+            self.page_label.setText(f"無法讀取 patch：{e}")
+            return
+        self.load_page()
+        generation = self.generation
+        self.executor.submit_call(
+            lambda: {"old": highlight_blob(diff_file.old_blob, diff_file.old_path, self.cwd)
+                     if diff_file.status not in "A?" else None,
+                     "new": highlight_blob(diff_file.new_blob, diff_file.path, self.cwd)
+                     if diff_file.status != "D" else None},
+            on_success=lambda spans: self.set_spans(generation, spans),
+            on_failure=lambda error: None)
+
+    def load_page(self):
+        """
+        在背景讀取目前檔案的下一頁 patch。
+        """
+        if self.reader is None or self.reader.finished:
+            return
+        self.more_button.setEnabled(False)
+        reader, generation = self.reader, self.generation
+        self.executor.submit_call(reader.read_page, on_success=lambda page: self.add_page(generation, page),
+                                  on_failure=lambda error: generation == self.generation and
+                                  self.page_label.setText(f"無法讀取 patch：{error}"))
+
+    def add_page(self, generation, page):
+        """
+        將讀到的一頁加到 patch 的最後。
+
+        參數:
+        generation (int): 讀取時的檔案編號，與目前不同時表示使用者已切換檔案。
+        page (tuple): PatchReader.read_page 的結果。
+        """
+        if generation != self.generation:
+            return
+        texts, positions = page
+        self.highlighter.positions.extend(positions)
+        if texts:
+            self.patch_view.appendPlainText("\n".join(texts))
+        self.loaded_lines += len(texts)
+        if self.loaded_lines == 0 and self.reader.finished:
+            self.page_label.setText("沒有內容變更（例如只有改名或權限變更）")
+        elif self.reader.finished:
+            self.page_label.setText(f"共 {self.loaded_lines} 行")
+        else:
+            self.page_label.setText(f"已顯示前 {self.loaded_lines} 行")
+        if self.reader.error:
+            self.page_label.setText(f"無法讀取 patch：{self.reader.error}")
+        self.more_button.setVisible(not self.reader.finished)
+        self.more_button.setEnabled(True)
+
+    def set_spans(self, generation, spans):
+        """
+        套用背景計算完成的語法標示。
+
+        參數:
+        generation (int): 計算時的檔案編號。
+        spans (dict): 舊內容與新內容每行的語法標示範圍。
+        """
+        if generation != self.generation or (spans["old"] is None and spans["new"] is None):
+            return
+        self.highlighter.spans = spans
+        self.highlighter.rehighlight()
+
+    def close_reader(self):
+        """
+        結束目前檔案的 git diff 行程。讀取中的頁面會因行程結束而提前返回，
+        遞增 generation 讓它與語法標示的結果都被捨棄。
+        """
+        self.generation += 1
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def done(self, result):
+        """
+        關閉視窗時結束 git diff 行程，之後不再顯示背景讀取的結果。
+
+        參數:
+        result (int): 對話框的結果代碼。
+        """
+        self.closed = True
+        self.close_reader()
+        super().done(result)
@@ -0,0 +1,418 @@
+# 讀取 diff 的檔案列表、分頁讀取單一檔案的 patch，以及在背景計算語法標示
+from collections import OrderedDict
+import hashlib
+import io
+import os
+import re
+import subprocess
+import threading
+
+from gitWorkerPool import shared_pool
+
+# 空的 tree 物件，沒有父 commit 或還沒有任何 commit 時作為比較的基準
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+# diff 中表示工作目錄檔案（尚未寫入物件資料庫）的雜湊值
+ZERO_OID = "0" * 40
+# patch 每頁的行數，以及單行顯示的最大字元數（產生的檔案可能整個檔案只有一行）
+PAGE_LINES = 2000
+MAX_LINE_LENGTH = 1000
+# 超過此大小的檔案不做語法標示，快取最多保留的檔案數量
+HIGHLIGHT_MAX_BYTES = 512 * 1024
+HIGHLIGHT_CACHE_SIZE = 64
+
+
+def _run_git(args, cwd=None):
+    """
+    執行 Git 命令並返回標準輸出的 bytes。
+
+    參數:
+    args (list of str): git 之後的參數。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (bytes): 標準輸出。
+    """
+    result = subprocess.run(["git", *args], cwd=cwd, stdin=subprocess.DEVNULL, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip())
+    return result.stdout
+
+
+class DiffFile:
+    """
+    diff 中的一個檔案。
+
+    屬性:
+    - path (str): 新的路徑。
+    - old_path (str): 舊的路徑，沒有改名時與 path 相同。
+    - status (str): 狀態字母，例如 "M"、"A"、"D"、"R"，未追蹤的檔案為 "?"。
+    - added (int or None): 新增的行數，二進位檔案或未追蹤的檔案為 None。
+    - deleted (int or None): 刪除的行數。
+    - old_blob (str): 舊內容的 blob 雜湊值，沒有舊內容時為 ZERO_OID。
+    - new_blob (str): 新內容的 blob 雜湊值，內容在工作目錄中時為 ZERO_OID。
+    - binary (bool): 是否為二進位檔案。
+    """
+
+    def __init__(self, path, old_path, status, added, deleted, old_blob, new_blob, binary=False):
+        self.path = path
+        self.old_path = old_path
+        self.status = status
+        self.added = added
+        self.deleted = deleted
+        self.old_blob = old_blob
+        self.new_blob = new_blob
+        self.binary = binary
+
+
+class DiffSource:
+    """
+    要檢視的變更：某個 commit 與它第一個父 commit 的差異，或工作目錄（包含未追蹤的檔案）與 HEAD 的差異，
+    也就是 `git add .` 之後會提交的內容。
+
+    參數:
+    target (str, optional): commit 的雜湊值或版本表示式，None 表示工作目錄。
+    """
+
+    def __init__(self, target=None):
+        self.target = target
+        # 比較的基準，在背景執行緒第一次讀取檔案列表時解析
+        self.base = None
+
+    def resolve(self, cwd=None):
+        """
+        解析比較的基準：commit 的第一個父 commit 或 HEAD，沒有時使用空的 tree。
+
+        參數:
+        cwd (str, optional): Git 倉庫的路徑。
+        """
+        rev = "HEAD" if self.target is None else self.target + "^"
+        result = subprocess.run(["git", "rev-parse", "--verify", "-q", rev + "^{commit}"], cwd=cwd,
+                                stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        self.base = result.stdout.strip() if result.returncode == 0 else EMPTY_TREE
+        if self.target is not None:
+            # 同時確認 commit 存在，錯誤訊息比之後的 git diff 清楚
+            self.target = _run_git(["rev-parse", "--verify", self.target + "^{commit}"], cwd).decode().strip()
+
+    def diff_args(self):
+        """
+        取得 git diff 的共用參數。
+
+        返回:
+        return (list of str): 例如 ["diff", "--no-color", ..., base, target]。
+        """
+        args = ["diff", "--no-color", "--no-ext-diff", "-M", self.base]
+        return args + [self.target] if self.target is not None else args
+
+
+def read_diff_files(source, cwd=None):
+    """
+    讀取變更的檔案列表與每個檔案新增、刪除的行數，不讀取 patch 內容。
+    以 --raw 與 --numstat 一次取得狀態、blob 雜湊值與行數。
+
+    參數:
+    source (DiffSource): 要檢視的變更。
+    cwd (str, optional): Git 倉庫的路徑。
+
+    返回:
+    return (list of DiffFile): 變更的檔案。
+    """
+    if source.base is None:
+        source.resolve(cwd)
+    fields = _run_git(source.diff_args() + ["--raw", "--numstat", "-z", "--no-abbrev"], cwd).split(b"\0")
+    raw, counts = [], []
+    i = 0
+    while i < len(fields) and fields[i]:
+        field = fields[i].decode(errors="surrogateescape")
+        if field.startswith(":"):
+            # ":舊權限 新權限 舊雜湊值 新雜湊值 狀態"，接著是路徑；改名與複製有兩個路徑
+            _, _, old_blob, new_blob, status = field[1:].split(" ")
+            paths = 2 if status[0] in "RC" else 1
+            names = [name.decode(errors="surrogateescape") for name in fields[i + 1:i + 1 + paths]]
+            raw.append((status[0], old_blob, new_blob, names[0], names[-1]))
+            i += 1 + paths
+        else:
+            # "新增\t刪除\t路徑"；改名時路徑為空，接著是舊路徑與新路徑
+            added, deleted, path = field.split("\t", 2)
+            i += 1 if path else 3
+            counts.append((None, None) if added == "-" else (int(added), int(deleted)))
+    files = [DiffFile(path, old_path, status, added, deleted, old_blob, new_blob, binary=added is None)
+             for (status, old_blob, new_blob, old_path, path), (added, deleted) in zip(raw, counts)]
+    if source.target is None:
+        # git add . 也會加入未追蹤的檔案
+        untracked = _run_git(["ls-files", "--others", "--exclude-standard", "-z"], cwd).split(b"\0")
+        files += [DiffFile(name.decode(errors="surrogateescape"), name.decode(errors="surrogateescape"), "?",
+                           None, None, ZERO_OID, ZERO_OID) for name in untracked if name]
+    return files
+
+
+class PatchReader:
+    """
+    分頁讀取單一檔案的 patch。git diff 行程保持開啟，每次只讀取一頁，
+    即使產生的檔案有數百 MB 的 diff，也只有已顯示的頁面會在記憶體中。
+    未追蹤的檔案整份都是新增的內容，直接從工作目錄逐行讀取，不必等 Git 先算出整份 diff。
+
+    每一行都會對應到舊內容或新內容的行號，讓語法標示可以套用以 blob 為單位計算的結果。
+
+    參數:
+    source (DiffSource): 要檢視的變更，必須已經解析比較的基準。
+    diff_file (DiffFile): 要讀取的檔案。
+    cwd (str, optional): Git 倉庫的路徑。
+    """
+
+    HUNK_PATTERN = re.compile(r"^@@ -(\d+)(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+    def __init__(self, source, diff_file, cwd=None):
+        self.process = None
+        # 尚未輸出的檔頭，以及未追蹤檔案每行前面加上的 "+"
+        self._pending = []
+        self._prefix = b""
+        if diff_file.status == "?":
+            self.stream = open(os.path.join(cwd or ".", diff_file.path), "rb")
+            if b"\0" in self.stream.peek(8000)[:8000]:
+                self.stream.close()
+                self.stream = io.BytesIO(f"Binary files /dev/null and b/{diff_file.path} differ\n".encode())
+            else:
+                self._pending = ["--- /dev/null", f"+++ b/{diff_file.path}", "@@ -0,0 +1 @@"]
+                self._prefix = b"+"
+        else:
+            args = source.diff_args() + ["--", diff_file.old_path]
+            if diff_file.path != diff_file.old_path:
+                args.append(diff_file.path)
+            self.process = subprocess.Popen(["git", *args], cwd=cwd, stdin=subprocess.DEVNULL,
+                                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.stream = self.process.stdout
+        # 是否已讀完所有輸出，以及 git diff 失敗時的錯誤訊息
+        self.finished = False
+        self.error = None
+        # 目前讀到的舊內容與新內容行號
+        self._old_line = 0
+        self._new_line = 0
+
+    def read_page(self, lines=PAGE_LINES):
+        """
+        讀取下一頁。應在背景執行緒中呼叫，同一個讀取器一次只能有一個呼叫。
+
+        參數:
+        lines (int, optional): 最多讀取的行數，默認為 PAGE_LINES。
+
+        返回:
+        return (tuple): (文字行的列表, 每行對應的 ("old" 或 "new", 行號) 或 None 的列表)。
+        讀完時 finished 為 True，git diff 失敗時錯誤訊息記錄在 error。
+        """
+        texts, positions = [], []
+        while self._pending and len(texts) < lines:
+            text = self._pending.pop(0)
+            texts.append(text)
+            positions.append(self._position(text))
+        stream = self.stream
+        while len(texts) < lines:
+            # 限制每次讀取的長度，超長的行不會整行讀進記憶體
+            try:
+                line = stream.readline(MAX_LINE_LENGTH * 4)
+            except ValueError:
+                # 切換檔案時已關閉
+                line = b""
+            if not line:
+                self._finish()
+                break
+            skipped = 0
+            if not line.endswith(b"\n"):
+                # 略過這一行剩下的部分
+                while True:
+                    rest = stream.readline(1 << 16)
+                    skipped += len(rest)
+                    if not rest or rest.endswith(b"\n"):
+                        break
+            text = (self._prefix + line.rstrip(b"\n")).decode(errors="replace")
+            if skipped or len(text) > MAX_LINE_LENGTH:
+                text = text[:MAX_LINE_LENGTH] + " …（過長的行已截斷）"
+            texts.append(text)
+            positions.append(self._position(text))
+        return texts, positions
+
+    def _position(self, text):
+        """
+        計算一行 patch 對應到的舊內容或新內容行號，並推進目前的行號。
+        """
+        match = self.HUNK_PATTERN.match(text)
+        if match:
+            self._old_line, self._new_line = int(match.group(1)), int(match.group(2))
+            return None
+        if self._new_line == 0 and self._old_line == 0:
+            # 第一個 hunk 之前的檔頭
+            return None
+        if text.startswith("+"):
+            self._new_line += 1
+            return "new", self._new_line - 1
+        if text.startswith("-"):
+            self._old_line += 1
+            return "old", self._old_line - 1
+        if text.startswith(" "):
+            self._old_line += 1
+            self._new_line += 1
+            return "new", self._new_line - 1
+        # 例如 "\\ No newline at end of file"
+        return None
+
+    def _finish(self):
+        """
+        讀完所有輸出後檢查返回碼，失敗時記錄錯誤訊息，已讀到的內容仍然返回。
+        """
+        self.finished = True
+        if self.process is None:
+            self.stream.close()
+            return
+        error = self.process.stderr.read().decode(errors="replace").strip()
+        returncode = self.process.wait()
+        if returncode != 0:
+            self.error = error or f"返回碼 {returncode}"
+
+    def close(self):
+        """
+        結束 git diff 行程，例如使用者切換到另一個檔案。
+        """
+        # 只結束行程，不關閉管線：背景執行緒可能正在讀取，會因行程結束而讀到檔案結尾；
+        # 結束後立即回收行程，不必等到下一次讀取才由 _finish 回收
+        if self.process is None:
+            self.stream.close()
+        elif self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+
+class _Language:
+    """
+    簡單的語法規則：關鍵字、單行註解，以及可跨越多行的區塊（區塊註解或三引號字串）。
+    """
+
+    def __init__(self, keywords, line_comment, blocks=()):
+        self.keywords = frozenset(keywords.split())
+        self.blocks = blocks
+        parts = [f"(?P<block{i}>{re.escape(start)})" for i, (start, _, _) in enumerate(blocks)]
+        if line_comment:
+            parts.append(f"(?P<comment>{re.escape(line_comment)}.*$)")
+        parts += [r"(?P<string>\"(?:\\.|[^\"\\])*\"?|'(?:\\.|[^'\\])*'?)",
+                  r"(?P<number>\b\d[\d_]*(?:\.\d+)?\b)",
+                  r"(?P<word>\b[A-Za-z_]\w*\b)"]
+        self.pattern = re.compile("|".join(parts))
+
+
+_C_KEYWORDS = ("break case catch class const continue default do else enum export extends false finally for "
+               "function if import in interface let new null return static struct switch this throw true try "
+               "typedef typeof var void while public private protected package namespace using fn impl let mut "
+               "match pub use func go defer type int char float double bool long unsigned")
+_LANGUAGES = {
+    "python": _Language("and as assert async await break class continue def del elif else except False finally "
+                        "for from global if import in is lambda None nonlocal not or pass raise return True try "
+                        "while with yield self", "#",
+                        (('"""', '"""', "string"), ("'''", "'''", "string"))),
+    "c": _Language(_C_KEYWORDS, "//", (("/*", "*/", "comment"),)),
+    "shell": _Language("if then else elif fi for while do done case esac function in return export local", "#"),
+}
+_EXTENSIONS = {
+    ".py": "python", ".pyw": "python",
+    ".c": "c", ".h": "c", ".cc": "c", ".cpp": "c", ".hpp": "c", ".java": "c", ".js": "c", ".jsx": "c",
+    ".ts": "c", ".tsx": "c", ".cs": "c", ".go": "c", ".rs": "c", ".kt": "c", ".swift": "c",
+    ".sh": "shell", ".bash": "shell",
+}
+
+
+def tokenize(text, language):
+    """
+    將內容切成每行的語法標示範圍。
+
+    參數:
+    text (str): 檔案內容。
+    language (str): _LANGUAGES 中的語言名稱。
+
+    返回:
+    return (list of list): 每行一個 (起始位置, 長度, 種類) 的列表，種類為 "keyword"、"string"、"comment" 或 "number"。
+    """
+    rules = _LANGUAGES[language]
+    result = []
+    # 目前所在的多行區塊（結束字串, 種類），不在區塊中時為 None
+    block = None
+    for line in text.split("\n"):
+        spans = []
+        position = 0
+        if block is not None:
+            end = line.find(block[0])
+            if end < 0:
+                result.append([(0, len(line), block[1])] if line else [])
+                continue
+            position = end + len(block[0])
+            spans.append((0, position, block[1]))
+            block = None
+        while True:
+            match = rules.pattern.search(line, position)
+            if match is None:
+                break
+            kind = match.lastgroup
+            position = match.end()
+            if kind.startswith("block"):
+                _, end_text, block_kind = rules.blocks[int(kind[5:])]
+                end = line.find(end_text, match.end())
+                if end < 0:
+                    # 區塊延續到下一行
+                    spans.append((match.start(), len(line) - match.start(), block_kind))
+                    block = (end_text, block_kind)
+                    break
+                position = end + len(end_text)
+                spans.append((match.start(), position - match.start(), block_kind))
+            elif kind != "word":
+                spans.append((match.start(), match.end() - match.start(), kind))
+            elif match.group() in rules.keywords:
+                spans.append((match.start(), match.end() - match.start(), "keyword"))
+        result.append(spans)
+    return result
+
+
+# 以內容雜湊值為鍵的語法標示快取，最近使用的排在最後
+_highlight_cache = OrderedDict()
+_highlight_lock = threading.Lock()
+
+
+def highlight_blob(blob, path, cwd=None):
+    """
+    計算一個檔案內容的語法標示，結果以 blob 雜湊值為鍵快取，同一個 blob 只計算一次。
+    應在背景執行緒中呼叫。
+
+    參數:
+    blob (str): blob 雜湊值；ZERO_OID 表示讀取工作目錄中的檔案，以內容的雜湊值作為快取的鍵。
+    path (str): 檔案路徑，用來判斷語言。
+    cwd (str, optional): Git 倉庫的路徑。
+
+    返回:
+    return (list or None): tokenize 的結果；不支援的語言、二進位或過大的檔案返回 None。
+    """
+    language = _EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if language is None:
+        return None
+    if blob != ZERO_OID:
+        key = blob
+        with _highlight_lock:
+            if key in _highlight_cache:
+                _highlight_cache.move_to_end(key)
+                return _highlight_cache[key]
+        result = shared_pool(cwd).read_object(blob)
+        data = result[2] if result is not None else b""
+    else:
+        try:
+            with open(os.path.join(cwd or ".", path), "rb") as f:
+                data = f.read(HIGHLIGHT_MAX_BYTES + 1)
+        except OSError:
+            return None
+        key = "worktree:" + hashlib.sha1(data).hexdigest()
+        with _highlight_lock:
+            if key in _highlight_cache:
+                _highlight_cache.move_to_end(key)
+                return _highlight_cache[key]
+    if len(data) > HIGHLIGHT_MAX_BYTES or b"\0" in data[:8000]:
+        spans = None
+    else:
+        spans = tokenize(data.decode(errors="replace"), language)
+    with _highlight_lock:
+        _highlight_cache[key] = spans
+        while len(_highlight_cache) > HIGHLIGHT_CACHE_SIZE:
+            _highlight_cache.popitem(last=False)
+    return spans
@@ -0,0 +1,438 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QReadWriteLock, Signal, Slot
+import subprocess
+import threading
+import itertools
+import os
+import signal
+
+
+def shell_options(os_type):
+    """
+    根據操作系統返回 subprocess 執行 Shell 命令時所需的參數。
+
+    參數:
+    os_type (str): 當前選擇的操作系統類型。
+
+    返回:
+    return (dict): 傳給 subprocess 的 shell 相關參數。
+    """
+    if os_type == "Windows":
+        # 在 Windows 上使用預設的 Shell
+        return {"shell": True}
+    # 在 Linux 或 MacOS 上使用 Bash 執行命令
+    return {"shell": True, "executable": "/bin/bash"}
+
+
+def process_group_options():
+    """
+    返回讓子行程在新的行程群組中啟動的 subprocess 參數，取消時才能一併結束 Git 啟動的
+    ssh、git-remote-https 等子行程。
+
+    返回:
+    return (dict): 傳給 subprocess.Popen 的參數。
+    """
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_process_group(process):
+    """
+    結束以 process_group_options 啟動的行程與它所有的子行程。在 POSIX 上送出 SIGTERM，
+    讓 Git 有機會清除 .lock 檔；在 Windows 上以 taskkill 結束整個行程樹。
+
+    參數:
+    process (subprocess.Popen): 要結束的行程。
+    """
+    if process.poll() is not None:
+        return
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+
+
+class GitTaskSignals(QObject):
+    """
+    背景 Git 任務使用的訊號集合，由工作執行緒發出，並在主執行緒中接收。
+
+    訊號:
+    - progress (int, str): 任務編號與新讀到的一行輸出。
+    - done (int, int, object, str): 任務編號、返回碼、結果（命令的標準輸出或函數的返回值）與錯誤訊息。
+    """
+    progress = Signal(int, str)
+    done = Signal(int, int, object, str)
+
+
+class GitCommandTask(QRunnable):
+    """
+    在 QThreadPool 中執行的單一 Git 命令。
+
+    參數:
+    task_id (int): 任務編號。
+    command (str): 要執行的 Git 命令。
+    os_type (str): 當前選擇的操作系統類型。
+    cwd (str or None): 執行命令時的工作目錄，None 表示目前目錄。
+    lock (QReadWriteLock): 用來協調讀取與寫入命令的讀寫鎖。
+    read_only (bool): 是否為唯讀命令，唯讀命令可以同時執行。
+    """
+
+    def __init__(self, task_id, command, os_type, cwd, lock, read_only):
+        super().__init__()
+        # 由執行器保留任務的參考，避免 Qt 在執行後自動刪除
+        self.setAutoDelete(False)
+        self.task_id = task_id
+        self.command = command
+        self.os_type = os_type
+        self.cwd = cwd
+        self.lock = lock
+        self.read_only = read_only
+        # 訊號物件在主執行緒中建立，因此連接到主執行緒的槽會以佇列方式傳遞
+        self.signals = GitTaskSignals()
+
+    def run(self):
+        """
+        執行 Git 命令，逐行回報標準輸出，結束後發出 done 訊號。
+        """
+        # 唯讀命令共用讀取鎖，寫入命令獨佔寫入鎖
+        if self.read_only:
+            self.lock.lockForRead()
+        else:
+            self.lock.lockForWrite()
+        try:
+            returncode, stdout, stderr = self._execute()
+        except Exception as e:
+            returncode, stdout, stderr = -1, "", str(e)
+        finally:
+            self.lock.unlock()
+        self.signals.done.emit(self.task_id, returncode, stdout, stderr)
+
+    def _execute(self):
+        """
+        啟動子行程並讀取輸出。標準錯誤輸出由另一條執行緒收集，避免管線塞滿造成死鎖。
+
+        返回:
+        return (tuple): (返回碼, 標準輸出, 標準錯誤輸出)。
+        """
+        process = subprocess.Popen(self.command, cwd=self.cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, errors="replace", **shell_options(self.os_type))
+        stderr_lines = []
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        stderr_reader.start()
+
+        stdout_lines = []
+        for line in process.stdout:
+            stdout_lines.append(line)
+            # 將每一行輸出即時回報給主執行緒
+            self.signals.progress.emit(self.task_id, line.rstrip("\n"))
+
+        returncode = process.wait()
+        stderr_reader.join()
+        return returncode, "".join(stdout_lines).strip(), "".join(stderr_lines).strip()
+
+
+class GitCallTask(GitCommandTask):
+    """
+    在 QThreadPool 中執行的 Python 函數，例如透過常駐 Git 行程池進行的查詢。
+
+    參數:
+    task_id (int): 任務編號。
+    func (callable): 要執行的函數，其返回值會作為任務結果。
+    lock (QReadWriteLock): 用來協調讀取與寫入的讀寫鎖。
+    read_only (bool): 是否為唯讀操作。
+    """
+
+    def __init__(self, task_id, func, lock, read_only, reports_progress=False):
+        super().__init__(task_id, None, None, None, lock, read_only)
+        self.func = func
+        self.reports_progress = reports_progress
+
+    def report(self, line):
+        """
+        由工作執行緒回報一行進度，在主執行緒中以 on_progress 接收。
+
+        參數:
+        line (str): 進度文字。
+        """
+        self.signals.progress.emit(self.task_id, line)
+
+    def _execute(self):
+        """
+        執行函數，發生例外時以錯誤訊息回報。
+
+        返回:
+        return (tuple): (返回碼, 函數返回值, 錯誤訊息)。
+        """
+        try:
+            return 0, self.func(self.report) if self.reports_progress else self.func(), ""
+        except Exception as e:
+            return 1, None, str(e)
+
+
+class GitProgressTask(GitCommandTask):
+    """
+    在 QThreadPool 中執行、會回報進度且可以取消的 Git 命令，例如 `git push --progress`。
+    Git 的進度訊息輸出在標準錯誤，並以 \r 覆寫同一行，因此這裡逐段讀取標準錯誤，
+    每讀到一段以 \r 或 \n 結尾的內容就回報一次。命令不經過 Shell，並在新的行程群組中執行。
+
+    參數:
+    task_id (int): 任務編號。
+    args (list of str): 命令與參數，例如 ["git", "push", "--progress", "origin", "master"]。
+    cwd (str or None): 執行命令時的工作目錄，None 表示目前目錄。
+    lock (QReadWriteLock): 用來協調讀取與寫入命令的讀寫鎖。
+    read_only (bool): 是否為唯讀命令。
+    """
+
+    def __init__(self, task_id, args, cwd, lock, read_only):
+        super().__init__(task_id, None, None, cwd, lock, read_only)
+        self.args = args
+        self._process = None
+        self._cancelled = False
+        self._process_lock = threading.Lock()
+
+    def cancel(self):
+        """
+        取消任務。尚未開始時不會啟動行程，已開始時結束整個行程群組。
+        """
+        with self._process_lock:
+            self._cancelled = True
+            process = self._process
+        if process is not None:
+            kill_process_group(process)
+
+    def _execute(self):
+        """
+        啟動子行程，標準輸出由另一條執行緒收集，標準錯誤在這條執行緒逐段讀取並回報。
+
+        返回:
+        return (tuple): (返回碼, 標準輸出, 標準錯誤中完整的訊息行)。
+        """
+        with self._process_lock:
+            if self._cancelled:
+                return -1, "", "已取消"
+            process = subprocess.Popen(self.args, cwd=self.cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                       stderr=subprocess.PIPE, **process_group_options())
+            self._process = process
+        stdout_chunks = []
+        stdout_reader = threading.Thread(target=lambda: stdout_chunks.append(process.stdout.read()), daemon=True)
+        stdout_reader.start()
+
+        # 以 \n 結尾的是一般訊息，作為失敗時的錯誤訊息；以 \r 結尾的是會被覆寫的進度
+        messages = []
+        pending = b""
+        while True:
+            chunk = process.stderr.read1(4096)
+            if not chunk:
+                break
+            pending += chunk
+            while True:
+                positions = [position for position in (pending.find(b"\r"), pending.find(b"\n")) if position >= 0]
+                if not positions:
+                    break
+                end = min(positions)
+                segment = pending[:end].decode(errors="replace").strip()
+                if segment:
+                    if pending[end:end + 1] == b"\n":
+                        messages.append(segment)
+                    self.signals.progress.emit(self.task_id, segment)
+                pending = pending[end + 1:]
+        if pending.strip():
+            messages.append(pending.decode(errors="replace").strip())
+
+        returncode = process.wait()
+        stdout_reader.join()
+        stdout = b"".join(stdout_chunks).decode(errors="replace").strip()
+        if self._cancelled:
+            return returncode or -1, stdout, "已取消"
+        return returncode, stdout, "\n".join(messages)
+
+
+class GitCommandExecutor(QObject):
+    """
+    非同步的 Git 命令執行器。唯讀命令在共用的執行緒池中並行執行，
+    寫入命令則在單一執行緒中依照提交順序逐一執行，且不會與唯讀命令同時進行。
+
+    參數:
+    parent (QObject, optional): 父物件，默認為 None。
+    max_readers (int, optional): 可同時執行的唯讀命令數量，默認為 4。
+
+    訊號:
+    - progress (int, str): 任務編號與一行輸出。
+    - finished (int, object): 任務成功時的編號與結果。
+    - failed (int, str): 任務失敗時的編號與錯誤訊息。
+    - busyChanged (bool): 是否有任務正在執行。
+    """
+    progress = Signal(int, str)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    busyChanged = Signal(bool)
+
+    def __init__(self, parent=None, max_readers=4):
+        super().__init__(parent)
+        # 唯讀命令使用的執行緒池
+        self.read_pool = QThreadPool(self)
+        self.read_pool.setMaxThreadCount(max_readers)
+        # 寫入命令使用只有一條執行緒的執行緒池，以確保依序執行
+        self.write_pool = QThreadPool(self)
+        self.write_pool.setMaxThreadCount(1)
+        # 協調讀取與寫入的讀寫鎖
+        self.lock = QReadWriteLock()
+        # 任務編號產生器
+        self._ids = itertools.count(1)
+        # 尚未完成的任務與其回呼函數
+        self._tasks = {}
+
+    def submit(self, command, os_type="Windows", read_only=False, cwd=None,
+               on_success=None, on_failure=None, on_progress=None):
+        """
+        提交一個 Git 命令到背景執行。
+
+        參數:
+        command (str): 要執行的 Git 命令。
+        os_type (str, optional): 當前選擇的操作系統類型，默認為 Windows。
+        read_only (bool, optional): 是否為唯讀命令，默認為 False。
+        cwd (str, optional): 執行命令時的工作目錄，默認為目前目錄。
+        on_success (callable, optional): 成功時以輸出字串呼叫的函數。
+        on_failure (callable, optional): 失敗時以錯誤訊息呼叫的函數。
+        on_progress (callable, optional): 每讀到一行輸出時呼叫的函數。
+
+        返回:
+        return (int): 任務編號。
+        """
+        task_id = next(self._ids)
+        task = GitCommandTask(task_id, command, os_type, cwd, self.lock, read_only)
+        return self._start(task, on_success, on_failure, on_progress)
+
+    def submit_call(self, func, read_only=True, on_success=None, on_failure=None, on_progress=None,
+                    reports_progress=False):
+        """
+        提交一個 Python 函數到背景執行，適合透過常駐 Git 行程池進行的查詢。
+
+        參數:
+        func (callable): 要執行的無參數函數；reports_progress 為 True 時改以一個回報進度的函數 report(line) 呼叫。
+        read_only (bool, optional): 是否為唯讀操作，默認為 True。
+        on_success (callable, optional): 成功時以函數返回值呼叫的函數。
+        on_failure (callable, optional): 失敗時以錯誤訊息呼叫的函數。
+        on_progress (callable, optional): 在主執行緒中以 func 回報的每一行進度呼叫的函數。
+        reports_progress (bool, optional): func 是否接受回報進度的函數，默認為 False。
+        回報的進度同時經由執行器的 progress 訊號發出，因此不需要 on_progress 也可以顯示在狀態列。
+
+        返回:
+        return (int): 任務編號。
+        """
+        task = GitCallTask(next(self._ids), func, self.lock, read_only, reports_progress)
+        return self._start(task, on_success, on_failure, on_progress)
+
+    def submit_progress(self, args, read_only=False, cwd=None, on_success=None, on_failure=None, on_progress=None):
+        """
+        提交一個會回報進度且可以取消的 Git 命令，標準錯誤的每一段進度都會以 on_progress 回報。
+
+        參數:
+        args (list of str): 命令與參數，不經過 Shell。
+        read_only (bool, optional): 是否為唯讀命令，默認為 False。
+        cwd (str, optional): 執行命令時的工作目錄，默認為目前目錄。
+        on_success (callable, optional): 成功時以標準輸出呼叫的函數。
+        on_failure (callable, optional): 失敗或取消時以錯誤訊息呼叫的函數。
+        on_progress (callable, optional): 每讀到一段進度或訊息時呼叫的函數。
+
+        返回:
+        return (int): 任務編號，可以傳給 cancel。
+        """
+        task = GitProgressTask(next(self._ids), args, cwd, self.lock, read_only)
+        return self._start(task, on_success, on_failure, on_progress)
+
+    def cancel(self, task_id):
+        """
+        取消以 submit_progress 提交的任務，任務會以「已取消」的錯誤訊息結束。
+
+        參數:
+        task_id (int): 任務編號。
+
+        返回:
+        return (bool): 任務存在且可以取消時返回 True。
+        """
+        entry = self._tasks.get(task_id)
+        if entry is None or not isinstance(entry[0], GitProgressTask):
+            return False
+        entry[0].cancel()
+        return True
+
+    def _start(self, task, on_success, on_failure, on_progress):
+        """
+        記錄任務的回呼函數，並依照讀寫類型放入對應的執行緒池。
+
+        返回:
+        return (int): 任務編號。
+        """
+        task_id = task.task_id
+        task.signals.progress.connect(self._on_task_progress)
+        task.signals.done.connect(self._on_task_done)
+        self._tasks[task_id] = (task, on_success, on_failure, on_progress)
+
+        if len(self._tasks) == 1:
+            self.busyChanged.emit(True)
+        pool = self.read_pool if task.read_only else self.write_pool
+        pool.start(task)
+        return task_id
+
+    def is_busy(self):
+        """
+        檢查是否還有任務尚未完成。
+
+        返回:
+        return (bool): 有任務正在執行或排隊時返回 True。
+        """
+        return bool(self._tasks)
+
+    def wait_for_done(self, msecs=-1):
+        """
+        等待所有背景任務結束，通常在關閉應用程式時使用。
+
+        參數:
+        msecs (int, optional): 最長等待時間（毫秒），-1 表示無限等待。
+
+        返回:
+        return (bool): 所有任務都在時間內結束時返回 True。
+        """
+        return self.write_pool.waitForDone(msecs) and self.read_pool.waitForDone(msecs)
+
+    @Slot(int, str)
+    def _on_task_progress(self, task_id, line):
+        """
+        在主執行緒中處理任務的輸出行。
+        """
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return
+        on_progress = entry[3]
+        if on_progress:
+            on_progress(line)
+        self.progress.emit(task_id, line)
+
+    @Slot(int, int, object, str)
+    def _on_task_done(self, task_id, returncode, stdout, stderr):
+        """
+        在主執行緒中處理任務結束，並呼叫對應的回呼函數。
+        """
+        entry = self._tasks.pop(task_id, None)
+        if entry is None:
+            return
+        _, on_success, on_failure, _ = entry
+
+        if returncode == 0:
+            self.finished.emit(task_id, stdout)
+            if on_success:
+                on_success(stdout)
+        else:
+            # 命令失敗時優先使用標準錯誤輸出作為錯誤訊息
+            message = stderr or stdout or f"返回碼 {returncode}"
+            self.failed.emit(task_id, message)
+            if on_failure:
+                on_failure(message)
+
+        if not self._tasks:
+            self.busyChanged.emit(False)
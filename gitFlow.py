@@ -1,37 +1,69 @@
 # 匯入所需的 PySide6 和其他模組
-from PySide6.QtWidgets import (QApplication, QWidget, QLabel, QVBoxLayout, QPushButton, QLineEdit,
+from PySide6.QtWidgets import (QApplication, QWidget, QLabel, QPushButton, QLineEdit,
                                QMessageBox, QInputDialog, QComboBox, QDialog, QTextEdit, QGridLayout)
-from PySide6.QtCore import Qt, QRect, Property, QPropertyAnimation, QEasingCurve
+from PySide6.QtCore import Qt, QRect, QSize, QMargins, Property, QEasingCurve, QEvent, QTimer
 from PySide6.QtWidgets import QApplication, QPushButton, QGraphicsDropShadowEffect, QMainWindow
-from PySide6.QtGui import QColor, QPainter, QBrush, QPen, QFont, QIcon
+from PySide6.QtGui import QColor, QPainter, QBrush, QPen, QFont, QIcon, QPalette
 import subprocess
 import sys
-import matplotlib.pyplot as plt
-import networkx as nx
 import tempfile
+import threading
 import os
+from gitExecutor import GitCommandExecutor
+from buttonRenderer import button_pixmap, shadow_margins
+from animationTicker import shared_ticker
+from gitWorkerPool import shared_pool, close_shared_pools
+from gitProgressView import GitProgressDialog
+from refListView import RefPickerDialog
+from repoState import RepositoryState
+from repoWatcher import RepositoryWatcher
+from prefetchScheduler import PrefetchScheduler
+from maintenanceScheduler import MaintenanceScheduler
+
+# 主視窗顯示後多久在背景預先載入分支圖表相關模組（毫秒）
+WARM_UP_DELAY = 1000
+
+
+def warm_up_graph():
+    """
+    預先載入分支圖表相關的模組並開啟物件資料庫。圖表、祖先查詢與物件資料庫只在使用時才匯入，
+    讓主視窗更快出現；在背景執行緒呼叫此函數後，第一次開啟圖表時就不必再等待匯入。
+    """
+    import commitGraphView  # noqa: F401
+    from gitAncestry import shared_ancestry
+    shared_ancestry()
 
 class AnimatedButton(QPushButton):
     """
     一個自定義的按鈕類，支持顏色和縮放動畫效果。
 
+    默認使用快取繪製：陰影與圓角背景依顏色與縮放預先繪製成 QPixmap（見 buttonRenderer），
+    動畫的每一幀只需要貼上圖片與繪製文字，不必對整個按鈕套用 QGraphicsDropShadowEffect
+    而在每一幀重新離屏繪製與模糊，在軟體繪製的遠端桌面上特別明顯。
+    此時按鈕的大小會包含陰影的邊界，只有按鈕本體可以點擊。
+
     參數:
     text (str): 按鈕上顯示的文字。
     parent (QWidget, optional): 按鈕的父級窗口，默認為 None。
+    cached (bool, optional): 是否使用快取繪製，False 時使用原本的陰影效果，默認為 True。
     """
     
-    def __init__(self, text, parent=None):
+    def __init__(self, text, parent=None, cached=True):
         """
         AnimatedButton 類的建構函數，設置按鈕的初始狀態和動畫效果。
 
         參數:
         text (str): 按鈕上顯示的文字。
         parent (QWidget, optional): 按鈕的父級窗口，默認為 None。
+        cached (bool, optional): 是否使用快取繪製，默認為 True。
         """
         super().__init__(text, parent)
 
-        # 設置按鈕大小
-        self.setFixedSize(160, 60)
+        # 按鈕本體的大小；快取繪製時按鈕另外保留陰影的邊界
+        self.cached = cached
+        self.face_size = QSize(160, 60)
+        margins = shadow_margins() if cached else QMargins()
+        self.setFixedSize(self.face_size.grownBy(margins))
         # 按鈕的正常顏色
         self.normal_color = QColor("#4ade80")
         # 當滑鼠懸停時的顏色
@@ -42,22 +74,18 @@ class AnimatedButton(QPushButton):
         # 設置圓角按鈕樣式，並且文字顯示為白色
         self.setStyleSheet("border-radius: 20px; font-size: 14px; color: white;")
 
-        # 為按鈕添加陰影效果
-        self.shadow_effect = QGraphicsDropShadowEffect(self)
-        self.shadow_effect.setBlurRadius(20)  # 陰影的模糊半徑
-        self.shadow_effect.setXOffset(0)      # X 軸方向的陰影偏移
-        self.shadow_effect.setYOffset(5)      # Y 軸方向的陰影偏移
-        self.shadow_effect.setColor(QColor("#b0bec5"))  # 陰影的顏色
-        self.setGraphicsEffect(self.shadow_effect)  # 將陰影效果應用到按鈕上
+        # 沒有使用快取繪製時，為按鈕添加陰影效果
+        if not cached:
+            self.shadow_effect = QGraphicsDropShadowEffect(self)
+            self.shadow_effect.setBlurRadius(20)  # 陰影的模糊半徑
+            self.shadow_effect.setXOffset(0)      # X 軸方向的陰影偏移
+            self.shadow_effect.setYOffset(5)      # Y 軸方向的陰影偏移
+            self.shadow_effect.setColor(QColor("#b0bec5"))  # 陰影的顏色
+            self.setGraphicsEffect(self.shadow_effect)  # 將陰影效果應用到按鈕上
 
-        # 設置顏色動畫，該動畫將改變按鈕顏色
-        self.color_animation = QPropertyAnimation(self, b"button_color")
-        self.color_animation.setDuration(200)  # 動畫持續時間為 200 毫秒
-
-        # 設置縮放動畫，當按鈕互動時會有縮放效果
-        self.scale_animation = QPropertyAnimation(self, b"scale_factor")
-        self.scale_animation.setDuration(100)  # 縮放動畫持續時間 100 毫秒
-        self.scale_animation.setEasingCurve(QEasingCurve.OutBack)  # 使用 OutBack 緩動曲線
+        # 顏色與縮放動畫由視窗共用的動畫時鐘推進（見 animationTicker），按鈕本身不持有計時器
+        self.color_duration = 200  # 顏色動畫持續時間為 200 毫秒
+        self.scale_duration = 100  # 縮放動畫持續時間 100 毫秒
 
         self._scale_factor = 1.0  # 初始縮放因子設為 1.0 (無縮放)
 
@@ -68,6 +96,17 @@ class AnimatedButton(QPushButton):
         參數:
         event (QPaintEvent): 繪製事件對象。
         """
+        if self.cached:
+            # 貼上快取的背景與陰影，再於按鈕本體中央繪製文字
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, button_pixmap(self.face_size, self.current_color, self._scale_factor,
+                                                   ratio=self.devicePixelRatioF()))
+            painter.setPen(self.palette().color(QPalette.ButtonText))
+            painter.setFont(self.font())
+            painter.drawText(self.face_rect(), Qt.AlignCenter, self.text())
+            painter.end()
+            return
+
         # 創建 QPainter 用來繪製按鈕
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)  # 開啟抗鋸齒以提高繪製質量
@@ -91,6 +130,61 @@ class AnimatedButton(QPushButton):
         # 繼續使用 QPushButton 的預設文字繪製
         super().paintEvent(event)
 
+    def set_colors(self, normal_color, hover_color):
+        """
+        設置按鈕的正常與懸停顏色。快取繪製不使用樣式表的背景，
+        需要與樣式表一致的外觀時以此設定顏色。
+
+        參數:
+        normal_color (QColor): 正常狀態的顏色。
+        hover_color (QColor): 懸停狀態的顏色。
+        """
+        self.normal_color = QColor(normal_color)
+        self.hover_color = QColor(hover_color)
+        self.current_color = self.hover_color if self.underMouse() else self.normal_color
+        self.update()
+
+    def face_rect(self):
+        """
+        取得按鈕本體（不含陰影邊界）在按鈕中的位置。
+
+        返回:
+        return (QRect): 按鈕本體的矩形。
+        """
+        if not self.cached:
+            return self.rect()
+        return self.rect().marginsRemoved(shadow_margins())
+
+    def hitButton(self, pos):
+        """
+        只有點擊按鈕本體時才算按下按鈕，點擊陰影的邊界不算。
+
+        參數:
+        pos (QPoint): 點擊的位置。
+
+        返回:
+        return (bool): 是否點擊在按鈕本體上。
+        """
+        return self.face_rect().contains(pos)
+
+    def animate_color(self, color):
+        """
+        從目前的顏色開始動畫到指定顏色，取代進行中的顏色動畫。
+
+        參數:
+        color (QColor): 結束顏色。
+        """
+        shared_ticker(self).animate(self, "current_color", color, self.color_duration)
+
+    def animate_scale(self, factor):
+        """
+        從目前的縮放因子開始以 OutBack 緩動曲線動畫到指定值，取代進行中的縮放動畫。
+
+        參數:
+        factor (float): 結束的縮放因子。
+        """
+        shared_ticker(self).animate(self, "_scale_factor", factor, self.scale_duration, QEasingCurve.OutBack)
+
     def enterEvent(self, event):
         """
         當滑鼠進入按鈕時觸發，開始顏色和縮放動畫。
@@ -98,20 +192,9 @@ class AnimatedButton(QPushButton):
         參數:
         event (QEvent): 進入事件。
         """
-        # 停止之前的動畫
-        self.color_animation.stop()
-        # 設置動畫的開始和結束顏色
-        self.color_animation.setStartValue(self.current_color)
-        self.color_animation.setEndValue(self.hover_color)
-        # 開始顏色動畫
-        self.color_animation.start()
-
-        # 同樣為縮放動畫設置開始和結束值
-        self.scale_animation.stop()
-        self.scale_animation.setStartValue(self._scale_factor)
-        self.scale_animation.setEndValue(1.05)  # 進入按鈕時稍微放大
-        # 開始縮放動畫
-        self.scale_animation.start()
+        # 開始顏色動畫，並在進入按鈕時稍微放大
+        self.animate_color(self.hover_color)
+        self.animate_scale(1.05)
 
         super().enterEvent(event)  # 呼叫父類的 enterEvent 方法
 
@@ -122,17 +205,9 @@ class AnimatedButton(QPushButton):
         參數:
         event (QEvent): 離開事件。
         """
-        # 顏色動畫恢復到正常顏色
-        self.color_animation.stop()
-        self.color_animation.setStartValue(self.current_color)
-        self.color_animation.setEndValue(self.normal_color)
-        self.color_animation.start()
-
-        # 縮放動畫恢復到原始大小
-        self.scale_animation.stop()
-        self.scale_animation.setStartValue(self._scale_factor)
-        self.scale_animation.setEndValue(1.0)
-        self.scale_animation.start()
+        # 顏色動畫恢復到正常顏色，縮放動畫恢復到原始大小
+        self.animate_color(self.normal_color)
+        self.animate_scale(1.0)
 
         super().leaveEvent(event)  # 呼叫父類的 leaveEvent 方法
 
@@ -143,11 +218,8 @@ class AnimatedButton(QPushButton):
         參數:
         event (QMouseEvent): 滑鼠按下事件。
         """
-        # 按下按鈕時縮小按鈕
-        self.scale_animation.stop()
-        self.scale_animation.setStartValue(self._scale_factor)
-        self.scale_animation.setEndValue(0.95)  # 按下時縮小到 95% 大小
-        self.scale_animation.start()
+        # 按下按鈕時縮小到 95% 大小
+        self.animate_scale(0.95)
 
         super().mousePressEvent(event)  # 呼叫父類的 mousePressEvent 方法
 
@@ -158,11 +230,8 @@ class AnimatedButton(QPushButton):
         參數:
         event (QMouseEvent): 滑鼠釋放事件。
         """
-        # 釋放按鈕後恢復縮放效果
-        self.scale_animation.stop()
-        self.scale_animation.setStartValue(self._scale_factor)
-        self.scale_animation.setEndValue(1.05)  # 回到按鈕的 hover 狀態大小
-        self.scale_animation.start()
+        # 釋放按鈕後回到按鈕的 hover 狀態大小
+        self.animate_scale(1.05)
 
         super().mouseReleaseEvent(event)  # 呼叫父類的 mouseReleaseEvent 方法
 
@@ -311,7 +380,14 @@ class GitManager:
         返回:
         return (None): 無返回值，成功時顯示分支列表，失敗時顯示錯誤訊息。
         """
-        output = self.run_git_command("git branch")
+        try:
+            # 優先直接讀取 .git 中的 refs，無法讀取時透過常駐 Git 行程池取得分支列表，不必再經過 Shell
+            from gitObjectDb import shared_database
+            database = shared_database()
+            output = database.list_branches() if database is not None else shared_pool().list_branches()
+        except Exception as e:
+            QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{e}")
+            return
         if output:
             # 顯示目前的所有分支
             QMessageBox.information(self, "顯示分支", f"目前分支：\n{output}")
@@ -418,56 +494,16 @@ class GitManager:
 
     def show_branch_graph(self):
         """
-        顯示 Git 分支的圖表，通過 NetworkX 生成分支結構圖並在視窗中顯示。
+        顯示 Git 分支的圖表，以串流方式載入提交歷史，並以泳道佈局在視窗中顯示。
 
         返回:
-        return (None): 無返回值，成功時顯示分支圖表，失敗時顯示錯誤訊息。
+        return (None): 無返回值，載入狀態與錯誤訊息顯示在圖表視窗的狀態列。
         """
-        # 根據操作系統設置相應的 Git 日誌命令來取得分支圖表的數據
-        if self.os_type == "Windows":
-            git_command = 'git log --all --pretty=format:"%h %p"'
-        else:
-            git_command = "git log --all --pretty=format:'%h %p'"
-
-        # 執行 Git 命令來獲取日誌數據
-        output = self.run_git_command(git_command)
-        if output:
-            edges = []
-            # 解析 Git 日誌的輸出，提取提交之間的關聯（邊）
-            for line in output.split('\n'):
-                parts = line.strip().split()
-                if len(parts) > 1:
-                    parent_hashes = parts[1:]
-                    for parent in parent_hashes:
-                        edges.append((parent, parts[0]))
-
-            # 創建有向圖來顯示分支結構
-            G = nx.DiGraph()
-            G.add_edges_from(edges)
-
-            # 使用 spring 布局來安排節點的位置
-            pos = nx.spring_layout(G)
-            plt.figure(figsize=(12, 8))
-            # 繪製圖表，節點顯示提交哈希
-            nx.draw(G, pos, with_labels=True, node_size=800, node_color='#A4DDA4', arrowsize=20)
-            plt.title("Git 分支圖表", fontsize=16)
-
-            # 創建一個新的視窗來顯示圖表
-            graph_window = QDialog(self)
-            graph_window.setWindowTitle("分支圖表")
-            graph_layout = QVBoxLayout(graph_window)
-
-            # 將 matplotlib 圖表嵌入到 Qt 視窗中
-            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-            canvas = FigureCanvas(plt.gcf())
-            graph_layout.addWidget(canvas)
-            graph_window.exec()
-
-            # 清理圖表，避免重複繪製
-            plt.clf()
-        else:
-            # 如果無法獲取分支圖表數據，顯示錯誤訊息
-            QMessageBox.information(self, "分支圖表", "無法取得分支圖表資料。")
+        # 創建圖表視窗並開始串流載入 git log 的輸出
+        from commitGraphView import CommitGraphWindow
+        graph_window = CommitGraphWindow(self)
+        graph_window.load()
+        graph_window.exec()
     
     
 
@@ -505,6 +541,20 @@ class GitManagerApp(QWidget):
         self.remote_repo = "https://github.com/Hi-BlueStar/ThreeDimGenWebAPP.git"
         # 預設的提交訊息
         self.commit_message = "提交變更"
+        # 在背景執行 Git 命令的執行器，避免阻塞 GUI 主執行緒
+        self.executor = GitCommandExecutor(self)
+        # 所有操作共用的倉庫狀態，寫入命令完成後在背景重新讀取
+        self.repo_state = RepositoryState(self.executor, parent=self)
+        # 監看 .git 中的 HEAD、refs、packed-refs 與 index，只有真的改變時才重新讀取倉庫狀態
+        self.repo_watcher = RepositoryWatcher(parent=self)
+        self.repo_watcher.changed.connect(self.repo_state.refresh)
+        # 在背景定期 fetch 所有遠端，讓領先落後的數量保持最新；監看中時更新的遠端分支會觸發重新讀取
+        self.prefetch = PrefetchScheduler(parent=self)
+        self.prefetch.fetched.connect(lambda remote: self.repo_watcher.is_active() or self.repo_state.refresh())
+        # 使用者閒置時在背景執行 git maintenance 的各項工作，並記錄對 log 與 status 延遲的影響
+        self.maintenance = MaintenanceScheduler(self.executor, parent=self)
+        # 分支圖表視窗在第一次開啟時創建，之後重複使用
+        self.graph_window = None
 
         # 創建標題標籤，顯示應用程式的標題
         self.label = QLabel("Git 流程管理", self)
@@ -641,7 +691,70 @@ class GitManagerApp(QWidget):
         self.show_branch_graph_btn.setStyleSheet(button_style)
         # 點擊按鈕時調用 show_branch_graph 方法
         self.show_branch_graph_btn.clicked.connect(self.show_branch_graph)
-        layout.addWidget(self.show_branch_graph_btn, 9, 0, 1, 3)
+        layout.addWidget(self.show_branch_graph_btn, 9, 0, 1, 2)
+
+        # 批次操作按鈕
+        self.batch_btn = AnimatedButton("批次操作", self)
+        self.batch_btn.setStyleSheet(button_style)
+        # 點擊按鈕時調用 show_batch_queue 方法
+        self.batch_btn.clicked.connect(self.show_batch_queue)
+        layout.addWidget(self.batch_btn, 9, 2)
+
+        # 多倉庫總覽按鈕
+        self.dashboard_btn = AnimatedButton("多倉庫總覽", self)
+        self.dashboard_btn.setStyleSheet(button_style)
+        # 點擊按鈕時調用 show_dashboard 方法
+        self.dashboard_btn.clicked.connect(self.show_dashboard)
+        layout.addWidget(self.dashboard_btn, 10, 0)
+
+        # 大型倉庫模式按鈕
+        self.large_repo_btn = AnimatedButton("大型倉庫模式", self)
+        self.large_repo_btn.setStyleSheet(button_style)
+        # 點擊按鈕時調用 show_large_repo_mode 方法
+        self.large_repo_btn.clicked.connect(self.show_large_repo_mode)
+        layout.addWidget(self.large_repo_btn, 10, 1)
+
+        # 倉庫維護按鈕
+        self.maintenance_btn = AnimatedButton("倉庫維護", self)
+        self.maintenance_btn.setStyleSheet(button_style)
+        # 點擊按鈕時調用 show_maintenance 方法
+        self.maintenance_btn.clicked.connect(self.show_maintenance)
+        layout.addWidget(self.maintenance_btn, 10, 2)
+
+        # 複製倉庫按鈕
+        self.clone_btn = AnimatedButton("複製倉庫", self)
+        self.clone_btn.setStyleSheet(button_style)
+        # 點擊按鈕時調用 clone_repository 方法
+        self.clone_btn.clicked.connect(self.clone_repository)
+        layout.addWidget(self.clone_btn, 11, 0)
+
+        # 稀疏檢出按鈕
+        self.sparse_btn = AnimatedButton("稀疏檢出", self)
+        self.sparse_btn.setStyleSheet(button_style)
+        # 點擊按鈕時調用 show_sparse_checkout 方法
+        self.sparse_btn.clicked.connect(self.show_sparse_checkout)
+        layout.addWidget(self.sparse_btn, 11, 1, 1, 2)
+
+        # 快取繪製時背景由按鈕自行繪製，靜止顏色與樣式表的背景相同，懸停時稍微變亮
+        for button in self.findChildren(AnimatedButton):
+            button.set_colors(QColor("#A4DDA4"), QColor("#B8E6B8"))
+
+        # 狀態列，顯示背景 Git 命令的執行進度
+        self.status_label = QLabel("就緒", self)
+        self.status_label.setStyleSheet("color: #2C662D; font-size: 12px;")
+        layout.addWidget(self.status_label, 12, 0, 1, 3)
+        # 背景命令輸出新的一行時更新狀態列
+        self.executor.progress.connect(lambda task_id, line: self.update_status(line))
+        self.executor.busyChanged.connect(lambda busy: self.update_status("執行中...") if busy else self.show_repo_summary())
+        # 倉庫狀態更新或讀取失敗時顯示在狀態列
+        self.repo_state.changed.connect(self.show_repo_summary)
+        self.repo_state.failed.connect(lambda error: self.update_status(f"無法讀取倉庫狀態：{error}"))
+        self.repo_state.refresh()
+        self.repo_watcher.start()
+        self.prefetch.start()
+        self.maintenance.start()
+        # 主視窗顯示後，在背景執行緒預先載入分支圖表相關模組；不經過執行器，避免狀態列顯示執行中
+        QTimer.singleShot(WARM_UP_DELAY, lambda: threading.Thread(target=warm_up_graph, daemon=True).start())
 
         # 設置佈局中的間距和邊距
         layout.setHorizontalSpacing(10)
@@ -660,34 +773,96 @@ class GitManagerApp(QWidget):
         """
         self.os_type = os_type
 
-    def run_git_command(self, command):
+    def run_git_command_async(self, command, on_success=None, read_only=False, on_failure=None):
         """
-        執行指定的 Git 命令，根據當前選擇的操作系統，選擇適合的 Shell。
+        在背景執行指定的 Git 命令，不會阻塞 GUI 主執行緒。
 
         參數:
         command (str): 要執行的 Git 命令。
+        on_success (callable, optional): 命令成功時以輸出結果呼叫的函數。
+        read_only (bool, optional): 是否為唯讀命令，唯讀命令可與其他唯讀命令同時執行，默認為 False。
+        on_failure (callable, optional): 命令失敗時以錯誤訊息呼叫的函數，默認顯示錯誤對話框。
 
         返回:
-        return (str or None): 如果命令成功執行，返回命令的輸出結果。否則，返回 None 並顯示錯誤訊息。
+        return (int): 背景任務的編號。
         """
-        try:
-            if self.os_type == "Windows":
-                # 在 Windows 上執行命令，使用 shell=True
-                result = subprocess.run(command, shell=True, capture_output=True, text=True)
-            else:
-                # 在 Linux 或 MacOS 上使用 Bash 執行命令
-                result = subprocess.run(command, shell=True, executable='/bin/bash', capture_output=True, text=True)
+        if on_failure is None:
+            # 預設的錯誤處理為顯示錯誤訊息
+            on_failure = lambda error: QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{error}")
+        if not read_only and not self.repo_watcher.is_active():
+            # 尚未監看倉庫（例如還沒有初始化）時，寫入命令不論成功或失敗都可能改變倉庫狀態，
+            # 先重新讀取再呼叫原本的回呼函數
+            on_success = self._refresh_after(on_success)
+            on_failure = self._refresh_after(on_failure)
+        return self.executor.submit(command, os_type=self.os_type, read_only=read_only,
+                                    on_success=on_success, on_failure=on_failure)
 
-            if result.returncode == 0:
-                # 如果命令執行成功，返回標準輸出
-                return result.stdout.strip()
-            else:
-                # 如果命令失敗，拋出錯誤並顯示標準錯誤輸出
-                raise Exception(result.stderr.strip())
-        except Exception as e:
-            # 顯示錯誤訊息
-            QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{e}")
-            return None
+    def _refresh_after(self, callback):
+        """
+        包裝回呼函數，在呼叫前先要求重新讀取倉庫狀態。
+
+        參數:
+        callback (callable or None): 原本的回呼函數。
+
+        返回:
+        return (callable): 包裝後的回呼函數。
+        """
+        def wrapper(result):
+            self.repo_state.refresh()
+            # 例如 git init 之後倉庫才存在，此時開始監看
+            self.repo_watcher.start()
+            if callback is not None:
+                callback(result)
+        return wrapper
+
+    def update_status(self, text):
+        """
+        在狀態列顯示背景命令的最新輸出。
+
+        參數:
+        text (str): 要顯示的文字。
+        """
+        self.status_label.setText(text)
+
+    def show_repo_summary(self):
+        """
+        沒有背景命令執行時，在狀態列顯示目前分支、領先落後的 commit 數量與變更的檔案數。
+        """
+        if self.executor.is_busy():
+            return
+        self.update_status(self.repo_state.summary() if self.repo_state.loaded else "就緒")
+
+    def changeEvent(self, event):
+        """
+        視窗重新取得焦點時更新倉庫狀態，反映在其他程式中對工作目錄檔案所做的變更。
+        工作目錄本身不在監看範圍內，大型倉庫中遞迴監看所有目錄的成本太高。
+
+        參數:
+        event (QEvent): 視窗狀態改變的事件。
+        """
+        if event.type() == QEvent.ActivationChange and self.isActiveWindow():
+            self.repo_state.refresh()
+        super().changeEvent(event)
+
+    def closeEvent(self, event):
+        """
+        關閉視窗時等待背景 Git 命令結束，避免寫入命令被中斷。
+
+        參數:
+        event (QCloseEvent): 關閉事件。
+        """
+        self.repo_watcher.stop()
+        self.prefetch.stop()
+        self.maintenance.stop()
+        if self.graph_window is not None:
+            # 停止圖表的讀取並寫入快取
+            self.graph_window.reject()
+        self.executor.wait_for_done()
+        # 關閉常駐的 Git 行程；物件資料庫只有在使用過時才需要關閉
+        close_shared_pools()
+        if "gitObjectDb" in sys.modules:
+            sys.modules["gitObjectDb"].close_shared_databases()
+        super().closeEvent(event)
 
     def init_repository(self):
         """
@@ -696,35 +871,87 @@ class GitManagerApp(QWidget):
         返回:
         return (None): 無返回值，成功時顯示倉庫初始化訊息，失敗時顯示錯誤訊息。
         """
-        output = self.run_git_command("git init")
-        if output:
-            # 如果初始化成功，顯示成功訊息
-            QMessageBox.information(self, "初始化倉庫", f"成功初始化倉庫：\n{output}")
+        # 如果初始化成功，顯示成功訊息
+        self.run_git_command_async(
+            "git init",
+            lambda output: QMessageBox.information(self, "初始化倉庫", f"成功初始化倉庫：\n{output}"))
 
     def commit_changes(self):
         """
-        提交當前工作目錄的變更，使用用戶指定的提交訊息。
+        提交當前工作目錄的變更，使用用戶指定的提交訊息。提交前先顯示會提交的變更，確認後才提交。
 
         返回:
         return (None): 無返回值，成功時顯示提交訊息，失敗時顯示錯誤訊息。
         """
-        output = self.run_git_command(f"git add . && git commit -m '{str(self.commit_entry.text())}'")
-        if output:
-            # 如果提交成功，顯示成功訊息
-            QMessageBox.information(self, "提交變更", f"提交成功：\n{output}")
+        def commit():
+            if not self.repo_state.is_dirty():
+                # 記憶體中的狀態顯示沒有任何變更，不必執行 Git
+                QMessageBox.information(self, "提交變更", "沒有需要提交的變更。")
+                return
+            # 先顯示會提交的變更，使用者可以取消勾選不想提交的檔案，確認後才提交
+            from diffView import DiffViewerDialog
+            from gitDiff import DiffSource
+            dialog = DiffViewerDialog(self.executor, DiffSource(), "檢視要提交的變更", accept_text="提交",
+                                      selectable=True, parent=self)
+            accepted = dialog.exec() == QDialog.Accepted
+            paths = dialog.selected_paths()
+            # 視窗是主視窗的子物件，不刪除時會連同所有變更的內容一直留在記憶體中
+            dialog.deleteLater()
+            if not accepted:
+                return
+            # 只暫存勾選的檔案，不以 git add . 重新雜湊整個工作目錄
+            self.commit_paths(paths, str(self.commit_entry.text()),
+                              lambda output: QMessageBox.information(self, "提交變更", f"提交成功：\n{output}"))
+
+        self.repo_state.when_loaded(
+            commit, lambda error: QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{error}"))
+
+    def commit_paths(self, paths, message, on_success=None):
+        """
+        在背景以選擇性暫存提交指定的檔案：只讀取一次 git status，再分批暫存這些路徑後提交。
+
+        參數:
+        paths (set of str or None): 要提交的路徑，None 表示所有變更。
+        message (str): 提交訊息。
+        on_success (callable, optional): 提交成功時以 git commit 的輸出呼叫的函數。
+
+        返回:
+        return (int): 背景任務的編號。
+        """
+        from stagingEngine import commit_selected
+        on_failure = lambda error: QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{error}")
+        if not self.repo_watcher.is_active():
+            on_success = self._refresh_after(on_success)
+            on_failure = self._refresh_after(on_failure)
+        # 每批暫存完成時回報進度，狀態列經由執行器的 progress 訊號顯示
+        return self.executor.submit_call(
+            lambda report: commit_selected(paths, message,
+                                           on_progress=lambda done, total: report(f"已暫存 {done}/{total} 個檔案")),
+            read_only=False, on_success=on_success, on_failure=on_failure, reports_progress=True)
 
     def push_changes(self):
         """
-        將當前分支的變更推送到遠端倉庫。2
+        將當前分支的變更推送到遠端倉庫。
 
         返回:
-        return (None): 無返回值，成功時顯示推送成功訊息，失敗時顯示錯誤訊息。
+        return (None): 無返回值，推送進度、結果與錯誤訊息顯示在進度視窗中。
         """
         repo = self.repo_entry.text() if self.repo_entry.text() else "origin"
-        output = self.run_git_command(f"git push {repo} master")
-        if output:
-            # 如果推送成功，顯示成功訊息
-            QMessageBox.information(self, "推送至遠端", f"推送成功：\n{output}")
+        behind = self.repo_state.snapshot.behind
+        if behind:
+            # 背景 fetch 已經得知遠端有新的 commit，不必等推送被拒絕才發現
+            confirm = QMessageBox.question(
+                self, "推送至遠端", f"目前分支落後上游 {behind} 個 commit，推送可能會被拒絕，是否仍要推送？")
+            if confirm != QMessageBox.Yes:
+                return
+        # 以 --progress 推送並即時顯示進度與傳輸速度，可以隨時取消。
+        # 推送不會改變 index 與工作目錄，以唯讀任務執行，網路很慢時也不會擋住其他讀取；完成後更新遠端分支的狀態
+        on_success = (lambda output: self.repo_state.refresh()) if self.repo_watcher.is_active() \
+            else self._refresh_after(None)
+        dialog = GitProgressDialog(self.executor, ["git", "push", "--progress", repo, "master"], "推送至遠端",
+                                   read_only=True, on_success=on_success, parent=self)
+        dialog.exec()
+        dialog.deleteLater()
 
     def show_branches(self):
         """
@@ -733,10 +960,26 @@ class GitManagerApp(QWidget):
         返回:
         return (None): 無返回值，成功時顯示分支列表，失敗時顯示錯誤訊息。
         """
-        output = self.run_git_command("git branch")
-        if output:
-            # 顯示目前的所有分支
-            QMessageBox.information(self, "顯示分支", f"目前分支：\n{output}")
+        # 直接從記憶體中的倉庫狀態顯示目前的所有分支，尚未讀取時先在背景讀取；
+        # 分支很多時以可篩選的清單顯示，不把所有名稱塞進訊息框
+        def show():
+            dialog = RefPickerDialog("顯示分支", f"目前分支：{self.repo_state.snapshot.branch or '分離的 HEAD'}",
+                                     self.repo_state.branch_names(), selectable=False, parent=self)
+            dialog.exec()
+            dialog.deleteLater()
+
+        self.repo_state.when_loaded(show, lambda error: QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{error}"))
+
+    def local_branch_source(self):
+        """
+        取得分支選擇視窗的本地分支來源：倉庫狀態已讀取時直接使用記憶體中的分支，否則在背景讀取。
+
+        返回:
+        return (dict): 傳給 RefPickerDialog.get_ref 的 names 或 executor 參數。
+        """
+        if self.repo_state.loaded:
+            return {"names": self.repo_state.branch_names()}
+        return {"executor": self.executor}
 
     def create_branch(self):
         """
@@ -748,11 +991,11 @@ class GitManagerApp(QWidget):
         # 顯示輸入對話框，讓使用者輸入新分支名稱
         branch_name, ok = QInputDialog.getText(self, "新分支名稱", "請輸入新分支名稱:")
         if ok and branch_name:
-            # 執行 Git 創建新分支的命令
-            output = self.run_git_command(f"git checkout -b {branch_name}")
-            if output:
-                # 如果成功，顯示訊息告知用戶已成功創建並切換到新分支
-                QMessageBox.information(self, "創建新分支", f"成功創建並切換到新分支：\n{output}")
+            # 執行 Git 創建新分支的命令，成功後告知用戶已創建並切換到新分支
+            # （git checkout -b 的訊息輸出在標準錯誤，因此這裡顯示分支名稱）
+            self.run_git_command_async(
+                f"git checkout -b {branch_name}",
+                lambda output: QMessageBox.information(self, "創建新分支", f"成功創建並切換到新分支：\n{output or branch_name}"))
 
     def switch_branch(self):
         """
@@ -761,14 +1004,13 @@ class GitManagerApp(QWidget):
         返回:
         return (None): 無返回值，成功時顯示切換成功訊息，失敗時顯示錯誤訊息。
         """
-        # 顯示輸入對話框，讓使用者輸入要切換的分支名稱
-        branch_name, ok = QInputDialog.getText(self, "切換分支", "請輸入要切換的分支名稱:")
+        # 顯示分支選擇視窗，讓使用者從本地分支中選擇要切換的分支
+        branch_name, ok = RefPickerDialog.get_ref(self, "切換分支", "請選擇要切換的分支:", **self.local_branch_source())
         if ok and branch_name:
-            # 執行 Git 切換分支的命令
-            output = self.run_git_command(f"git checkout {branch_name}")
-            if output:
-                # 如果成功，顯示切換成功的訊息
-                QMessageBox.information(self, "切換分支", f"成功切換到分支：\n{output}")
+            # 執行 Git 切換分支的命令，成功後顯示切換成功的訊息
+            self.run_git_command_async(
+                f"git checkout {branch_name}",
+                lambda output: QMessageBox.information(self, "切換分支", f"成功切換到分支：\n{output or branch_name}"))
 
     def merge_branch(self):
         """
@@ -777,18 +1019,49 @@ class GitManagerApp(QWidget):
         返回:
         return (None): 無返回值，成功時顯示合併成功訊息，遇到衝突則進行處理。
         """
-        # 顯示輸入對話框，讓使用者輸入要合併的分支名稱
-        branch_name, ok = QInputDialog.getText(self, "合併分支", "請輸入要合併的分支名稱:")
+        # 顯示分支選擇視窗，讓使用者從本地與遠端分支中選擇要合併的分支
+        branch_name, ok = RefPickerDialog.get_ref(self, "合併分支", "請選擇要合併的分支:", executor=self.executor,
+                                                  prefixes=("refs/heads", "refs/remotes"))
         if ok and branch_name:
-            # 執行 Git 合併分支的命令
-            output = self.run_git_command(f"git merge {branch_name}")
-            if output:
-                # 如果合併成功，顯示成功訊息
-                QMessageBox.information(self, "合併分支", f"成功合併分支：\n{output}")
-            else:
-                # 如果合併發生衝突，調用處理衝突的方法
+            def on_failure(error):
+                # 如果合併發生衝突，顯示錯誤後調用處理衝突的方法
+                QMessageBox.critical(self, "錯誤", f"Git 命令失敗：\n{error}")
                 self.handle_merge_conflict()
 
+            def merge(already_merged):
+                if already_merged:
+                    QMessageBox.information(self, "合併分支", f"分支 {branch_name} 已經合併到目前分支")
+                    return
+                # 執行 Git 合併分支的命令，成功時顯示成功訊息
+                self.run_git_command_async(
+                    f"git merge {branch_name}",
+                    lambda output: QMessageBox.information(self, "合併分支", f"成功合併分支：\n{output}"),
+                    on_failure=on_failure)
+
+            # 先以 commit-graph 的世代編號判斷分支是否已經是目前分支的祖先，是的話不必執行 git merge
+            self.executor.submit_call(lambda: self.is_merged(branch_name), on_success=merge,
+                                      on_failure=lambda error: merge(False))
+
+    @staticmethod
+    def is_merged(branch_name):
+        """
+        判斷分支是否已經合併到目前分支，也就是分支指向的 commit 是否為 HEAD 的祖先。
+
+        參數:
+        branch_name (str): 分支名稱或 commit 雜湊值。
+
+        返回:
+        return (bool): 已經合併時返回 True；無法直接讀取物件資料庫或找不到分支時返回 False，交由 git merge 處理。
+        """
+        from gitAncestry import shared_ancestry
+        ancestry = shared_ancestry()
+        if ancestry is None:
+            return False
+        try:
+            return ancestry.is_ancestor(branch_name, "HEAD")
+        except ValueError:
+            return False
+
     def rename_branch(self):
         """
         重命名當前 Git 分支。
@@ -799,11 +1072,10 @@ class GitManagerApp(QWidget):
         # 顯示輸入對話框，讓使用者輸入新的分支名稱
         new_branch_name, ok = QInputDialog.getText(self, "重命名分支", "請輸入新的分支名稱:")
         if ok and new_branch_name:
-            # 執行 Git 分支重命名命令
-            output = self.run_git_command(f"git branch -m {new_branch_name}")
-            if output is not None:
-                # 如果成功，顯示成功重命名訊息
-                QMessageBox.information(self, "重命名分支", f"成功重命名當前分支為：{new_branch_name}")
+            # 執行 Git 分支重命名命令，成功時顯示成功重命名訊息
+            self.run_git_command_async(
+                f"git branch -m {new_branch_name}",
+                lambda output: QMessageBox.information(self, "重命名分支", f"成功重命名當前分支為：{new_branch_name}"))
 
     def delete_branch(self):
         """
@@ -812,17 +1084,16 @@ class GitManagerApp(QWidget):
         返回:
         return (None): 無返回值，成功時顯示刪除成功訊息。
         """
-        # 顯示輸入對話框，讓使用者輸入要刪除的分支名稱
-        branch_name, ok = QInputDialog.getText(self, "刪除分支", "請輸入要刪除的分支名稱:")
+        # 顯示分支選擇視窗，讓使用者從本地分支中選擇要刪除的分支
+        branch_name, ok = RefPickerDialog.get_ref(self, "刪除分支", "請選擇要刪除的分支:", **self.local_branch_source())
         if ok and branch_name:
             # 顯示確認對話框，確保用戶確認要刪除分支
             confirm = QMessageBox.question(self, "刪除確認", f"確定要刪除分支 {branch_name} 嗎？")
             if confirm == QMessageBox.Yes:
-                # 執行 Git 刪除分支的命令
-                output = self.run_git_command(f"git branch -d {branch_name}")
-                if output:
-                    # 如果成功，顯示刪除成功的訊息
-                    QMessageBox.information(self, "刪除分支", f"成功刪除分支：\n{output}")
+                # 執行 Git 刪除分支的命令，成功時顯示刪除成功的訊息
+                self.run_git_command_async(
+                    f"git branch -d {branch_name}",
+                    lambda output: QMessageBox.information(self, "刪除分支", f"成功刪除分支：\n{output}"))
 
     def handle_merge_conflict(self):
         """
@@ -835,61 +1106,102 @@ class GitManagerApp(QWidget):
         resolve = QMessageBox.question(self, "合併衝突", "發生衝突，是否已解決並提交？")
         if resolve == QMessageBox.Yes:
             # 如果用戶已解決，執行提交命令
-            self.run_git_command("git add . && git commit -m '解決合併衝突'")
-            QMessageBox.information(self, "合併衝突", "已解決並提交衝突。")
+            self.commit_paths(None, "解決合併衝突",
+                              lambda output: QMessageBox.information(self, "合併衝突", "已解決並提交衝突。"))
 
     def show_branch_graph(self):
         """
-        顯示 Git 分支的圖表，通過 NetworkX 生成分支結構圖並在視窗中顯示。
+        顯示 Git 分支的圖表，以串流方式載入提交歷史，並以泳道佈局在視窗中顯示。
+        第一個畫面的資料讀到後立即顯示，更早的歷史在使用者捲動時才繼續載入。
+        圖表視窗只創建一次，關閉後再開啟時沿用已載入的歷史，記憶體用量不會隨開啟次數增加。
 
         返回:
-        return (None): 無返回值，成功時顯示分支圖表，失敗時顯示錯誤訊息。
-        """
-        # 根據操作系統設置相應的 Git 日誌命令來取得分支圖表的數據
-        if self.os_type == "Windows":
-            git_command = 'git log --all --pretty=format:"%h %p"'
+        return (None): 無返回值，載入狀態與錯誤訊息顯示在圖表視窗的狀態列。
+        """
+        created = self.graph_window is None
+        if created:
+            # 第一次開啟時創建圖表視窗；圖表模組在第一次使用時才匯入
+            from commitGraphView import CommitGraphWindow
+            self.graph_window = CommitGraphWindow(self, executor=self.executor)
+            # 視窗開啟期間 ref 改變時（例如在終端機執行 git fetch），只載入新增的 commit
+            self.repo_watcher.refsChanged.connect(self.graph_window.refresh)
+        # 非強制回應的視窗，開啟期間仍可操作主視窗
+        self.graph_window.show()
+        self.graph_window.raise_()
+        self.graph_window.activateWindow()
+        if created:
+            # 開始串流載入 git log 的輸出
+            self.graph_window.load()
         else:
-            git_command = "git log --all --pretty=format:'%h %p'"
+            # 沿用同一個視窗與已載入的佈局，只讀取關閉期間新增的 commit
+            self.graph_window.resume()
 
-        # 執行 Git 命令來獲取日誌數據
-        output = self.run_git_command(git_command)
-        if output:
-            edges = []
-            # 解析 Git 日誌的輸出，提取提交之間的關聯（邊）
-            for line in output.split('\n'):
-                parts = line.strip().split()
-                if len(parts) > 1:
-                    parent_hashes = parts[1:]
-                    for parent in parent_hashes:
-                        edges.append((parent, parts[0]))
-
-            # 創建有向圖來顯示分支結構
-            G = nx.DiGraph()
-            G.add_edges_from(edges)
-
-            # 使用 spring 布局來安排節點的位置
-            pos = nx.spring_layout(G)
-            plt.figure(figsize=(12, 8))
-            # 繪製圖表，節點顯示提交哈希
-            nx.draw(G, pos, with_labels=True, node_size=800, node_color='#A4DDA4', arrowsize=20)
-            plt.title("Git 分支圖表", fontsize=16)
-
-            # 創建一個新的視窗來顯示圖表
-            graph_window = QDialog(self)
-            graph_window.setWindowTitle("分支圖表")
-            graph_layout = QVBoxLayout(graph_window)
-
-            # 將 matplotlib 圖表嵌入到 Qt 視窗中
-            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-            canvas = FigureCanvas(plt.gcf())
-            graph_layout.addWidget(canvas)
-            graph_window.exec()
-
-            # 清理圖表，避免重複繪製
-            plt.clf()
-        else:
-            # 如果無法獲取分支圖表數據，顯示錯誤訊息
-            QMessageBox.information(self, "分支圖表", "無法取得分支圖表資料。")
+    def show_batch_queue(self):
+        """
+        顯示批次操作視窗，一次排入多個新增檔案、刪除分支或推送操作，並以最少次數的 Git 命令執行。
+
+        返回:
+        return (None): 無返回值，各命令的結果顯示在批次操作視窗中。
+        """
+        from batchQueueView import BatchQueueDialog
+        remote = self.repo_entry.text() if self.repo_entry.text() else "origin"
+        dialog = BatchQueueDialog(self.repo_state, self.executor, remote=remote, parent=self)
+        dialog.exec()
+
+    def show_dashboard(self):
+        """
+        顯示多倉庫總覽，同時對所有登錄的倉庫執行 fetch、pull 或讀取狀態。
+
+        返回:
+        return (None): 無返回值，各倉庫的結果顯示在總覽表格中。
+        """
+        from repoDashboard import RepositoryDashboard
+        dashboard = RepositoryDashboard(parent=self)
+        dashboard.exec()
+
+    def show_large_repo_mode(self):
+        """
+        顯示大型倉庫模式視窗，啟用 fsmonitor、untracked cache、index v4 與 split index，並比較前後的延遲。
+
+        返回:
+        return (None): 無返回值，設定與測量結果顯示在視窗中。
+        """
+        from repoTuningView import LargeRepoDialog
+        dialog = LargeRepoDialog(self.executor, parent=self)
+        dialog.exec()
+
+    def show_maintenance(self):
+        """
+        顯示倉庫維護面板，列出背景維護工作的排程與每次執行前後 log 與 status 的延遲。
+
+        返回:
+        return (None): 無返回值，排程在視窗關閉後繼續進行。
+        """
+        from maintenanceView import MaintenanceDialog
+        dialog = MaintenanceDialog(self.maintenance, parent=self)
+        dialog.exec()
+
+    def clone_repository(self):
+        """
+        複製遠端倉庫，可以選擇部分複製與稀疏檢出，讓複製時間與磁碟用量只與需要的目錄有關。
+
+        返回:
+        return (None): 無返回值，複製進度與結果顯示在進度視窗中。
+        """
+        from sparseCheckoutView import CloneDialog
+        dialog = CloneDialog(self.executor, url=self.repo_entry.text(), parent=self)
+        dialog.exec()
+
+    def show_sparse_checkout(self):
+        """
+        顯示稀疏檢出視窗，選擇要檢出的目錄，並比較套用前後的檢出檔案數量、磁碟用量與 status 的耗時。
+
+        返回:
+        return (None): 無返回值，設定與測量結果顯示在視窗中。
+        """
+        from sparseCheckoutView import SparseCheckoutDialog
+        dialog = SparseCheckoutDialog(self.executor, parent=self)
+        dialog.exec()
 
 if __name__ == "__main__":
     """
@@ -0,0 +1,248 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtCore import QObject, Signal
+import subprocess
+import threading
+import collections
+
+from commitGraph import parse_log_line
+
+
+class GitLogStreamer(QObject):
+    """
+    以串流方式讀取 `git log` 的輸出。資料從管線中一塊一塊讀入並逐行解析，
+    每讀到一批 commit 就發出訊號，不會等待整個命令結束，也不會保留完整的輸出字串。
+    主執行緒收到訊號後以 take_records 取出已解析的記錄。
+
+    讀到使用者要求的列數之後會暫停讀取，Git 行程會因為管線滿了而等待，
+    因此在數百萬筆 commit 的倉庫中，記憶體用量只與已載入的列數成正比。
+
+    參數:
+    args (list of str): git log 的參數，例如 ["--all", "--pretty=format:%H %P"]。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    first_batch (int, optional): 第一批 commit 的數量，越小越快顯示第一個畫面，默認為 200。
+    batch_rows (int, optional): 之後每一批 commit 的數量，默認為 2000。
+    stdin_data (str, optional): 傳給 git log 標準輸入的資料，搭配 --stdin 傳入大量起點。
+    parent (QObject, optional): 父物件，默認為 None。
+
+    訊號:
+    - recordsReady (): 有新的一批 commit 記錄可以取出。
+    - finished (): 所有歷史都已讀取完畢。
+    - failed (str): Git 命令失敗時的錯誤訊息。
+    """
+    recordsReady = Signal()
+    finished = Signal()
+    failed = Signal(str)
+
+    # 每次從管線讀取的位元組數
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, args, cwd=None, first_batch=200, batch_rows=2000, stdin_data=None, parent=None):
+        super().__init__(parent)
+        self.args = args
+        self.cwd = cwd
+        self.stdin_data = stdin_data
+        self.first_batch = first_batch
+        self.batch_rows = batch_rows
+        self.process = None
+        # 已讀取的列數與目前允許讀取到的列數
+        self.loaded = 0
+        self._target = 0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = None
+        # 標準錯誤由另一條執行緒收集，避免警告訊息塞滿管線時 git log 停住
+        self._stderr_chunks = []
+        self._stderr_reader = None
+        # 已解析但尚未被主執行緒取出的記錄
+        self._pending = collections.deque()
+
+    def start(self, rows):
+        """
+        啟動 git log 並在背景讀取，直到讀滿指定的列數後暫停。
+
+        參數:
+        rows (int): 第一次要載入的列數。
+        """
+        self._target = rows
+        stdin = subprocess.PIPE if self.stdin_data is not None else subprocess.DEVNULL
+        self.process = subprocess.Popen(["git", "log", *self.args], cwd=self.cwd, stdin=stdin,
+                                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if self.stdin_data is not None:
+            # 在另一條執行緒寫入標準輸入，避免與讀取輸出互相等待
+            threading.Thread(target=self._write_stdin, daemon=True).start()
+        self._stderr_reader = threading.Thread(target=lambda: self._stderr_chunks.append(self.process.stderr.read()),
+                                               daemon=True)
+        self._stderr_reader.start()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _write_stdin(self):
+        """
+        將 stdin_data 寫入 git log 的標準輸入後關閉。
+        """
+        try:
+            self.process.stdin.write(self.stdin_data.encode())
+            self.process.stdin.close()
+        except OSError:
+            # 行程已被停止
+            pass
+
+    def request_more(self, rows):
+        """
+        要求再多載入指定列數的歷史，通常在使用者捲動到接近底部時呼叫。
+
+        參數:
+        rows (int): 要多載入的列數。
+        """
+        with self._condition:
+            self._target = max(self._target, self.loaded + rows)
+            self._condition.notify()
+
+    def take_records(self):
+        """
+        取出目前所有已解析但尚未處理的 commit 記錄。
+
+        返回:
+        return (list): (commit 雜湊值, 父 commit 雜湊值列表) 的列表。
+        """
+        records = []
+        while self._pending:
+            records.extend(self._pending.popleft())
+        return records
+
+    def stop(self):
+        """
+        停止讀取並結束 Git 行程。
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+        # 等待讀取執行緒結束，避免它在物件銷毀後仍然發出訊號
+        if self._thread is not None:
+            self._thread.join(1.0)
+
+    def _wait_for_demand(self):
+        """
+        已讀到目標列數時暫停，直到要求更多資料或被停止。
+
+        返回:
+        return (bool): 是否應該繼續讀取。
+        """
+        with self._condition:
+            while self.loaded >= self._target and not self._stopped:
+                self._condition.wait()
+            return not self._stopped
+
+    def _read(self):
+        """
+        在背景執行緒中逐塊讀取管線並解析成 commit 記錄。
+        """
+        stdout = self.process.stdout
+        remainder = b""
+        batch = []
+        batch_size = self.first_batch
+        while self._wait_for_demand():
+            chunk = stdout.read1(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            lines = (remainder + chunk).split(b"\n")
+            # 最後一段可能是不完整的一行，留到下一塊再處理
+            remainder = lines.pop()
+            for line in lines:
+                record = parse_log_line(line.decode())
+                if record:
+                    batch.append(record)
+            if len(batch) >= batch_size or self.loaded + len(batch) >= self._target:
+                self._emit(batch)
+                batch = []
+                batch_size = self.batch_rows
+
+        if self._stopped:
+            return
+        # 處理最後一行與尚未送出的記錄
+        record = parse_log_line(remainder.decode())
+        if record:
+            batch.append(record)
+        if batch:
+            self._emit(batch)
+        returncode = self.process.wait()
+        self._stderr_reader.join()
+        if returncode != 0:
+            self.failed.emit(b"".join(self._stderr_chunks).decode(errors="replace").strip())
+        else:
+            self.finished.emit()
+
+    def _emit(self, batch):
+        """
+        送出一批 commit 記錄並更新已載入的列數。
+
+        參數:
+        batch (list): commit 記錄列表。
+        """
+        with self._condition:
+            self.loaded += len(batch)
+        self._pending.append(batch)
+        self.recordsReady.emit()
+
+
+class NativeLogStreamer(GitLogStreamer):
+    """
+    以 GitObjectDatabase 直接讀取 .git 目錄走訪提交歷史的串流讀取器，不啟動 `git log` 行程。
+    訊號、分批與暫停讀取的方式都與 GitLogStreamer 相同，輸出的順序也與 `git log` 相同，
+    因此兩者可以互相替換，快取中以 --skip 記錄的列數也能沿用。
+
+    參數:
+    database (GitObjectDatabase): 倉庫的物件資料庫。
+    include (list of str): 起點的雜湊值。
+    exclude (list of str, optional): 要排除的起點。
+    skip (int, optional): 略過最前面的 commit 數量。
+    first_batch (int, optional): 第一批 commit 的數量，默認為 200。
+    batch_rows (int, optional): 之後每一批 commit 的數量，默認為 2000。
+    parent (QObject, optional): 父物件，默認為 None。
+    """
+
+    def __init__(self, database, include, exclude=(), skip=0, first_batch=200, batch_rows=2000, parent=None):
+        super().__init__([], first_batch=first_batch, batch_rows=batch_rows, parent=parent)
+        self.database = database
+        self.include = list(include)
+        self.exclude = list(exclude)
+        self.skip = skip
+
+    def start(self, rows):
+        """
+        在背景開始走訪提交歷史，直到讀滿指定的列數後暫停。
+
+        參數:
+        rows (int): 第一次要載入的列數。
+        """
+        self._target = rows
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        """
+        在背景執行緒中走訪提交歷史並分批送出。
+        """
+        batch = []
+        batch_size = self.first_batch
+        try:
+            for record in self.database.walk(self.include, self.exclude, self.skip):
+                # 每一批開始前等待使用者要求更多資料，被停止時立即結束
+                if self._stopped or (not batch and not self._wait_for_demand()):
+                    return
+                batch.append(record)
+                if len(batch) >= batch_size or self.loaded + len(batch) >= self._target:
+                    self._emit(batch)
+                    batch = []
+                    batch_size = self.batch_rows
+        except Exception as e:
+            # 物件資料庫損壞或格式不符時，錯誤訊息與 git log 失敗時一樣顯示在狀態列
+            self.failed.emit(str(e))
+            return
+        if self._stopped:
+            return
+        if batch:
+            self._emit(batch)
+        self.finished.emit()
@@ -0,0 +1,1128 @@
+# 直接讀取 .git 目錄的物件資料庫：refs、packed-refs、鬆散物件、packfile 與 commit-graph
+from bisect import bisect_right
+import collections
+import heapq
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+from gitWorkerPool import parse_commit
+
+# packfile 中的物件類型代碼
+OBJECT_TYPES = {1: "commit", 2: "tree", 3: "blob", 4: "tag"}
+OFS_DELTA = 6
+REF_DELTA = 7
+# commit-graph 中表示沒有父 commit 的值，以及表示父 commit 在 EDGE 區塊的旗標
+GRAPH_PARENT_NONE = 0x70000000
+GRAPH_EXTRA_EDGES = 0x80000000
+# 已解開的 delta 基底物件最多快取的數量
+DELTA_CACHE_SIZE = 256
+# 有排除點時，佇列中只剩要排除的 commit 之後再多走訪的步數，與 git 的 SLOP 相同
+WALK_SLOP = 5
+
+
+def _map_file(path):
+    """
+    以唯讀方式將整個檔案映射到記憶體。
+
+    參數:
+    path (str): 檔案路徑。
+
+    返回:
+    return (mmap.mmap): 記憶體映射。
+    """
+    with open(path, "rb") as mapped_file:
+        return mmap.mmap(mapped_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _search_sorted(data, start, count, size, key):
+    """
+    在記憶體映射中排序好的固定長度雜湊值表裡以二分搜尋尋找 key。
+
+    參數:
+    data (mmap.mmap): 記憶體映射。
+    start (int): 表格的起始位置。
+    count (int): 表格的項目數。
+    size (int): 每個雜湊值的長度。
+    key (bytes): 要尋找的二進位雜湊值。
+
+    返回:
+    return (int): 找到時返回項目的位置，否則返回 -1。
+    """
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        position = start + middle * size
+        value = data[position:position + size]
+        if value < key:
+            low = middle + 1
+        elif value > key:
+            high = middle
+        else:
+            return middle
+    return -1
+
+
+def apply_delta(base, delta):
+    """
+    將 packfile 中的 delta 套用到基底物件上。
+
+    參數:
+    base (bytes): 基底物件的內容。
+    delta (bytes): delta 資料。
+
+    返回:
+    return (bytes): 還原後的物件內容。
+    """
+    position = 0
+    # delta 開頭依序是基底與結果的長度，以可變長度整數表示
+    sizes = []
+    for _ in range(2):
+        value = shift = 0
+        while True:
+            byte = delta[position]
+            position += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        sizes.append(value)
+    if sizes[0] != len(base):
+        raise ValueError("delta 的基底物件長度不符")
+
+    result = bytearray()
+    while position < len(delta):
+        opcode = delta[position]
+        position += 1
+        if opcode & 0x80:
+            # 從基底物件複製一段資料，各旗標位元表示位移與長度中有哪些位元組
+            offset = length = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[position] << (8 * bit)
+                    position += 1
+            for bit in range(3):
+                if opcode & (0x10 << bit):
+                    length |= delta[position] << (8 * bit)
+                    position += 1
+            result += base[offset:offset + (length or 0x10000)]
+        elif opcode:
+            # 直接插入接下來的 opcode 個位元組
+            result += delta[position:position + opcode]
+            position += opcode
+        else:
+            raise ValueError("delta 中有無效的指令")
+    if len(result) != sizes[1]:
+        raise ValueError("delta 的結果長度不符")
+    return bytes(result)
+
+
+class PackIndex:
+    """
+    第 2 版的 packfile 索引（.idx），以記憶體映射讀取，透過 fanout 表與二分搜尋找出物件在 packfile 中的位置。
+
+    參數:
+    path (str): .idx 檔案的路徑。
+    hash_size (int): 雜湊值的長度，SHA-1 為 20，SHA-256 為 32。
+    """
+
+    def __init__(self, path, hash_size):
+        self.path = path
+        self.hash_size = hash_size
+        self.data = _map_file(path)
+        if self.data[:8] != b"\377tOc\0\0\0\2":
+            raise ValueError(f"不支援的 packfile 索引格式：{path}")
+        self.fanout = struct.unpack_from(">256I", self.data, 8)
+        self.count = self.fanout[255]
+        # 雜湊值、CRC、4 位元組位移與 8 位元組位移表依序排列
+        self.names_start = 8 + 256 * 4
+        self.offsets_start = self.names_start + self.count * (hash_size + 4)
+        self.large_offsets_start = self.offsets_start + self.count * 4
+
+    def find(self, oid):
+        """
+        尋找物件在 packfile 中的位移。
+
+        參數:
+        oid (bytes): 二進位雜湊值。
+
+        返回:
+        return (int or None): 物件的位移，不在這個 packfile 中時返回 None。
+        """
+        first = oid[0]
+        low = self.fanout[first - 1] if first else 0
+        index = _search_sorted(self.data, self.names_start + low * self.hash_size,
+                               self.fanout[first] - low, self.hash_size, oid)
+        if index < 0:
+            return None
+        offset, = struct.unpack_from(">I", self.data, self.offsets_start + (low + index) * 4)
+        if offset & 0x80000000:
+            # 超過 2 GiB 的位移存放在 8 位元組位移表中
+            offset, = struct.unpack_from(">Q", self.data, self.large_offsets_start + (offset & 0x7FFFFFFF) * 8)
+        return offset
+
+    def close(self):
+        """
+        關閉記憶體映射。
+        """
+        self.data.close()
+
+
+class PackFile:
+    """
+    以記憶體映射讀取的 packfile，可以解出一般物件與 OFS_DELTA、REF_DELTA 兩種 delta 物件。
+
+    參數:
+    path (str): .pack 檔案的路徑。
+    index (PackIndex): 對應的索引。
+    """
+
+    def __init__(self, path, index):
+        self.path = path
+        self.index = index
+        self.data = _map_file(path)
+        if self.data[:4] != b"PACK":
+            raise ValueError(f"不是有效的 packfile：{path}")
+
+    def _header(self, offset):
+        """
+        解析物件標頭。
+
+        參數:
+        offset (int): 物件在 packfile 中的位移。
+
+        返回:
+        return (tuple): (類型代碼, 解壓縮後的長度, 基底物件, 壓縮資料的起始位置)，
+        基底物件對 OFS_DELTA 是位移，對 REF_DELTA 是雜湊值，其他類型為 None。
+        """
+        data = self.data
+        byte = data[offset]
+        position = offset + 1
+        type_code = (byte >> 4) & 7
+        size = byte & 0x0F
+        shift = 4
+        while byte & 0x80:
+            byte = data[position]
+            position += 1
+            size |= (byte & 0x7F) << shift
+            shift += 7
+
+        base = None
+        if type_code == OFS_DELTA:
+            # 基底物件的相對位移，以每個位元組加一的可變長度整數表示
+            byte = data[position]
+            position += 1
+            distance = byte & 0x7F
+            while byte & 0x80:
+                byte = data[position]
+                position += 1
+                distance = ((distance + 1) << 7) | (byte & 0x7F)
+            base = offset - distance
+        elif type_code == REF_DELTA:
+            base = data[position:position + self.index.hash_size]
+            position += self.index.hash_size
+        return type_code, size, base, position
+
+    def _inflate(self, position, size):
+        """
+        從指定位置解壓縮 zlib 資料。
+
+        參數:
+        position (int): 壓縮資料的起始位置。
+        size (int): 解壓縮後的長度。
+
+        返回:
+        return (bytes): 解壓縮後的資料。
+        """
+        # 壓縮後通常不會比原始資料大很多，先讀取略大於原始長度的範圍，不足時再加倍
+        window = size + 64
+        while True:
+            decompressor = zlib.decompressobj()
+            result = decompressor.decompress(self.data[position:position + window])
+            if decompressor.eof:
+                return result
+            if position + window >= len(self.data):
+                raise ValueError(f"packfile 中的物件資料不完整：{self.path}")
+            window *= 2
+
+    def close(self):
+        """
+        關閉記憶體映射與索引。
+        """
+        self.data.close()
+        self.index.close()
+
+
+class CommitGraph:
+    """
+    commit-graph 檔案（objects/info/commit-graph 或 commit-graphs 目錄下的分層檔案）。
+    不必解壓縮 commit 物件就能取得父 commit、提交時間與世代編號。
+
+    所有層的 commit 以全域位置編號：第一層從 0 開始，之後每一層接在前一層之後。
+
+    參數:
+    paths (list of str): 由最底層到最上層排列的 commit-graph 檔案路徑。
+    hash_size (int): 雜湊值的長度。
+    """
+
+    def __init__(self, paths, hash_size):
+        self.hash_size = hash_size
+        self.layers = []
+        # 每一層第一個 commit 的全域位置
+        self.layer_starts = []
+        total = 0
+        for path in paths:
+            layer = self._parse_layer(path)
+            self.layer_starts.append(total)
+            self.layers.append(layer)
+            total += layer["count"]
+        self.count = total
+
+    def _parse_layer(self, path):
+        """
+        解析一層 commit-graph 的檔頭與區塊表。
+
+        參數:
+        path (str): 檔案路徑。
+
+        返回:
+        return (dict): 這一層的記憶體映射與各區塊的位置。
+        """
+        data = _map_file(path)
+        signature, version, hash_version, chunk_count = struct.unpack_from(">4sBBB", data, 0)
+        if signature != b"CGPH" or version != 1:
+            raise ValueError(f"不支援的 commit-graph 格式：{path}")
+        chunks = {}
+        for number in range(chunk_count):
+            chunk_id, offset = struct.unpack_from(">4sQ", data, 8 + number * 12)
+            chunks[chunk_id] = offset
+        layer = {"data": data, "fanout": chunks[b"OIDF"], "names": chunks[b"OIDL"],
+                 "commits": chunks[b"CDAT"], "edges": chunks.get(b"EDGE")}
+        layer["count"] = struct.unpack_from(">I", data, layer["fanout"] + 255 * 4)[0]
+        return layer
+
+    def find(self, oid):
+        """
+        尋找 commit 在 commit-graph 中的全域位置。
+
+        參數:
+        oid (bytes): 二進位雜湊值。
+
+        返回:
+        return (int): 全域位置，不在 commit-graph 中時返回 -1。
+        """
+        first = oid[0]
+        for layer, layer_start in zip(self.layers, self.layer_starts):
+            data = layer["data"]
+            low = struct.unpack_from(">I", data, layer["fanout"] + (first - 1) * 4)[0] if first else 0
+            high = struct.unpack_from(">I", data, layer["fanout"] + first * 4)[0]
+            index = _search_sorted(data, layer["names"] + low * self.hash_size, high - low, self.hash_size, oid)
+            if index >= 0:
+                return layer_start + low + index
+        return -1
+
+    def _locate(self, position):
+        """
+        將全域位置轉換成所在的層與層內位置。
+        """
+        number = bisect_right(self.layer_starts, position) - 1
+        return self.layers[number], position - self.layer_starts[number]
+
+    def oid(self, position):
+        """
+        取得指定位置的 commit 雜湊值。
+
+        參數:
+        position (int): 全域位置。
+
+        返回:
+        return (bytes): 二進位雜湊值。
+        """
+        layer, local = self._locate(position)
+        start = layer["names"] + local * self.hash_size
+        return layer["data"][start:start + self.hash_size]
+
+    def commit(self, position):
+        """
+        讀取指定位置的 commit 資料。
+
+        參數:
+        position (int): 全域位置。
+
+        返回:
+        return (tuple): (父 commit 的全域位置列表, 提交時間, 拓撲世代編號)。
+        """
+        layer, local = self._locate(position)
+        data = layer["data"]
+        first_parent, second_parent, generation, time_low = struct.unpack_from(
+            ">IIII", data, layer["commits"] + local * (self.hash_size + 16) + self.hash_size)
+        parents = []
+        if first_parent != GRAPH_PARENT_NONE:
+            parents.append(first_parent)
+        if second_parent & GRAPH_EXTRA_EDGES:
+            # 章魚合併：第二個之後的父 commit 都列在 EDGE 區塊中，最後一個帶有結束旗標
+            edge = layer["edges"] + (second_parent & 0x7FFFFFFF) * 4
+            while True:
+                value, = struct.unpack_from(">I", data, edge)
+                parents.append(value & 0x7FFFFFFF)
+                if value & GRAPH_EXTRA_EDGES:
+                    break
+                edge += 4
+        elif second_parent != GRAPH_PARENT_NONE:
+            parents.append(second_parent)
+        # 第三個欄位的高 30 位元是拓撲世代編號，低 2 位元是提交時間的最高位元
+        return parents, ((generation & 3) << 32) | time_low, generation >> 2
+
+    def close(self):
+        """
+        關閉所有記憶體映射。
+        """
+        for layer in self.layers:
+            layer["data"].close()
+
+
+def find_git_dir(cwd=None):
+    """
+    從指定路徑往上尋找 .git 目錄，支援以 `gitdir:` 指向其他位置的 .git 檔案。
+
+    參數:
+    cwd (str, optional): 起始路徑，默認為目前目錄。
+
+    返回:
+    return (str or None): .git 目錄的絕對路徑，找不到時返回 None。
+    """
+    path = os.path.abspath(cwd or os.getcwd())
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            with open(candidate, encoding="utf-8") as git_file:
+                content = git_file.read().strip()
+            if content.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(path, content[len("gitdir:"):].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+class GitObjectDatabase:
+    """
+    不啟動 Git 行程、直接讀取 .git 目錄的唯讀物件資料庫，供 show_branches 與分支圖表等讀取路徑使用。
+    寫入操作仍然透過 Git 命令列執行。
+
+    鬆散物件以 zlib 解壓縮讀取；packfile 與 .idx 索引、commit-graph 都以記憶體映射讀取。
+    可以在多條執行緒中同時使用。
+
+    參數:
+    git_dir (str): .git 目錄的路徑。
+    """
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        # `git worktree` 的工作目錄中，物件與 refs 放在主要倉庫的共用目錄
+        commondir_file = os.path.join(git_dir, "commondir")
+        if os.path.isfile(commondir_file):
+            with open(commondir_file, encoding="utf-8") as commondir:
+                self.common_dir = os.path.normpath(os.path.join(git_dir, commondir.read().strip()))
+        else:
+            self.common_dir = git_dir
+        self.hash_size = self._read_hash_size()
+        self.object_dirs = self._object_dirs(os.path.join(self.common_dir, "objects"))
+
+        self._lock = threading.Lock()
+        self._packs = []
+        self._pack_signature = None
+        self._commit_graph = None
+        self._commit_graph_signature = None
+        self._packed_refs = {}
+        self._packed_refs_signature = None
+        # 已解開的 delta 基底物件，以 (packfile 路徑, 位移) 為鍵
+        self._delta_cache = collections.OrderedDict()
+
+    def _read_hash_size(self):
+        """
+        從倉庫設定判斷雜湊演算法。使用 reftable 等不支援的格式時拋出 ValueError。
+
+        返回:
+        return (int): 雜湊值的長度。
+        """
+        hash_size = 20
+        config_path = os.path.join(self.common_dir, "config")
+        if not os.path.isfile(config_path):
+            return hash_size
+        section = ""
+        with open(config_path, encoding="utf-8", errors="replace") as config:
+            for line in config:
+                line = line.strip()
+                if line.startswith("["):
+                    section = line.strip("[]").strip().lower()
+                elif section == "extensions" and "=" in line:
+                    key, value = (part.strip().lower() for part in line.split("=", 1))
+                    if key == "objectformat" and value == "sha256":
+                        hash_size = 32
+                    elif key == "refstorage" and value != "files":
+                        raise ValueError(f"不支援的 ref 儲存格式：{value}")
+        return hash_size
+
+    @staticmethod
+    def _object_dirs(objects_dir):
+        """
+        取得物件目錄以及 objects/info/alternates 中列出的其他物件目錄。
+
+        參數:
+        objects_dir (str): 倉庫的 objects 目錄。
+
+        返回:
+        return (list of str): 所有要搜尋的物件目錄。
+        """
+        dirs = [objects_dir]
+        alternates = os.path.join(objects_dir, "info", "alternates")
+        if os.path.isfile(alternates):
+            with open(alternates, encoding="utf-8") as alternates_file:
+                for line in alternates_file:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        dirs.append(os.path.normpath(os.path.join(objects_dir, line)))
+        return dirs
+
+    def close(self):
+        """
+        關閉所有 packfile 與 commit-graph 的記憶體映射。
+        """
+        with self._lock:
+            for pack in self._packs:
+                pack.close()
+            self._packs = []
+            self._pack_signature = None
+            if self._commit_graph is not None:
+                self._commit_graph.close()
+            self._commit_graph = None
+            self._commit_graph_signature = None
+            self._delta_cache.clear()
+
+    # ---- 物件 ----
+
+    def _pack_dirs_signature(self):
+        """
+        以 pack 目錄的修改時間判斷是否有新的 packfile（例如 fetch 或 gc 之後）。
+        """
+        signature = []
+        for objects_dir in self.object_dirs:
+            try:
+                signature.append(os.stat(os.path.join(objects_dir, "pack")).st_mtime_ns)
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load_packs(self):
+        """
+        開啟所有 packfile，pack 目錄沒有改變時沿用已開啟的 packfile。
+        已移除的 packfile 不在這裡關閉，其他執行緒可能還在讀取，記憶體映射會在不再使用時釋放。
+
+        返回:
+        return (list of PackFile): 所有 packfile。
+        """
+        signature = self._pack_dirs_signature()
+        with self._lock:
+            if signature == self._pack_signature:
+                return self._packs
+            opened = {pack.path: pack for pack in self._packs}
+            packs = []
+            for objects_dir in self.object_dirs:
+                pack_dir = os.path.join(objects_dir, "pack")
+                if not os.path.isdir(pack_dir):
+                    continue
+                # 依修改時間由新到舊，新的 packfile 通常包含最近的物件
+                names = sorted((name for name in os.listdir(pack_dir) if name.endswith(".pack")),
+                               key=lambda name: -os.stat(os.path.join(pack_dir, name)).st_mtime_ns)
+                for name in names:
+                    pack_path = os.path.join(pack_dir, name)
+                    if pack_path in opened:
+                        packs.append(opened.pop(pack_path))
+                        continue
+                    try:
+                        packs.append(PackFile(pack_path, PackIndex(pack_path[:-5] + ".idx", self.hash_size)))
+                    except (OSError, ValueError):
+                        # 還在寫入中或不支援的 packfile，由其他 packfile 或鬆散物件提供
+                        continue
+            self._packs = packs
+            self._pack_signature = signature
+            return packs
+
+    def _read_loose(self, hex_oid):
+        """
+        讀取鬆散物件。
+
+        參數:
+        hex_oid (str): 十六進位雜湊值。
+
+        返回:
+        return (tuple or None): (物件類型, 物件內容)，找不到時返回 None。
+        """
+        for objects_dir in self.object_dirs:
+            try:
+                with open(os.path.join(objects_dir, hex_oid[:2], hex_oid[2:]), "rb") as loose_file:
+                    raw = zlib.decompress(loose_file.read())
+            except OSError:
+                continue
+            # 物件內容前面是 "<類型> <長度>\0"
+            header, _, data = raw.partition(b"\0")
+            obj_type, _, _ = header.partition(b" ")
+            return obj_type.decode(), data
+        return None
+
+    def _read_packed(self, pack, offset):
+        """
+        讀取 packfile 中的物件，並依序套用 delta 直到還原成完整物件。
+
+        參數:
+        pack (PackFile): 物件所在的 packfile。
+        offset (int): 物件的位移。
+
+        返回:
+        return (tuple): (類型代碼, 物件內容)。
+        """
+        # 先沿著 delta 鏈找到基底物件或已快取的物件，再由基底往回套用每一層 delta
+        chain = []
+        while True:
+            key = (pack.path, offset)
+            with self._lock:
+                cached = self._delta_cache.get(key)
+                if cached is not None:
+                    self._delta_cache.move_to_end(key)
+            if cached is not None:
+                type_code, data = cached
+                break
+            type_code, size, base, position = pack._header(offset)
+            if type_code == OFS_DELTA:
+                chain.append((key, pack._inflate(position, size)))
+                offset = base
+            elif type_code == REF_DELTA:
+                chain.append((key, pack._inflate(position, size)))
+                located = self._locate(base)
+                if located is None:
+                    raise ValueError(f"找不到 delta 的基底物件：{base.hex()}")
+                pack, offset = located
+            else:
+                data = pack._inflate(position, size)
+                break
+
+        for key, delta in reversed(chain):
+            data = apply_delta(data, delta)
+        if chain:
+            # 快取最後一層的基底物件，同一條 delta 鏈的其他物件可以直接使用
+            self._remember(chain[0][0], (type_code, data))
+        return type_code, data
+
+    def _remember(self, key, value):
+        """
+        將解開的物件放入 delta 基底快取，超過上限時移除最久沒用到的物件。
+        """
+        with self._lock:
+            self._delta_cache[key] = value
+            if len(self._delta_cache) > DELTA_CACHE_SIZE:
+                self._delta_cache.popitem(last=False)
+
+    def _locate(self, oid):
+        """
+        在所有 packfile 中尋找物件。
+
+        參數:
+        oid (bytes): 二進位雜湊值。
+
+        返回:
+        return (tuple or None): (packfile, 位移)，找不到時返回 None。
+        """
+        # 先在已開啟的 packfile 中尋找，找不到時才檢查是否有新的 packfile
+        for packs in (self._packs, None):
+            if packs is None:
+                if self._pack_signature == self._pack_dirs_signature():
+                    return None
+                packs = self._load_packs()
+            for pack in packs:
+                offset = pack.index.find(oid)
+                if offset is not None:
+                    return pack, offset
+        return None
+
+    def read_object(self, oid):
+        """
+        讀取物件的內容。
+
+        參數:
+        oid (str): 十六進位雜湊值。
+
+        返回:
+        return (tuple or None): (物件類型, 物件內容 bytes)，找不到時返回 None。
+        """
+        located = self._locate(bytes.fromhex(oid))
+        if located is not None:
+            type_code, data = self._read_packed(*located)
+            return OBJECT_TYPES[type_code], data
+        # 鬆散物件通常是最近新增的少量物件，找不到 packfile 中的物件時再讀取
+        return self._read_loose(oid)
+
+    def read_commit(self, oid):
+        """
+        讀取並解析 commit，格式與 GitProcessPool.read_commit 相同。
+
+        參數:
+        oid (str): 十六進位雜湊值，可以是指向 commit 的附註標籤。
+
+        返回:
+        return (dict or None): parse_commit 的結果加上 oid 欄位，不是 commit 或找不到時返回 None。
+        """
+        result = self.read_object(oid)
+        if result is not None and result[0] == "tag":
+            oid = self.peel(oid)
+            result = self.read_object(oid) if oid else None
+        if result is None or result[0] != "commit":
+            return None
+        commit = parse_commit(result[1])
+        commit["oid"] = oid
+        return commit
+
+    def peel(self, oid):
+        """
+        將附註標籤一層一層解開，直到指向的不是標籤為止。
+
+        參數:
+        oid (str): 十六進位雜湊值。
+
+        返回:
+        return (str or None): 最終指向的物件雜湊值，找不到物件時返回 None。
+        """
+        while True:
+            result = self.read_object(oid)
+            if result is None:
+                return None
+            if result[0] != "tag":
+                return oid
+            # 標籤的第一行是 "object <雜湊值>"
+            oid = result[1].split(b"\n", 1)[0].split(b" ", 1)[1].decode()
+
+    # ---- commit-graph ----
+
+    def commit_graph(self):
+        """
+        開啟 commit-graph，檔案改變（例如 gc 之後）時重新開啟。
+
+        返回:
+        return (CommitGraph or None): commit-graph，倉庫沒有 commit-graph 時返回 None。
+        """
+        info_dir = os.path.join(self.object_dirs[0], "info")
+        chain_path = os.path.join(info_dir, "commit-graphs", "commit-graph-chain")
+        single_path = os.path.join(info_dir, "commit-graph")
+        try:
+            if os.path.isfile(chain_path):
+                # 分層的 commit-graph，鏈檔案中由最底層到最上層列出每一層的雜湊值
+                with open(chain_path, encoding="utf-8") as chain:
+                    paths = [os.path.join(info_dir, "commit-graphs", f"graph-{line.strip()}.graph")
+                             for line in chain if line.strip()]
+            elif os.path.isfile(single_path):
+                paths = [single_path]
+            else:
+                paths = []
+            signature = tuple((path, os.stat(path).st_mtime_ns) for path in paths)
+        except OSError:
+            return None
+        with self._lock:
+            if signature != self._commit_graph_signature:
+                if self._commit_graph is not None:
+                    self._commit_graph.close()
+                try:
+                    self._commit_graph = CommitGraph(paths, self.hash_size) if paths else None
+                except (OSError, ValueError, KeyError, struct.error):
+                    self._commit_graph = None
+                self._commit_graph_signature = signature
+            return self._commit_graph
+
+    def commit_info(self, oid):
+        """
+        取得 commit 的父 commit 與提交時間。commit 在 commit-graph 中時不必解壓縮物件。
+
+        參數:
+        oid (str): 十六進位雜湊值。
+
+        返回:
+        return (tuple or None): (父 commit 雜湊值列表, 提交時間)，不是 commit 時返回 None。
+        """
+        graph = self.commit_graph()
+        if graph is not None:
+            position = graph.find(bytes.fromhex(oid))
+            if position >= 0:
+                parents, commit_time, _ = graph.commit(position)
+                return [graph.oid(parent).hex() for parent in parents], commit_time
+        return self._parse_commit_info(oid)
+
+    def _parse_commit_info(self, oid):
+        """
+        解壓縮並解析 commit 物件，取得父 commit 與提交時間。
+
+        參數:
+        oid (str): 十六進位雜湊值。
+
+        返回:
+        return (tuple or None): (父 commit 雜湊值列表, 提交時間)，不是 commit 時返回 None。
+        """
+        commit = self.read_commit(oid)
+        if commit is None:
+            return None
+        return commit["parents"], commit["time"]
+
+    # ---- refs ----
+
+    def _read_packed_refs(self):
+        """
+        讀取 packed-refs，檔案沒有改變時沿用上次的結果。
+
+        返回:
+        return (dict): ref 名稱對應到 (雜湊值, 解開標籤後的雜湊值或 None)。
+        """
+        path = os.path.join(self.common_dir, "packed-refs")
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return {}
+        with self._lock:
+            if signature == self._packed_refs_signature:
+                return self._packed_refs
+        refs = {}
+        last = None
+        with open(path, encoding="utf-8", errors="surrogateescape") as packed:
+            for line in packed:
+                line = line.rstrip("\n")
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("^"):
+                    # 上一個附註標籤最終指向的物件
+                    if last is not None:
+                        refs[last] = (refs[last][0], line[1:])
+                    continue
+                oid, _, name = line.partition(" ")
+                refs[name] = (oid, None)
+                last = name
+        with self._lock:
+            self._packed_refs = refs
+            self._packed_refs_signature = signature
+        return refs
+
+    def _read_loose_ref(self, name):
+        """
+        讀取鬆散 ref 檔案的內容。
+
+        參數:
+        name (str): ref 名稱，例如 HEAD 或 refs/heads/main。
+
+        返回:
+        return (str or None): 檔案內容（雜湊值或 "ref: <名稱>"），不存在時返回 None。
+        """
+        # HEAD 等每個工作目錄各自的 ref 在 .git 目錄，其他 ref 在共用目錄
+        base = self.common_dir if name.startswith("refs/") else self.git_dir
+        try:
+            with open(os.path.join(base, name), encoding="utf-8", errors="surrogateescape") as ref_file:
+                return ref_file.read().strip()
+        except OSError:
+            return None
+
+    def resolve_ref(self, name, depth=5):
+        """
+        解析 ref 指向的物件，會跟隨符號 ref（例如 HEAD 指向的分支）。
+
+        參數:
+        name (str): ref 名稱。
+        depth (int, optional): 最多跟隨的符號 ref 層數，默認為 5。
+
+        返回:
+        return (str or None): 十六進位雜湊值，ref 不存在時返回 None。
+        """
+        content = self._read_loose_ref(name)
+        if content is None:
+            packed = self._read_packed_refs().get(name)
+            return packed[0] if packed else None
+        if content.startswith("ref:"):
+            return self.resolve_ref(content[4:].strip(), depth - 1) if depth > 0 else None
+        return content
+
+    def resolve(self, name):
+        """
+        以 git 的規則將名稱解析成物件雜湊值，依序嘗試完整雜湊值、名稱本身、refs/、refs/tags/、
+        refs/heads/、refs/remotes/ 與 refs/remotes/<名稱>/HEAD，不支援縮寫雜湊值與 `HEAD~2` 這類運算式。
+
+        參數:
+        name (str): 雜湊值、分支、標籤或其他 ref 名稱。
+
+        返回:
+        return (str or None): 十六進位雜湊值，無法解析時返回 None。
+        """
+        if len(name) == self.hash_size * 2:
+            try:
+                bytes.fromhex(name)
+                return name.lower()
+            except ValueError:
+                pass
+        for candidate in (name, f"refs/{name}", f"refs/tags/{name}", f"refs/heads/{name}",
+                          f"refs/remotes/{name}", f"refs/remotes/{name}/HEAD"):
+            oid = self.resolve_ref(candidate)
+            if oid is not None:
+                return oid
+        return None
+
+    def head(self):
+        """
+        讀取 HEAD。
+
+        返回:
+        return (tuple): (目前分支名稱或 None, HEAD 指向的 commit 或 None)，
+        分離 HEAD 時分支名稱為 None，還沒有任何 commit 時雜湊值為 None。
+        """
+        content = self._read_loose_ref("HEAD") or ""
+        if content.startswith("ref:"):
+            target = content[4:].strip()
+            branch = target[len("refs/heads/"):] if target.startswith("refs/heads/") else None
+            return branch, self.resolve_ref(target)
+        return None, content or None
+
+    def refs(self, prefix="refs/"):
+        """
+        列出指定前綴下的所有 ref，鬆散 ref 會覆蓋 packed-refs 中同名的 ref。
+
+        參數:
+        prefix (str, optional): ref 名稱前綴，默認為 "refs/"。
+
+        返回:
+        return (dict): ref 名稱對應到十六進位雜湊值。
+        """
+        refs = {name: value[0] for name, value in self._read_packed_refs().items() if name.startswith(prefix)}
+        top = os.path.join(self.common_dir, "refs")
+        for root, dirs, files in os.walk(top):
+            for file_name in files:
+                if file_name.endswith(".lock"):
+                    continue
+                name = "refs/" + os.path.relpath(os.path.join(root, file_name), top).replace(os.sep, "/")
+                if name.startswith(prefix):
+                    oid = self.resolve_ref(name)
+                    if oid:
+                        refs[name] = oid
+        return dict(sorted(refs.items()))
+
+    def ref_tips(self):
+        """
+        取得所有 ref 與 HEAD 指向的物件，附註標籤同時包含標籤物件與它指向的物件，
+        結果與 `git show-ref --head --dereference` 的雜湊值相同。
+
+        返回:
+        return (list of str): 排序後不重複的十六進位雜湊值。
+        """
+        tips = set()
+        _, head = self.head()
+        if head:
+            tips.add(head)
+        packed = self._read_packed_refs()
+        graph = self.commit_graph()
+        for name, oid in self.refs().items():
+            tips.add(oid)
+            packed_ref = packed.get(name)
+            if packed_ref and packed_ref[0] == oid and packed_ref[1]:
+                # packed-refs 已經記錄標籤解開後的物件
+                tips.add(packed_ref[1])
+                continue
+            if graph is not None and graph.find(bytes.fromhex(oid)) >= 0:
+                # 在 commit-graph 中的一定是 commit，不必讀取物件
+                continue
+            peeled = self.peel(oid)
+            if peeled:
+                tips.add(peeled)
+        return sorted(tips)
+
+    def list_branches(self):
+        """
+        列出所有本地分支，格式與 GitProcessPool.list_branches 相同，目前分支前面會標示星號。
+
+        返回:
+        return (str): 分支列表。
+        """
+        current, _ = self.head()
+        names = [name[len("refs/heads/"):] for name in self.refs("refs/heads/")]
+        return "\n".join(("* " if name == current else "  ") + name for name in names)
+
+    # ---- 提交歷史 ----
+
+    def walk(self, include, exclude=(), skip=0):
+        """
+        依照提交時間由新到舊走訪提交歷史，順序與 `git log` 預設的順序相同：
+        時間相同時先加入的先輸出，起點依照傳入的順序加入。
+
+        參數:
+        include (list of str): 起點的雜湊值，可以是附註標籤。
+        exclude (list of str, optional): 要排除的起點，從它們可到達的 commit 都不會輸出。
+        skip (int, optional): 略過最前面的 commit 數量。
+
+        返回:
+        return (generator): 逐一產生 (commit 雜湊值, 父 commit 雜湊值列表)。
+        """
+        heap = []
+        # 已加入過的 commit 是否要排除，以及還在佇列中且需要輸出的 commit 數量
+        uninteresting_of = {}
+        queued = set()
+        interesting_queued = 0
+        counter = 0
+        # 走訪期間只開啟一次 commit-graph，並記住父 commit 在其中的位置，省去重複的二分搜尋
+        graph = self.commit_graph()
+        graph_positions = {}
+
+        def commit_info(oid):
+            if graph is not None:
+                position = graph_positions.pop(oid, -1)
+                if position < 0:
+                    position = graph.find(bytes.fromhex(oid))
+                if position >= 0:
+                    parent_positions, commit_time, _ = graph.commit(position)
+                    parents = []
+                    for parent_position in parent_positions:
+                        parent = graph.oid(parent_position).hex()
+                        parents.append(parent)
+                        if parent not in uninteresting_of:
+                            graph_positions[parent] = parent_position
+                    return parents, commit_time
+            return self._parse_commit_info(oid)
+
+        def push(oid, uninteresting):
+            nonlocal counter, interesting_queued
+            info = commit_info(oid)
+            if info is None:
+                return
+            parents, commit_time = info
+            uninteresting_of[oid] = uninteresting
+            queued.add(oid)
+            interesting_queued += not uninteresting
+            heapq.heappush(heap, (-commit_time, counter, oid, parents))
+            counter += 1
+
+        # 已處理過的 commit 的父 commit，用來把排除狀態往下傳遞
+        parents_of = {}
+
+        def mark_uninteresting(oid):
+            nonlocal interesting_queued
+            stack = [oid]
+            while stack:
+                oid = stack.pop()
+                if uninteresting_of.get(oid, True):
+                    continue
+                uninteresting_of[oid] = True
+                if oid in queued:
+                    interesting_queued -= 1
+                else:
+                    # 已經處理過的 commit，它的祖先也都要排除
+                    stack.extend(parents_of.get(oid, ()))
+
+        # 與 `git log --stdin` 先傳入起點、再傳入 ^排除點時的加入順序相同
+        for oid in include:
+            oid = self.peel(oid)
+            if oid is not None and oid not in uninteresting_of:
+                push(oid, False)
+        for oid in exclude:
+            oid = self.peel(oid)
+            if oid is None:
+                continue
+            if oid in uninteresting_of:
+                mark_uninteresting(oid)
+            else:
+                push(oid, True)
+
+        def pop():
+            nonlocal interesting_queued
+            key, _, oid, parents = heapq.heappop(heap)
+            queued.discard(oid)
+            parents_of[oid] = parents
+            uninteresting = uninteresting_of[oid]
+            if not uninteresting:
+                interesting_queued -= 1
+            for parent in parents:
+                if parent not in uninteresting_of:
+                    push(parent, uninteresting)
+                elif uninteresting:
+                    # 排除狀態沿著父 commit 傳遞
+                    mark_uninteresting(parent)
+            return oid, parents, uninteresting, -key
+
+        if not exclude:
+            # 沒有排除點時可以邊走訪邊輸出
+            while heap:
+                oid, parents, _, _ = pop()
+                if skip:
+                    skip -= 1
+                    continue
+                yield oid, parents
+            return
+
+        # 有排除點時與 git 的 limit_list 相同，先走訪到佇列中只剩要排除、且不比已輸出的 commit 新的 commit，
+        # 再多走幾步容忍時間順序錯亂的 commit，最後才輸出，因為較早走訪的 commit 可能之後才發現可以從排除點到達
+        candidates = []
+        slop = WALK_SLOP
+        last_time = None
+        while heap:
+            oid, parents, uninteresting, commit_time = pop()
+            if uninteresting:
+                if not heap:
+                    break
+                if (last_time is not None and last_time <= -heap[0][0]) or interesting_queued:
+                    slop = WALK_SLOP
+                else:
+                    slop -= 1
+                if not slop:
+                    break
+                continue
+            last_time = commit_time
+            candidates.append((oid, parents))
+        for oid, parents in candidates:
+            if uninteresting_of[oid]:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            yield oid, parents
+
+
+# 依照 .git 目錄共用的物件資料庫
+_shared_databases = {}
+_shared_lock = threading.Lock()
+
+
+def shared_database(cwd=None):
+    """
+    取得指定倉庫共用的物件資料庫。
+
+    參數:
+    cwd (str, optional): 倉庫中的任意路徑，默認為目前目錄。
+
+    返回:
+    return (GitObjectDatabase or None): 物件資料庫，不是 Git 倉庫或使用不支援的格式時返回 None，
+    呼叫端應改用 Git 命令列。
+    """
+    git_dir = find_git_dir(cwd)
+    if git_dir is None:
+        return None
+    with _shared_lock:
+        if git_dir not in _shared_databases:
+            try:
+                _shared_databases[git_dir] = GitObjectDatabase(git_dir)
+            except (OSError, ValueError):
+                _shared_databases[git_dir] = None
+        return _shared_databases[git_dir]
+
+
+def close_shared_databases():
+    """
+    關閉所有共用的物件資料庫，通常在應用程式結束時呼叫。
+    """
+    with _shared_lock:
+        databases = [database for database in _shared_databases.values() if database is not None]
+        _shared_databases.clear()
+    for database in databases:
+        database.close()
@@ -0,0 +1,66 @@
+# 解析 Git 以 --progress 輸出在標準錯誤的進度訊息
+import re
+
+# 有百分比的進度，例如 "Writing objects:  45% (9/20), 1.20 MiB | 2.40 MiB/s"
+PERCENT_PATTERN = re.compile(r"^(?P<remote>remote: )?(?P<phase>[^:]+):\s+(?P<percent>\d+)%\s+\((?P<current>\d+)/(?P<total>\d+)\)"
+                             r"(?:,\s+(?P<size>[\d.]+ \w+))?(?:\s+\|\s+(?P<rate>[\d.]+ \w+/s))?")
+# 只有數量的進度，例如 "Enumerating objects: 1234, done."
+COUNT_PATTERN = re.compile(r"^(?P<remote>remote: )?(?P<phase>[^:]+):\s+(?P<current>\d+)(?:,|$)")
+
+
+class GitProgress:
+    """
+    一段解析後的進度訊息。
+
+    屬性:
+    - phase (str): 階段名稱，例如 "Writing objects"、"Receiving objects"。
+    - remote (bool): 是否為遠端伺服器回報的進度（以 "remote: " 開頭）。
+    - percent (int or None): 百分比，只有數量的階段為 None。
+    - current (int): 目前完成的數量。
+    - total (int or None): 總數量。
+    - size (str or None): 已傳輸的資料量，例如 "1.20 MiB"。
+    - rate (str or None): 傳輸速度，例如 "2.40 MiB/s"。
+    """
+
+    def __init__(self, phase, remote, percent, current, total, size=None, rate=None):
+        self.phase = phase
+        self.remote = remote
+        self.percent = percent
+        self.current = current
+        self.total = total
+        self.size = size
+        self.rate = rate
+
+    def describe(self):
+        """
+        產生顯示在進度視窗中的詳細資訊。
+
+        返回:
+        return (str): 例如「9/20，已傳輸 1.20 MiB，2.40 MiB/s」。
+        """
+        text = f"{self.current}/{self.total}" if self.total is not None else str(self.current)
+        if self.size:
+            text += f"，已傳輸 {self.size}"
+        if self.rate:
+            text += f"，{self.rate}"
+        return text
+
+
+def parse_progress(line):
+    """
+    解析一段進度訊息。
+
+    參數:
+    line (str): 標準錯誤中以 \\r 或 \\n 分隔的一段內容。
+
+    返回:
+    return (GitProgress or None): 解析後的進度，不是進度訊息時返回 None。
+    """
+    match = PERCENT_PATTERN.match(line)
+    if match:
+        return GitProgress(match["phase"].strip(), bool(match["remote"]), int(match["percent"]), int(match["current"]),
+                           int(match["total"]), match["size"], match["rate"])
+    match = COUNT_PATTERN.match(line)
+    if match:
+        return GitProgress(match["phase"].strip(), bool(match["remote"]), None, int(match["current"]), None)
+    return None
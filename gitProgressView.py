@@ -0,0 +1,138 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar, QPlainTextEdit
+
+from gitProgress import parse_progress
+
+
+class GitProgressDialog(QDialog):
+    """
+    長時間網路操作（push、fetch、clone）的進度視窗。命令以 --progress 執行，
+    標準錯誤的每一段進度即時顯示為進度條、數量、已傳輸的資料量與速度，其他訊息顯示在下方的紀錄中。
+    按下「取消」會結束整個行程群組，包含 Git 啟動的 ssh 或 HTTPS 傳輸行程。
+    命令結束前視窗不會關閉，因此 exec() 返回後呼叫端可以直接以 deleteLater() 刪除視窗。
+
+    參數:
+    executor (GitCommandExecutor): 用來在背景執行命令的執行器。
+    args (list of str): 命令與參數，應包含 --progress，例如 ["git", "push", "--progress", "origin", "master"]。
+    title (str): 視窗標題。
+    cwd (str, optional): 執行命令時的工作目錄，默認為目前目錄。
+    read_only (bool, optional): 是否為唯讀命令，默認為 False。
+    on_success (callable, optional): 命令成功後以標準輸出呼叫的函數。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, executor, args, title, cwd=None, read_only=False, on_success=None, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.on_success = on_success
+        self.setWindowTitle(title)
+        self.resize(520, 320)
+
+        self.phase_label = QLabel("等待開始...", self)
+        self.phase_label.setStyleSheet("color: #2C662D; font-weight: bold;")
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setRange(0, 0)
+        self.detail_label = QLabel("", self)
+        self.log_view = QPlainTextEdit(self)
+        self.log_view.setReadOnly(True)
+        self.log_view.appendPlainText(" ".join(args))
+        self.cancel_button = QPushButton("取消", self)
+        self.cancel_button.clicked.connect(self.cancel)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(self.cancel_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.phase_label)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.detail_label)
+        layout.addWidget(self.log_view)
+        layout.addLayout(buttons)
+
+        # 命令是否已結束、是否由使用者取消，以及已顯示在紀錄中的訊息
+        self.finished_running = False
+        self.cancelled = False
+        self.messages = []
+        self.task_id = executor.submit_progress(args, read_only=read_only, cwd=cwd, on_success=self.command_finished,
+                                                on_failure=self.command_failed, on_progress=self.show_progress)
+
+    def show_progress(self, line):
+        """
+        顯示一段進度或訊息。
+
+        參數:
+        line (str): 標準錯誤中的一段內容。
+        """
+        progress = parse_progress(line)
+        if progress is None:
+            self.messages.append(line)
+            self.log_view.appendPlainText(line)
+            return
+        self.phase_label.setText(("遠端：" if progress.remote else "") + progress.phase)
+        if progress.percent is None:
+            # 只有數量的階段不知道總數，顯示忙碌中的進度條
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(progress.percent)
+        self.detail_label.setText(progress.describe())
+
+    def cancel(self):
+        """
+        取消命令；命令已結束時關閉視窗。
+        """
+        if self.finished_running:
+            self.accept()
+            return
+        self.cancelled = True
+        self.cancel_button.setEnabled(False)
+        self.phase_label.setText("正在取消...")
+        self.executor.cancel(self.task_id)
+
+    def _stop(self, text):
+        """
+        命令結束後更新視窗，「取消」按鈕改為「關閉」。
+
+        參數:
+        text (str): 顯示在階段標籤的文字。
+        """
+        self.finished_running = True
+        self.phase_label.setText(text)
+        self.progress_bar.setRange(0, 100)
+        self.cancel_button.setText("關閉")
+        self.cancel_button.setEnabled(True)
+
+    def command_finished(self, output):
+        """
+        命令成功時顯示完成訊息與標準輸出。
+
+        參數:
+        output (str): 命令的標準輸出。
+        """
+        self.progress_bar.setValue(100)
+        self._stop("完成")
+        if output:
+            self.log_view.appendPlainText(output)
+        if self.on_success is not None:
+            self.on_success(output)
+
+    def command_failed(self, error):
+        """
+        命令失敗或取消時顯示錯誤訊息。
+
+        參數:
+        error (str): 錯誤訊息。
+        """
+        self._stop("已取消" if self.cancelled else "失敗")
+        # 錯誤訊息通常就是已經顯示過的標準錯誤，不再重複顯示
+        if error != "\n".join(self.messages):
+            self.log_view.appendPlainText(error)
+
+    def reject(self):
+        """
+        按下 Esc 或關閉視窗時，命令仍在執行就先取消，命令結束後才關閉。
+        """
+        if self.finished_running:
+            super().reject()
+        else:
+            self.cancel()
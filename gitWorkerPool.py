@@ -0,0 +1,289 @@
+# 匯入所需的模組
+import subprocess
+import threading
+import heapq
+import os
+
+
+class GitBatchProcess:
+    """
+    常駐的 `git cat-file --batch` 行程，透過標準輸入重複查詢物件，避免每次查詢都啟動新的行程。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    """
+
+    def __init__(self, cwd=None):
+        self.cwd = cwd
+        self.process = None
+        self._start()
+
+    def _start(self):
+        """
+        啟動 `git cat-file --batch` 行程。
+        """
+        self.process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=self.cwd,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+
+    def read_object(self, rev):
+        """
+        讀取指定版本或物件的內容。
+
+        參數:
+        rev (str): 物件的雜湊值或任何 Git 版本表示式，例如 HEAD 或 main^{commit}。
+
+        返回:
+        return (tuple or None): (物件雜湊值, 物件類型, 物件內容 bytes)，找不到物件時返回 None。
+        """
+        if self.process.poll() is not None:
+            # 行程已結束（例如倉庫在啟動後才初始化），重新啟動一次
+            self._start()
+        self.process.stdin.write(rev.encode() + b"\n")
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file 行程意外結束")
+        parts = header.split()
+        if len(parts) != 3:
+            # 例如 "<rev> missing" 或 "<rev> ambiguous"
+            return None
+        oid, obj_type, size = parts[0].decode(), parts[1].decode(), int(parts[2])
+        data = self.process.stdout.read(size)
+        # 物件內容之後固定有一個換行字元
+        self.process.stdout.read(1)
+        return oid, obj_type, data
+
+    def close(self):
+        """
+        關閉常駐行程。
+        """
+        if self.process and self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+
+def parse_commit(data):
+    """
+    解析 commit 物件的內容。
+
+    參數:
+    data (bytes): commit 物件的原始內容。
+
+    返回:
+    return (dict): 包含 tree、parents、author、committer、time 與 message 的字典。
+    """
+    header, _, message = data.partition(b"\n\n")
+    commit = {"tree": None, "parents": [], "author": "", "committer": "", "time": 0,
+              "message": message.decode(errors="replace")}
+    for line in header.split(b"\n"):
+        key, _, value = line.partition(b" ")
+        if key == b"tree":
+            commit["tree"] = value.decode()
+        elif key == b"parent":
+            commit["parents"].append(value.decode())
+        elif key == b"author":
+            commit["author"] = value.decode(errors="replace")
+        elif key == b"committer":
+            commit["committer"] = value.decode(errors="replace")
+            # committer 行的格式為 "名稱 <信箱> 時間戳 時區"
+            commit["time"] = int(value.rsplit(b" ", 2)[-2])
+    return commit
+
+
+class GitProcessPool:
+    """
+    常駐 Git 行程池，讓 GitManager 與 GitManagerApp 在多條執行緒中共用讀取操作，
+    例如物件查詢、提交歷史與分支列表。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    size (int, optional): 行程池中最多的常駐行程數量，默認為 2。
+    """
+
+    def __init__(self, cwd=None, size=2):
+        self.cwd = cwd
+        self.size = size
+        # 閒置中的行程與已建立的行程數量
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+
+    def _acquire(self):
+        """
+        取得一個閒置的行程，如果沒有閒置行程且尚未達到上限則建立新的行程。
+
+        返回:
+        return (GitBatchProcess): 可使用的常駐行程。
+        """
+        with self._condition:
+            while not self._idle and self._created >= self.size:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return GitBatchProcess(self.cwd)
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker, broken=False):
+        """
+        將行程放回行程池，發生錯誤的行程會直接關閉。
+
+        參數:
+        worker (GitBatchProcess): 要放回的行程。
+        broken (bool, optional): 行程是否已經損壞。
+        """
+        with self._condition:
+            if broken:
+                self._created -= 1
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+        if broken:
+            worker.process.kill()
+
+    def read_object(self, rev):
+        """
+        透過常駐行程讀取物件內容。
+
+        參數:
+        rev (str): 物件雜湊值或 Git 版本表示式。
+
+        返回:
+        return (tuple or None): (物件雜湊值, 物件類型, 物件內容)，找不到物件時返回 None。
+        """
+        worker = self._acquire()
+        try:
+            result = worker.read_object(rev)
+        except Exception:
+            self._release(worker, broken=True)
+            raise
+        self._release(worker)
+        return result
+
+    def resolve(self, rev):
+        """
+        將版本表示式解析為完整的物件雜湊值。
+
+        參數:
+        rev (str): Git 版本表示式。
+
+        返回:
+        return (str or None): 物件雜湊值，找不到時返回 None。
+        """
+        result = self.read_object(rev)
+        return result[0] if result else None
+
+    def read_commit(self, rev):
+        """
+        讀取並解析一個 commit。
+
+        參數:
+        rev (str): commit 的雜湊值或版本表示式。
+
+        返回:
+        return (dict or None): parse_commit 的結果加上 oid 欄位，找不到時返回 None。
+        """
+        result = self.read_object(rev + "^{commit}")
+        if result is None:
+            return None
+        commit = parse_commit(result[2])
+        commit["oid"] = result[0]
+        return commit
+
+    def log(self, revs, max_count=None):
+        """
+        從指定的版本開始，依照提交時間由新到舊走訪提交歷史，效果類似 `git log --pretty=format:'%H %P'`。
+
+        參數:
+        revs (list of str): 起始的版本表示式。
+        max_count (int, optional): 最多返回的 commit 數量，默認為全部。
+
+        返回:
+        return (list of tuple): 每個元素為 (commit 雜湊值, 父 commit 雜湊值列表)。
+        """
+        heap = []
+        seen = set()
+        for rev in revs:
+            commit = self.read_commit(rev)
+            if commit and commit["oid"] not in seen:
+                seen.add(commit["oid"])
+                heapq.heappush(heap, (-commit["time"], commit["oid"], commit["parents"]))
+
+        history = []
+        while heap and (max_count is None or len(history) < max_count):
+            _, oid, parents = heapq.heappop(heap)
+            history.append((oid, parents))
+            for parent in parents:
+                if parent not in seen:
+                    seen.add(parent)
+                    commit = self.read_commit(parent)
+                    if commit:
+                        heapq.heappush(heap, (-commit["time"], parent, commit["parents"]))
+        return history
+
+    def list_branches(self):
+        """
+        列出所有本地分支，輸出格式與 `git branch` 相同，目前分支前面會標示星號。
+
+        Git 沒有可常駐列出 refs 的批次協定，因此這裡直接執行一次 `git for-each-ref`，
+        但不經過 Shell，省下額外啟動 Shell 行程的成本。
+
+        返回:
+        return (str): 分支列表。
+        """
+        result = subprocess.run(["git", "for-each-ref", "--format=%(HEAD) %(refname:short)", "refs/heads"],
+                                cwd=self.cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        return result.stdout.strip()
+
+    def close(self):
+        """
+        關閉行程池中所有閒置的常駐行程。
+        """
+        with self._condition:
+            workers, self._idle = self._idle, []
+            self._created -= len(workers)
+        for worker in workers:
+            worker.close()
+
+
+# 依照倉庫路徑共用的行程池
+_shared_pools = {}
+_shared_lock = threading.Lock()
+
+
+def shared_pool(cwd=None):
+    """
+    取得指定倉庫路徑共用的常駐 Git 行程池，不存在時建立新的行程池。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (GitProcessPool): 共用的行程池。
+    """
+    key = os.path.abspath(cwd or os.getcwd())
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = _shared_pools[key] = GitProcessPool(key)
+        return pool
+
+
+def close_shared_pools():
+    """
+    關閉所有共用的常駐 Git 行程池，通常在應用程式結束時呼叫。
+    """
+    with _shared_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,191 @@
+# 分支圖表的磁碟快取：儲存解析後的提交歷史與佈局，以及建立它們時的 ref 端點
+from array import array
+import json
+import mmap
+import os
+import subprocess
+import sys
+
+from commitGraph import CommitStore, LaneLayout
+from gitObjectDb import shared_database
+
+# 快取檔案的檔頭標記與格式版本
+CACHE_MAGIC = b"TDGCACHE"
+CACHE_VERSION = 1
+# 快取檔案放在 .git 目錄下的檔名
+CACHE_FILE = "threedimgen-graph.cache"
+
+
+def git_dir(cwd=None):
+    """
+    取得倉庫 .git 目錄的絕對路徑。
+
+    參數:
+    cwd (str, optional): 倉庫中的任意路徑，默認為目前目錄。
+
+    返回:
+    return (str): .git 目錄的絕對路徑。
+    """
+    database = shared_database(cwd)
+    if database is not None:
+        return database.git_dir
+    result = subprocess.run(["git", "rev-parse", "--absolute-git-dir"], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout.strip()
+
+
+def read_ref_tips(cwd=None):
+    """
+    讀取所有 ref（包含 HEAD 與附註標籤指向的 commit）目前指向的物件，也就是 `git log --all` 的起點。
+
+    參數:
+    cwd (str, optional): 倉庫路徑，默認為目前目錄。
+
+    返回:
+    return (list of str): 排序後不重複的十六進位雜湊值。
+    """
+    database = shared_database(cwd)
+    if database is not None:
+        # 直接讀取 .git 中的 refs 與 packed-refs，不啟動 Git 行程
+        return database.ref_tips()
+    result = subprocess.run(["git", "show-ref", "--head", "--dereference"], cwd=cwd, capture_output=True, text=True)
+    # 沒有任何 ref 時 show-ref 的返回碼為 1 且沒有輸出
+    if result.returncode not in (0, 1) or (result.returncode == 1 and result.stderr.strip()):
+        raise RuntimeError(result.stderr.strip())
+    return sorted({line.split()[0] for line in result.stdout.splitlines() if line.strip()})
+
+
+def cache_path(repo_git_dir):
+    """
+    取得快取檔案的路徑。
+
+    參數:
+    repo_git_dir (str): .git 目錄的路徑。
+
+    返回:
+    return (str): 快取檔案的路徑。
+    """
+    return os.path.join(repo_git_dir, CACHE_FILE)
+
+
+class GraphCacheEntry:
+    """
+    快取中的一份分支圖表資料。
+
+    參數:
+    layout (LaneLayout): 提交歷史與佈局。
+    tips (list of str): 建立這份資料時所有 ref 指向的物件。
+    base_tips (list of str): 串流載入時使用的起點，用來在之後繼續載入更早的歷史。
+    base_rows (int): 從 base_tips 串流已載入的列數。
+    complete (bool): 是否已載入全部歷史。
+    """
+
+    def __init__(self, layout, tips, base_tips, base_rows, complete):
+        self.layout = layout
+        self.tips = tips
+        self.base_tips = base_tips
+        self.base_rows = base_rows
+        self.complete = complete
+
+
+def _describe(state, blobs):
+    """
+    將 state() 的內容分成陣列資料與純量，並記錄每個陣列在檔案中的位置。
+    """
+    description = {}
+    for name, value in state.items():
+        if isinstance(value, array):
+            description[name] = {"type": value.typecode, "index": len(blobs), "length": len(value)}
+            blobs.append(value)
+        else:
+            description[name] = value
+    return description
+
+
+def save_graph_cache(path, entry):
+    """
+    將分支圖表資料寫入快取檔案。先寫入暫存檔再取代，避免留下不完整的快取。
+
+    參數:
+    path (str): 快取檔案的路徑。
+    entry (GraphCacheEntry): 要儲存的資料。
+    """
+    blobs = []
+    header = {
+        "byteorder": sys.byteorder,
+        "tips": entry.tips,
+        "base_tips": entry.base_tips,
+        "base_rows": entry.base_rows,
+        "complete": entry.complete,
+        "store": _describe(entry.layout.store.state(), blobs),
+        "layout": _describe(entry.layout.state(), blobs),
+    }
+    # 計算每個陣列相對於資料區起點的位移，所有陣列依照 8 位元組對齊
+    offsets = []
+    position = 0
+    for blob in blobs:
+        offsets.append(position)
+        position = (position + len(blob) * blob.itemsize + 7) & ~7
+    header["offsets"] = offsets
+    header_bytes = json.dumps(header).encode()
+    # 資料區從檔頭之後下一個 8 位元組對齊的位置開始
+    data_start = (len(CACHE_MAGIC) + 8 + len(header_bytes) + 7) & ~7
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as cache_file:
+        cache_file.write(CACHE_MAGIC)
+        cache_file.write(CACHE_VERSION.to_bytes(4, "little"))
+        cache_file.write(len(header_bytes).to_bytes(4, "little"))
+        cache_file.write(header_bytes)
+        for blob, blob_offset in zip(blobs, offsets):
+            cache_file.write(b"\0" * (data_start + blob_offset - cache_file.tell()))
+            blob.tofile(cache_file)
+    os.replace(temp_path, path)
+
+
+def _restore(description, offsets, data_start, mapped):
+    """
+    依照檔頭描述，從記憶體映射的檔案中取出陣列資料。
+    """
+    state = {}
+    for name, value in description.items():
+        if isinstance(value, dict):
+            data = array(value["type"])
+            start = data_start + offsets[value["index"]]
+            data.frombytes(mapped[start:start + value["length"] * data.itemsize])
+            state[name] = data
+        else:
+            state[name] = value
+    return state
+
+
+def load_graph_cache(path):
+    """
+    以記憶體映射的方式讀取快取檔案。
+
+    參數:
+    path (str): 快取檔案的路徑。
+
+    返回:
+    return (GraphCacheEntry or None): 快取資料，檔案不存在或格式不符時返回 None。
+    """
+    try:
+        with open(path, "rb") as cache_file, \
+                mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(CACHE_MAGIC)] != CACHE_MAGIC:
+                return None
+            position = len(CACHE_MAGIC)
+            version = int.from_bytes(mapped[position:position + 4], "little")
+            header_length = int.from_bytes(mapped[position + 4:position + 8], "little")
+            if version != CACHE_VERSION:
+                return None
+            header = json.loads(mapped[position + 8:position + 8 + header_length])
+            if header["byteorder"] != sys.byteorder:
+                return None
+            data_start = (position + 8 + header_length + 7) & ~7
+            store = CommitStore.from_state(_restore(header["store"], header["offsets"], data_start, mapped))
+            layout = LaneLayout.from_state(store, _restore(header["layout"], header["offsets"], data_start, mapped))
+    except (OSError, ValueError, KeyError):
+        return None
+    return GraphCacheEntry(layout, header["tips"], header["base_tips"], header["base_rows"], header["complete"])
@@ -0,0 +1,332 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtCore import QObject, QTimer, QEvent, Signal
+from PySide6.QtWidgets import QApplication
+import json
+import os
+import subprocess
+import threading
+import time
+
+from gitExecutor import process_group_options
+from repoWatcher import git_dirs
+
+# 各項維護工作與執行間隔（秒），與 `git maintenance start` 的排程相同：
+# commit-graph 每小時，loose-objects 與 incremental-repack 每天，pack-refs 每週
+TASK_INTERVALS = {
+    "commit-graph": 3600,
+    "loose-objects": 86400,
+    "incremental-repack": 86400,
+    "pack-refs": 7 * 86400,
+}
+# 使用者最後一次操作之後多久才算閒置，以及檢查是否閒置的間隔（秒）
+IDLE_DELAY = 60
+CHECK_INTERVAL = 30
+# 記錄檔放在 .git 目錄下的檔名，以及保留的紀錄數量
+RECORD_FILE = "threedimgen-maintenance.json"
+MAX_RECORDS = 200
+# 測量 log 延遲時讀取的 commit 數量
+LOG_SAMPLE = 10000
+# 等待維護工作時檢查是否要放手的間隔（秒）
+POLL_INTERVAL = 0.1
+
+
+def _time_command(args, cwd=None, repeat=3):
+    """
+    執行命令數次並返回耗時的中位數（毫秒）。
+
+    參數:
+    args (list of str): 命令與參數。
+    cwd (str, optional): 執行命令的目錄。
+    repeat (int, optional): 重複的次數，默認為 3。
+
+    返回:
+    return (float): 中位數耗時（毫秒）。
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def measure_latency(cwd=None):
+    """
+    測量分支圖表讀取歷史與狀態列讀取狀態所用命令的延遲。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): log 與 status 的中位數耗時（毫秒）。
+    """
+    return {
+        "log": _time_command(["git", "log", "--all", "--topo-order", f"-n{LOG_SAMPLE}", "--format=%H %P"], cwd),
+        "status": _time_command(["git", "--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z"], cwd),
+    }
+
+
+class MaintenanceRecord:
+    """
+    一次維護工作的紀錄。
+
+    參數:
+    task (str): 維護工作的名稱，例如 commit-graph。
+    started (float): 開始的時間（time.time）。
+    duration (float): 執行維護工作的耗時（毫秒）。
+    before (dict): 執行前 log 與 status 的延遲（毫秒）。
+    after (dict): 執行後 log 與 status 的延遲（毫秒）。
+    error (str, optional): 失敗時的錯誤訊息。
+    """
+
+    def __init__(self, task, started, duration, before, after, error=None):
+        self.task = task
+        self.started = started
+        self.duration = duration
+        self.before = before
+        self.after = after
+        self.error = error
+
+    def to_dict(self):
+        """
+        轉換為可以寫入 JSON 的字典。
+
+        返回:
+        return (dict): 紀錄的內容。
+        """
+        return {"task": self.task, "started": self.started, "duration": self.duration,
+                "before": self.before, "after": self.after, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        從 JSON 讀出的字典建立紀錄。
+
+        參數:
+        data (dict): to_dict 的結果。
+
+        返回:
+        return (MaintenanceRecord): 紀錄。
+        """
+        return cls(data["task"], data["started"], data["duration"], data["before"], data["after"], data.get("error"))
+
+
+def run_task(task, cwd=None, detach=None):
+    """
+    執行一項維護工作，並測量執行前後 log 與 status 的延遲。
+
+    維護工作在新的行程群組中執行。detach 被設定時不再等待，維護工作在背景自行完成，
+    不會因應用程式結束而中斷；中斷可能留下暫存檔，因此不強制結束。
+
+    參數:
+    task (str): 維護工作的名稱。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    detach (threading.Event, optional): 設定後不再等待維護工作結束。
+
+    返回:
+    return (MaintenanceRecord or None): 這次執行的紀錄；維護工作失敗時 error 為錯誤訊息，不再等待時返回 None。
+    """
+    before = measure_latency(cwd)
+    started = time.time()
+    start = time.perf_counter()
+    process = subprocess.Popen(["git", "maintenance", "run", f"--task={task}", "--quiet"], cwd=cwd,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               text=True, errors="replace", **process_group_options())
+    while True:
+        try:
+            _, stderr = process.communicate(timeout=POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            if detach is not None and detach.is_set():
+                return None
+    duration = (time.perf_counter() - start) * 1000
+    error = (stderr.strip() or f"返回碼 {process.returncode}") if process.returncode != 0 else None
+    return MaintenanceRecord(task, started, duration, before, measure_latency(cwd), error)
+
+
+class MaintenanceScheduler(QObject):
+    """
+    在使用者閒置時於背景執行 `git maintenance` 的各項工作，讓分支圖表等大量讀取的功能
+    不會隨著鬆散物件與 pack 檔案增加而變慢。
+
+    每 CHECK_INTERVAL 秒檢查一次：使用者 IDLE_DELAY 秒內沒有操作、主要執行器沒有命令在執行時，
+    才開始一項已到期的工作，一次只執行一項。工作以寫入任務提交到主要執行器，
+    執行期間持有寫入鎖，使用者的 Git 命令會等它結束，不會與 repack 等工作同時改寫倉庫。
+    每項工作前後都測量 log 與 status 的延遲，紀錄與各工作最後執行的時間寫在 .git 目錄下，
+    重新啟動後仍沿用原本的排程。
+
+    參數:
+    executor (GitCommandExecutor): 主要執行器。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    parent (QObject, optional): 父物件，默認為 None。
+
+    訊號:
+    - started (str): 開始執行一項工作。
+    - recorded (object): 一項工作完成，參數為 MaintenanceRecord。
+    """
+    started = Signal(str)
+    recorded = Signal(object)
+
+    def __init__(self, executor, cwd=None, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.cwd = cwd
+        self.records = []
+        self.last_run = {}
+        self.running = None
+        self.last_input = time.monotonic()
+        self._record_path = None
+        self._active = False
+        # 停止排程時設定，執行中的工作不再等待
+        self._detach = threading.Event()
+        self.timer = QTimer(self)
+        self.timer.setInterval(CHECK_INTERVAL * 1000)
+        self.timer.timeout.connect(self.run_due)
+
+    def start(self):
+        """
+        讀取之前的紀錄並開始排程，同時監聽使用者的鍵盤與滑鼠操作以判斷是否閒置。
+        """
+        self._load()
+        self._active = True
+        self._detach.clear()
+        app = QApplication.instance()
+        if app is not None:
+            app.installEventFilter(self)
+        self.timer.start()
+
+    def stop(self):
+        """
+        停止排程。執行中的工作不再等待，在背景自行完成，關閉應用程式時不會卡住畫面；
+        它的紀錄不會保存，下次啟動時會再執行一次。
+        """
+        self._active = False
+        self.timer.stop()
+        app = QApplication.instance()
+        if app is not None:
+            app.removeEventFilter(self)
+        self._detach.set()
+
+    def eventFilter(self, watched, event):
+        """
+        記錄使用者最後一次操作的時間。
+        """
+        if event.type() in (QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.Wheel):
+            self.last_input = time.monotonic()
+        return False
+
+    def due_tasks(self):
+        """
+        取得已到期的工作，最久沒有執行的排在前面。
+
+        返回:
+        return (list of str): 維護工作的名稱。
+        """
+        now = time.time()
+        due = [task for task, interval in TASK_INTERVALS.items() if now - self.last_run.get(task, 0) >= interval]
+        return sorted(due, key=lambda task: self.last_run.get(task, 0))
+
+    def next_run(self, task):
+        """
+        取得工作下次到期的時間。
+
+        參數:
+        task (str): 維護工作的名稱。
+
+        返回:
+        return (float): 到期的時間（time.time），從未執行時為 0。
+        """
+        return self.last_run[task] + TASK_INTERVALS[task] if task in self.last_run else 0
+
+    def is_idle(self):
+        """
+        檢查使用者是否閒置且主要執行器沒有命令在執行。
+
+        返回:
+        return (bool): 閒置時返回 True。
+        """
+        return time.monotonic() - self.last_input >= IDLE_DELAY and not self.executor.is_busy()
+
+    def run_due(self):
+        """
+        閒置時開始最久沒有執行的到期工作。
+        """
+        if not self._active or self.running is not None or not self.is_idle():
+            return
+        due = self.due_tasks()
+        if due:
+            self.run_now(due[0])
+
+    def run_now(self, task):
+        """
+        立即在背景執行一項工作，不檢查是否閒置；已有工作在執行時忽略。
+
+        參數:
+        task (str): 維護工作的名稱。
+        """
+        if self.running is not None:
+            return
+        self.running = task
+        self.started.emit(task)
+        detach = self._detach
+        self.executor.submit_call(lambda: run_task(task, self.cwd, detach), read_only=False, on_success=self._finished,
+                                  on_failure=lambda error: self._finished(
+                                      MaintenanceRecord(task, time.time(), 0, {}, {}, error)))
+
+    def _finished(self, record):
+        """
+        保存工作的紀錄；成功或失敗都更新最後執行的時間，失敗的工作等下一個間隔再試。
+
+        參數:
+        record (MaintenanceRecord or None): 這次執行的紀錄，排程已停止而不再等待時為 None。
+        """
+        self.running = None
+        if record is None:
+            return
+        self.last_run[record.task] = record.started
+        self.records = (self.records + [record])[-MAX_RECORDS:]
+        self._save()
+        self.recorded.emit(record)
+        if self._active and record.error is None:
+            # 還有到期的工作時不等下一次檢查
+            QTimer.singleShot(0, self.run_due)
+
+    def _path(self):
+        """
+        取得記錄檔的路徑；不是 Git 倉庫時返回 None。
+        """
+        if self._record_path is None:
+            try:
+                self._record_path = os.path.join(git_dirs(self.cwd)[1], RECORD_FILE)
+            except RuntimeError:
+                return None
+        return self._record_path
+
+    def _load(self):
+        """
+        讀取之前保存的紀錄與各工作最後執行的時間，檔案不存在或損壞時從頭開始。
+        """
+        path = self._path()
+        if path is None:
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.records = [MaintenanceRecord.from_dict(item) for item in data.get("records", [])]
+            self.last_run = {task: float(when) for task, when in data.get("last_run", {}).items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            self.records, self.last_run = [], {}
+
+    def _save(self):
+        """
+        保存紀錄與各工作最後執行的時間；先寫入暫存檔再取代，避免留下不完整的檔案。
+        """
+        path = self._path()
+        if path is None:
+            return
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump({"last_run": self.last_run, "records": [record.to_dict() for record in self.records]}, f)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
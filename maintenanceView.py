@@ -0,0 +1,143 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+                               QTableWidgetItem, QAbstractItemView, QHeaderView)
+import time
+
+from maintenanceScheduler import TASK_INTERVALS
+
+# 排程表格與紀錄表格的欄位
+SCHEDULE_COLUMNS = ["工作", "上次執行", "下次到期", "log 平均變化", "status 平均變化"]
+RECORD_COLUMNS = ["時間", "工作", "耗時", "log", "status", "結果"]
+
+
+def _format_time(when):
+    """
+    將時間格式化為本地時間，0 表示從未執行。
+    """
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(when)) if when else "從未"
+
+
+def _format_change(before, after):
+    """
+    格式化執行前後的延遲，例如 "120.0 → 80.0 ms"。
+    """
+    if before is None or after is None:
+        return ""
+    return f"{before:.1f} → {after:.1f} ms"
+
+
+class MaintenanceDialog(QDialog):
+    """
+    背景維護的面板。上方列出各項工作的排程，以及該工作歷次執行對 log 與 status 延遲的平均影響；
+    下方列出每次執行的紀錄。排程本身由 MaintenanceScheduler 在使用者閒置時進行，
+    這裡也可以選擇一項工作立即執行。
+
+    參數:
+    scheduler (MaintenanceScheduler): 主視窗的維護排程。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.setWindowTitle("倉庫維護")
+        self.resize(820, 520)
+
+        self.status_label = QLabel("", self)
+        self.status_label.setStyleSheet("color: #2C662D; font-weight: bold;")
+        self.schedule_table = QTableWidget(len(TASK_INTERVALS), len(SCHEDULE_COLUMNS), self)
+        self.schedule_table.setHorizontalHeaderLabels(SCHEDULE_COLUMNS)
+        self.schedule_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.schedule_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.schedule_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.schedule_table.verticalHeader().setVisible(False)
+        self.schedule_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.record_table = QTableWidget(0, len(RECORD_COLUMNS), self)
+        self.record_table.setHorizontalHeaderLabels(RECORD_COLUMNS)
+        self.record_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.record_table.verticalHeader().setVisible(False)
+        self.record_table.horizontalHeader().setSectionResizeMode(len(RECORD_COLUMNS) - 1, QHeaderView.Stretch)
+        self.run_button = QPushButton("立即執行選取的工作", self)
+        self.run_button.clicked.connect(self.run_selected)
+        close_button = QPushButton("關閉", self)
+        close_button.clicked.connect(self.reject)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(self.run_button)
+        buttons.addWidget(close_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.status_label)
+        layout.addWidget(self.schedule_table)
+        layout.addWidget(QLabel("執行紀錄（由新到舊）：", self))
+        layout.addWidget(self.record_table, 1)
+        layout.addLayout(buttons)
+
+        scheduler.started.connect(self.refresh)
+        scheduler.recorded.connect(self.refresh)
+        self.refresh()
+        self.schedule_table.selectRow(0)
+
+    def refresh(self, *_):
+        """
+        重新顯示排程、各工作的平均影響與執行紀錄。
+        """
+        running = self.scheduler.running
+        self.status_label.setText(f"正在執行 {running}..." if running else "閒置時會在背景自動執行到期的工作")
+        self.run_button.setEnabled(running is None)
+        for row, task in enumerate(TASK_INTERVALS):
+            succeeded = [record for record in self.scheduler.records if record.task == task and record.error is None]
+            cells = [task, _format_time(self.scheduler.last_run.get(task, 0)),
+                     _format_time(self.scheduler.next_run(task)) if task in self.scheduler.last_run else "閒置時",
+                     self._average_change(succeeded, "log"), self._average_change(succeeded, "status")]
+            for column, text in enumerate(cells):
+                self.schedule_table.setItem(row, column, QTableWidgetItem(text))
+
+        records = list(reversed(self.scheduler.records))
+        self.record_table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            cells = [_format_time(record.started), record.task, f"{record.duration / 1000:.1f} s",
+                     _format_change(record.before.get("log"), record.after.get("log")),
+                     _format_change(record.before.get("status"), record.after.get("status")),
+                     "成功" if record.error is None else f"失敗：{record.error}"]
+            for column, text in enumerate(cells):
+                self.record_table.setItem(row, column, QTableWidgetItem(text))
+        self.record_table.resizeColumnsToContents()
+
+    @staticmethod
+    def _average_change(records, key):
+        """
+        計算歷次執行後延遲的平均變化百分比，負數表示變快。
+
+        參數:
+        records (list of MaintenanceRecord): 成功的紀錄。
+        key (str): "log" 或 "status"。
+
+        返回:
+        return (str): 例如 "-35%（3 次）"，沒有紀錄時為空字串。
+        """
+        changes = [(record.after[key] - record.before[key]) / record.before[key]
+                   for record in records if record.before.get(key) and key in record.after]
+        if not changes:
+            return ""
+        return f"{sum(changes) / len(changes) * 100:+.0f}%（{len(changes)} 次）"
+
+    def run_selected(self):
+        """
+        立即在背景執行選取的工作。
+        """
+        row = self.schedule_table.currentRow()
+        if row < 0:
+            return
+        self.scheduler.run_now(list(TASK_INTERVALS)[row])
+
+    def done(self, result):
+        """
+        關閉視窗時中斷與排程的連接，排程會繼續在背景進行。
+
+        參數:
+        result (int): 對話框的結果代碼。
+        """
+        self.scheduler.started.disconnect(self.refresh)
+        self.scheduler.recorded.disconnect(self.refresh)
+        super().done(result)
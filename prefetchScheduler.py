@@ -0,0 +1,235 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtCore import QObject, QTimer, Signal
+import os
+import subprocess
+import threading
+import time
+
+from gitExecutor import GitCommandExecutor
+
+# 預設的 fetch 間隔、失敗後最長的等待時間與單次 fetch 的逾時（秒）
+DEFAULT_INTERVAL = 300
+MAX_BACKOFF = 3600
+FETCH_TIMEOUT = 120
+
+
+def list_remotes(cwd=None):
+    """
+    列出倉庫設定的所有遠端。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (list of str): 遠端名稱。
+    """
+    result = subprocess.run(["git", "remote"], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout.split()
+
+
+def fetch_environment(cwd=None):
+    """
+    建立背景 fetch 使用的環境變數，讓所有需要使用者輸入的情況都直接失敗：
+    GIT_TERMINAL_PROMPT 關閉 Git 自己的帳號密碼提示；ssh 則以 BatchMode 關閉密碼、金鑰密碼與
+    未知主機金鑰的確認。使用者已經以 GIT_SSH_COMMAND、GIT_SSH 或 core.sshCommand 指定 ssh 命令時不覆寫。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): 環境變數。
+    """
+    env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+    if "GIT_SSH_COMMAND" not in env and "GIT_SSH" not in env:
+        configured = subprocess.run(["git", "config", "--get", "core.sshCommand"], cwd=cwd, stdin=subprocess.DEVNULL,
+                                    capture_output=True, text=True).stdout.strip()
+        if not configured:
+            env["GIT_SSH_COMMAND"] = "ssh -o BatchMode=yes"
+    return env
+
+
+class PrefetchScheduler(QObject):
+    """
+    在背景定期 fetch 每個遠端，讓遠端追蹤分支與領先落後的數量一直保持最新，
+    推送或合併前不必再等待一次網路往返就能知道是否落後。
+
+    每個遠端各自排程：成功後等待 interval 秒再 fetch；失敗時等待時間加倍，最長 MAX_BACKOFF 秒，
+    成功一次後恢復。同時進行的 fetch 數量不超過 max_concurrent。
+
+    fetch 在自己的執行器中執行，執行緒池的大小就是同時進行的數量上限；
+    網路很慢時也不會佔用主要執行器，或讓使用者的寫入命令等待讀寫鎖。
+    fetch 更新的遠端追蹤分支會由檔案監看偵測到，進而更新倉庫狀態。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    interval (float, optional): 成功後再次 fetch 的間隔（秒），默認為 DEFAULT_INTERVAL。
+    max_concurrent (int, optional): 同時進行的 fetch 數量上限，默認為 2。
+    parent (QObject, optional): 父物件，默認為 None。
+
+    訊號:
+    - fetched (str): 遠端 fetch 成功。
+    - failed (str, str): 遠端名稱與錯誤訊息。
+    """
+    fetched = Signal(str)
+    failed = Signal(str, str)
+
+    def __init__(self, cwd=None, interval=DEFAULT_INTERVAL, max_concurrent=2, parent=None):
+        super().__init__(parent)
+        self.executor = GitCommandExecutor(self, max_readers=max_concurrent)
+        self.cwd = cwd
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        # 每個遠端下次 fetch 的時間（time.monotonic）與連續失敗次數，以及正在 fetch 的遠端
+        self.next_due = {}
+        self.failures = {}
+        self.running = set()
+        self._listing = False
+        self._active = False
+        # 正在執行的 git fetch 行程，停止排程時結束它們
+        self._processes = set()
+        self._processes_lock = threading.Lock()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_due)
+
+    def start(self):
+        """
+        開始排程，立即 fetch 所有遠端。
+        """
+        self._active = True
+        self.run_due()
+
+    def stop(self):
+        """
+        停止排程並結束正在進行的 fetch，例如關閉應用程式時不必等待網路。
+        中斷的 fetch 不會留下不完整的 ref，下次 fetch 會重新下載。
+        """
+        self._active = False
+        self.timer.stop()
+        with self._processes_lock:
+            for process in self._processes:
+                process.kill()
+        self.executor.wait_for_done()
+
+    def fetch_remote(self, remote):
+        """
+        在背景執行緒中 fetch 一個遠端並清除遠端已刪除的分支。不會詢問帳號密碼或 ssh 金鑰密碼，
+        需要驗證或確認主機金鑰時直接失敗，避免背景工作卡在看不到的提示上直到逾時。
+
+        參數:
+        remote (str): 遠端名稱。
+        """
+        env = fetch_environment(self.cwd)
+        process = subprocess.Popen(["git", "fetch", "--prune", "--quiet", "--no-write-fetch-head", remote],
+                                   cwd=self.cwd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True, errors="replace")
+        with self._processes_lock:
+            self._processes.add(process)
+            if not self._active:
+                # 排程在行程啟動前就已停止
+                process.kill()
+        try:
+            _, stderr = process.communicate(timeout=FETCH_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise RuntimeError(f"fetch {remote} 超過 {FETCH_TIMEOUT} 秒沒有完成")
+        finally:
+            with self._processes_lock:
+                self._processes.discard(process)
+        if process.returncode != 0:
+            raise RuntimeError(stderr.strip() or f"返回碼 {process.returncode}")
+
+    def is_active(self):
+        """
+        檢查排程是否正在進行。
+
+        返回:
+        return (bool): 已開始且尚未停止時返回 True。
+        """
+        return self._active
+
+    def fetch_now(self):
+        """
+        讓所有遠端立即到期並開始 fetch，例如使用者要推送之前。
+        """
+        self.next_due = {remote: 0 for remote in self.next_due}
+        self.run_due()
+
+    def run_due(self):
+        """
+        在背景重新讀取遠端列表，並開始 fetch 所有已到期的遠端。
+        """
+        if not self._active or self._listing:
+            return
+        self._listing = True
+        self.executor.submit_call(lambda: list_remotes(self.cwd), on_success=self._start_due,
+                                  on_failure=self._list_failed)
+
+    def _list_failed(self, error):
+        """
+        無法讀取遠端列表時（例如目前目錄還不是 Git 倉庫），等待一個間隔後再試。
+        """
+        self._listing = False
+        self._schedule()
+
+    def _start_due(self, remotes):
+        """
+        開始 fetch 已到期的遠端，不超過同時進行的數量上限。
+
+        參數:
+        remotes (list of str): 目前設定的遠端。
+        """
+        self._listing = False
+        # 移除已刪除的遠端，新增的遠端立即到期
+        self.next_due = {remote: self.next_due.get(remote, 0) for remote in remotes}
+        self.failures = {remote: count for remote, count in self.failures.items() if remote in self.next_due}
+        now = time.monotonic()
+        due = sorted((when, remote) for remote, when in self.next_due.items()
+                     if when <= now and remote not in self.running)
+        for _, remote in due[:max(self.max_concurrent - len(self.running), 0)]:
+            self.running.add(remote)
+            self.executor.submit_call(lambda remote=remote: self.fetch_remote(remote),
+                                      on_success=lambda _, remote=remote: self._fetch_finished(remote, None),
+                                      on_failure=lambda error, remote=remote: self._fetch_finished(remote, error))
+        self._schedule()
+
+    def _fetch_finished(self, remote, error):
+        """
+        記錄 fetch 的結果並決定下次 fetch 的時間，失敗時以指數方式延長等待時間。
+
+        參數:
+        remote (str): 遠端名稱。
+        error (str or None): 錯誤訊息，成功時為 None。
+        """
+        self.running.discard(remote)
+        if error is None:
+            self.failures.pop(remote, None)
+            delay = self.interval
+        else:
+            self.failures[remote] = self.failures.get(remote, 0) + 1
+            delay = min(self.interval * 2 ** self.failures[remote], MAX_BACKOFF)
+        if remote in self.next_due:
+            self.next_due[remote] = time.monotonic() + delay
+        if error is None:
+            self.fetched.emit(remote)
+        else:
+            self.failed.emit(remote, error)
+        # 還有因為數量上限而延後的遠端時立即開始
+        if any(when <= time.monotonic() and name not in self.running for name, when in self.next_due.items()):
+            self.run_due()
+        else:
+            self._schedule()
+
+    def _schedule(self):
+        """
+        將計時器設定到最早到期的遠端，沒有遠端時等待一個間隔後重新讀取遠端列表。
+        """
+        # 已達同時進行的數量上限時，等 fetch 完成後再排程
+        if not self._active or len(self.running) >= self.max_concurrent:
+            return
+        waiting = [when for remote, when in self.next_due.items() if remote not in self.running]
+        delay = max(min(waiting) - time.monotonic(), 0) if waiting else self.interval
+        self.timer.start(int(delay * 1000))
@@ -0,0 +1,181 @@
+# 大量 ref 的索引與清單模型：以排序索引進行前綴搜尋，以子序列比對進行模糊搜尋
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+from bisect import bisect_left
+import re
+import subprocess
+
+# 清單每次多顯示的列數，檢視捲動到底部時才繼續加入
+FETCH_ROWS = 1000
+
+
+def read_ref_names(cwd=None, prefixes=("refs/heads",)):
+    """
+    以 `git for-each-ref` 讀取 ref 的短名稱。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    prefixes (tuple of str, optional): 要列出的 ref 前綴，默認只列出本地分支。
+
+    返回:
+    return (list of str): ref 短名稱，例如 "main"、"origin/main"。
+    """
+    result = subprocess.run(["git", "for-each-ref", "--format=%(refname:short)", *prefixes], cwd=cwd,
+                            capture_output=True, text=True, errors="surrogateescape")
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    # 遠端的 HEAD 只是指向預設分支的符號 ref，不列出
+    return [name for name in result.stdout.splitlines() if name and not name.endswith("/HEAD")]
+
+
+class RefIndex:
+    """
+    ref 名稱的搜尋索引。名稱以不分大小寫的形式排序，前綴搜尋以二分搜尋找出連續的範圍；
+    模糊搜尋則找出依序包含所有輸入字元的名稱（例如 "fl" 符合 "feature/login"）。
+
+    連續輸入時，新的關鍵字通常是上一個關鍵字再多幾個字元，此時只需要在上一次的結果中繼續篩選，
+    因此每多輸入一個字元，需要比對的名稱就越少。
+
+    參數:
+    names (list of str): ref 名稱。
+    """
+
+    def __init__(self, names):
+        pairs = sorted((name.lower(), name) for name in set(names))
+        self.keys = [key for key, _ in pairs]
+        self.names = [name for _, name in pairs]
+        # 上一次搜尋的關鍵字與結果（索引列表），用於遞增篩選
+        self._last_query = None
+        self._last_fuzzy = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def prefix_range(self, query):
+        """
+        找出以關鍵字開頭的名稱所在的範圍。
+
+        參數:
+        query (str): 小寫的關鍵字。
+
+        返回:
+        return (range): 排序後索引的範圍。
+        """
+        start = bisect_left(self.keys, query)
+        # 比所有以 query 開頭的字串都大的最小字串
+        end = bisect_left(self.keys, query + "\U0010ffff", start)
+        return range(start, end)
+
+    def search(self, query):
+        """
+        搜尋名稱。前綴符合的名稱排在前面，其次是名稱中任一段（以 / 分隔）以關鍵字開頭的名稱，
+        最後是模糊符合的名稱，各組內依名稱排序。
+
+        參數:
+        query (str): 關鍵字，不分大小寫。
+
+        返回:
+        return (list of int): 符合的名稱在 names 中的索引。
+        """
+        query = query.strip().lower()
+        if not query:
+            self._last_query = None
+            return list(range(len(self.names)))
+
+        prefix = self.prefix_range(query)
+        if self._last_query is not None and query.startswith(self._last_query):
+            # 新關鍵字是上一次的延伸，只需要在上一次的模糊結果中繼續篩選
+            candidates = self._last_fuzzy
+        else:
+            candidates = range(len(self.names))
+        pattern = re.compile(".*?".join(re.escape(char) for char in query))
+        fuzzy = [index for index in candidates if pattern.search(self.keys[index])]
+        self._last_query, self._last_fuzzy = query, fuzzy
+
+        segment = "/" + query
+        in_prefix = set(prefix)
+        segments = [index for index in fuzzy if index not in in_prefix and segment in self.keys[index]]
+        in_segments = set(segments)
+        rest = [index for index in fuzzy if index not in in_prefix and index not in in_segments]
+        return list(prefix) + segments + rest
+
+
+class RefListModel(QAbstractListModel):
+    """
+    ref 名稱的清單模型，搭配 QListView 使用。篩選結果可能有數萬筆，模型一開始只提供 FETCH_ROWS 列，
+    檢視捲動到底部時再以 fetchMore 加入，檢視不必一次排版所有列。
+
+    參數:
+    parent (QObject, optional): 父物件，默認為 None。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ref_index = RefIndex([])
+        # 目前篩選結果的索引，以及已提供給檢視的列數
+        self.matches = []
+        self.loaded = 0
+
+    def set_names(self, names, query=""):
+        """
+        設定所有 ref 名稱並重新篩選。
+
+        參數:
+        names (list of str): ref 名稱。
+        query (str, optional): 篩選關鍵字。
+        """
+        self.ref_index = RefIndex(names)
+        self.set_filter(query)
+
+    def set_filter(self, query):
+        """
+        以關鍵字篩選清單。
+
+        參數:
+        query (str): 關鍵字，空字串表示顯示全部。
+        """
+        self.beginResetModel()
+        self.matches = self.ref_index.search(query)
+        self.loaded = min(len(self.matches), FETCH_ROWS)
+        self.endResetModel()
+
+    def total_count(self):
+        """
+        取得篩選結果的總數，包含尚未提供給檢視的列。
+
+        返回:
+        return (int): 符合的名稱數量。
+        """
+        return len(self.matches)
+
+    def name(self, row):
+        """
+        取得某一列的 ref 名稱。
+
+        參數:
+        row (int): 列編號。
+
+        返回:
+        return (str): ref 名稱。
+        """
+        return self.ref_index.names[self.matches[row]]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if index.isValid() and role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.name(index.row())
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.matches)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(len(self.matches) - self.loaded, FETCH_ROWS)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
@@ -0,0 +1,166 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton
+from PySide6.QtCore import Qt, QEvent
+
+from refList import RefListModel, read_ref_names
+
+
+class RefPickerDialog(QDialog):
+    """
+    ref 選擇視窗，取代以 QInputDialog 手動輸入分支名稱。輸入關鍵字時即時篩選，
+    前綴符合的分支排在最前面，也支援模糊比對；清單以 QListView 顯示，只排版看得到的列。
+
+    名稱可以直接傳入（例如記憶體中的倉庫狀態已有的本地分支），
+    也可以交給執行器在背景以 `git for-each-ref` 讀取，讀取期間視窗可以先開啟並輸入關鍵字。
+
+    參數:
+    title (str): 視窗標題。
+    label (str): 輸入框上方的說明。
+    names (list of str, optional): ref 名稱，None 表示在背景讀取。
+    executor (GitCommandExecutor, optional): 在背景讀取 ref 時使用的執行器。
+    prefixes (tuple of str, optional): 在背景讀取時列出的 ref 前綴，默認為本地分支。
+    selectable (bool, optional): 是否需要選擇一個 ref，False 時只用來瀏覽，默認為 True。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, title, label, names=None, executor=None, prefixes=("refs/heads",), selectable=True,
+                 parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(420, 520)
+
+        self.filter_entry = QLineEdit(self)
+        self.filter_entry.setPlaceholderText("輸入名稱或關鍵字篩選")
+        self.filter_entry.textChanged.connect(self.apply_filter)
+        self.filter_entry.installEventFilter(self)
+        self.model = RefListModel(self)
+        self.list_view = QListView(self)
+        # 所有列高度相同時，檢視不必逐列計算大小
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setModel(self.model)
+        self.list_view.doubleClicked.connect(lambda index: self.accept_row(index.row()))
+        self.count_label = QLabel("載入中..." if names is None else "", self)
+        self.count_label.setStyleSheet("color: #2C662D; font-size: 12px;")
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.count_label, 1)
+        if selectable:
+            ok_button = QPushButton("確定", self)
+            ok_button.setDefault(True)
+            ok_button.clicked.connect(self.accept_current)
+            buttons.addWidget(ok_button)
+        close_button = QPushButton("取消" if selectable else "關閉", self)
+        close_button.clicked.connect(self.reject)
+        buttons.addWidget(close_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(label, self))
+        layout.addWidget(self.filter_entry)
+        layout.addWidget(self.list_view)
+        layout.addLayout(buttons)
+
+        self.selected = None
+        self._closed = False
+        if names is not None:
+            self.set_names(names)
+        else:
+            executor.submit_call(lambda: read_ref_names(prefixes=prefixes), on_success=self.set_names,
+                                 on_failure=self.load_failed)
+
+    def set_names(self, names):
+        """
+        設定所有 ref 名稱，並以目前輸入的關鍵字篩選。
+
+        參數:
+        names (list of str): ref 名稱。
+        """
+        # 背景讀取完成前視窗可能已經關閉並刪除
+        if self._closed:
+            return
+        self.model.set_names(names, self.filter_entry.text())
+        self.update_count()
+
+    def load_failed(self, error):
+        """
+        顯示背景讀取 ref 失敗的原因。
+
+        參數:
+        error (str): 錯誤訊息。
+        """
+        if not self._closed:
+            self.count_label.setText(f"無法讀取 ref：{error}")
+
+    def done(self, result):
+        """
+        關閉視窗，之後不再更新背景讀取的結果。
+        """
+        self._closed = True
+        super().done(result)
+
+    def apply_filter(self, text):
+        """
+        以輸入的關鍵字篩選清單，並選取第一個結果。
+
+        參數:
+        text (str): 關鍵字。
+        """
+        self.model.set_filter(text)
+        self.update_count()
+
+    def update_count(self):
+        """
+        顯示符合的數量，並選取第一個結果，讓使用者可以直接按 Enter。
+        """
+        self.count_label.setText(f"{self.model.total_count()} / {len(self.model.ref_index)} 個 ref")
+        if self.model.rowCount():
+            self.list_view.setCurrentIndex(self.model.index(0))
+
+    def eventFilter(self, watched, event):
+        """
+        在輸入框中按上下鍵時移動清單的選取，不必把焦點移到清單。
+        """
+        if watched is self.filter_entry and event.type() == QEvent.KeyPress and \
+                event.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+            self.list_view.keyPressEvent(event)
+            return True
+        return super().eventFilter(watched, event)
+
+    def accept_row(self, row):
+        """
+        選擇某一列並關閉視窗。
+
+        參數:
+        row (int): 列編號。
+        """
+        self.selected = self.model.name(row)
+        self.accept()
+
+    def accept_current(self):
+        """
+        選擇目前選取的列；沒有符合的 ref 時不關閉視窗。
+        """
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            self.accept_row(index.row())
+
+    @staticmethod
+    def get_ref(parent, title, label, names=None, executor=None, prefixes=("refs/heads",)):
+        """
+        顯示 ref 選擇視窗並等待使用者選擇，用法與 QInputDialog.getText 相同。
+
+        參數:
+        parent (QWidget): 父級窗口。
+        title (str): 視窗標題。
+        label (str): 輸入框上方的說明。
+        names (list of str, optional): ref 名稱，None 表示在背景讀取。
+        executor (GitCommandExecutor, optional): 在背景讀取 ref 時使用的執行器。
+        prefixes (tuple of str, optional): 在背景讀取時列出的 ref 前綴。
+
+        返回:
+        return (tuple): (選擇的 ref 名稱, 是否按下確定)。
+        """
+        dialog = RefPickerDialog(title, label, names, executor, prefixes, parent=parent)
+        ok = dialog.exec() == QDialog.Accepted and dialog.selected is not None
+        selected = dialog.selected if ok else ""
+        # 視窗是父級窗口的子物件，不刪除時會連同 ref 索引一直留在記憶體中
+        dialog.deleteLater()
+        return selected, ok
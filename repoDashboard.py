@@ -0,0 +1,285 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+                               QTableWidgetItem, QAbstractItemView, QHeaderView, QFileDialog)
+from PySide6.QtCore import QSettings, QElapsedTimer
+import os
+
+from gitExecutor import GitCommandExecutor
+from gitProgress import parse_progress
+from repoState import read_repository_state
+
+# 表格的欄位
+COLUMNS = ["倉庫", "分支", "領先/落後", "變更", "分支數", "結果"]
+PATH_COLUMN, BRANCH_COLUMN, AHEAD_BEHIND_COLUMN, CHANGES_COLUMN, BRANCHES_COLUMN, RESULT_COLUMN = range(len(COLUMNS))
+# 同時處理的倉庫數量上限
+MAX_WORKERS = 8
+
+
+class RepositoryDashboard(QDialog):
+    """
+    多倉庫總覽。登錄多個倉庫路徑後，可以同時對所有倉庫執行 fetch、pull 或讀取狀態與分支，
+    每個倉庫完成時立即更新表格中對應的一列。
+
+    所有倉庫的命令交給一個專用的執行器，同時執行的數量由執行緒池限制在 MAX_WORKERS，
+    因此全部完成的時間大約等於最慢的倉庫，而不是所有倉庫的總和。不同倉庫之間不會互相影響，
+    所以都以唯讀任務提交以便並行；同一個倉庫在前一個操作完成前不會再次執行。
+    fetch 與 pull 以 --progress 執行，進度顯示在結果欄位，可以一次取消所有執行中的 fetch 與 pull。
+
+    登錄的倉庫路徑保存在 QSettings 中，下次開啟時自動載入。
+
+    參數:
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("多倉庫總覽")
+        self.resize(900, 500)
+        self.settings = QSettings("ThreeDimGenWebAPP", "GitFlow")
+        self.executor = GitCommandExecutor(self, max_readers=MAX_WORKERS)
+        # 正在執行操作的倉庫，以及整批操作的計時器與剩餘數量
+        self._busy = set()
+        # 執行中的 fetch 與 pull：倉庫路徑對應任務編號，用來取消；以及使用者取消的倉庫
+        self._tasks = {}
+        self._cancelled = set()
+        self._timer = QElapsedTimer()
+        self._pending = 0
+        # 視窗關閉後仍在執行的操作繼續在背景完成，但不再更新表格
+        self._closed = False
+
+        # 倉庫表格
+        self.table = QTableWidget(0, len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(PATH_COLUMN, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(RESULT_COLUMN, QHeaderView.Stretch)
+
+        # 登錄與操作按鈕
+        add_button = QPushButton("加入倉庫", self)
+        add_button.clicked.connect(self.add_repository)
+        remove_button = QPushButton("移除選取倉庫", self)
+        remove_button.clicked.connect(self.remove_selected)
+        status_button = QPushButton("讀取狀態", self)
+        status_button.clicked.connect(lambda: self.run_all("status"))
+        fetch_button = QPushButton("全部 fetch", self)
+        fetch_button.clicked.connect(lambda: self.run_all("fetch"))
+        pull_button = QPushButton("全部 pull", self)
+        pull_button.clicked.connect(lambda: self.run_all("pull"))
+        cancel_button = QPushButton("取消", self)
+        cancel_button.clicked.connect(self.cancel_all)
+        self.status_label = QLabel("", self)
+        self.status_label.setStyleSheet("color: #2C662D; font-size: 12px;")
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(add_button)
+        buttons.addWidget(remove_button)
+        buttons.addStretch(1)
+        buttons.addWidget(status_button)
+        buttons.addWidget(fetch_button)
+        buttons.addWidget(pull_button)
+        buttons.addWidget(cancel_button)
+        layout = QVBoxLayout(self)
+        layout.addLayout(buttons)
+        layout.addWidget(self.table)
+        layout.addWidget(self.status_label)
+
+        for path in self.settings.value("dashboard/repositories", [], type=list):
+            self._append_row(path)
+        self.run_all("status")
+
+    def repositories(self):
+        """
+        取得所有登錄的倉庫路徑。
+
+        返回:
+        return (list of str): 依表格順序排列的路徑。
+        """
+        return [self.table.item(row, PATH_COLUMN).text() for row in range(self.table.rowCount())]
+
+    def _save(self):
+        """
+        將登錄的倉庫路徑寫入 QSettings。
+        """
+        self.settings.setValue("dashboard/repositories", self.repositories())
+
+    def _append_row(self, path):
+        """
+        在表格最後加入一列倉庫。
+
+        參數:
+        path (str): 倉庫路徑。
+        """
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        self.table.setItem(row, PATH_COLUMN, QTableWidgetItem(path))
+        for column in range(1, len(COLUMNS)):
+            self.table.setItem(row, column, QTableWidgetItem(""))
+
+    def _row_of(self, path):
+        """
+        找出倉庫所在的列，倉庫已被移除時返回 -1。
+
+        參數:
+        path (str): 倉庫路徑。
+
+        返回:
+        return (int): 列編號。
+        """
+        repositories = self.repositories()
+        return repositories.index(path) if path in repositories else -1
+
+    def _set_cell(self, path, column, text):
+        """
+        更新某個倉庫的一個欄位，倉庫已被移除或視窗已關閉時略過。
+        """
+        if self._closed:
+            return
+        row = self._row_of(path)
+        if row >= 0:
+            self.table.item(row, column).setText(text)
+
+    def add_repository(self):
+        """
+        選擇一個目錄並登錄為倉庫，登錄後立即讀取它的狀態。
+        """
+        path = QFileDialog.getExistingDirectory(self, "選擇 Git 倉庫")
+        if not path:
+            return
+        path = os.path.normpath(path)
+        if path not in self.repositories():
+            self._append_row(path)
+            self._save()
+        self.run(path, "status")
+
+    def remove_selected(self):
+        """
+        移除選取的倉庫。
+        """
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            self.table.removeRow(row)
+        self._save()
+
+    def run_all(self, action):
+        """
+        對所有登錄的倉庫執行同一個操作，全部完成後在狀態列顯示總耗時。
+
+        參數:
+        action (str): "status"、"fetch" 或 "pull"。
+        """
+        for path in self.repositories():
+            self.run(path, action)
+
+    def run(self, path, action):
+        """
+        在背景對一個倉庫執行操作。fetch 與 pull 完成後會接著讀取狀態。
+
+        參數:
+        path (str): 倉庫路徑。
+        action (str): "status"、"fetch" 或 "pull"。
+        """
+        if path in self._busy:
+            return
+        if not self._pending:
+            # 新的一批操作開始計時
+            self._timer.start()
+        self._busy.add(path)
+        self._pending += 1
+        self.status_label.setText(f"正在處理 {self._pending} 個倉庫...")
+        self._set_cell(path, RESULT_COLUMN, "執行中...")
+        if action == "status":
+            self._read_status(path)
+            return
+        args = ["git", "fetch", "--all", "--prune", "--progress"] if action == "fetch" else \
+            ["git", "pull", "--ff-only", "--progress"]
+        self._tasks[path] = self.executor.submit_progress(
+            args, read_only=True, cwd=path, on_success=lambda output: self._read_status(path),
+            on_failure=lambda error: self._finish(
+                path, "已取消" if path in self._cancelled else f"失敗：{(error.splitlines() or [''])[-1]}"),
+            on_progress=lambda line: self._show_progress(path, line))
+
+    def _show_progress(self, path, line):
+        """
+        在結果欄位顯示 fetch 或 pull 目前的階段與百分比，其他訊息略過。
+
+        參數:
+        path (str): 倉庫路徑。
+        line (str): 標準錯誤中的一段內容。
+        """
+        progress = parse_progress(line)
+        if progress is not None:
+            percent = f" {progress.percent}%" if progress.percent is not None else ""
+            self._set_cell(path, RESULT_COLUMN, f"{progress.phase}{percent}，{progress.describe()}")
+
+    def cancel_all(self):
+        """
+        取消所有執行中的 fetch 與 pull，連同 Git 啟動的傳輸行程一起結束；讀取狀態的操作很快，不必取消。
+        """
+        for path, task_id in self._tasks.items():
+            self._cancelled.add(path)
+            self.executor.cancel(task_id)
+
+    def _read_status(self, path):
+        """
+        在背景讀取一個倉庫的狀態，完成後更新表格並結束這個倉庫的操作。
+
+        參數:
+        path (str): 倉庫路徑。
+        """
+        if self._closed:
+            # fetch 或 pull 在視窗關閉後才完成，不必再讀取狀態
+            self._finish(path, "")
+            return
+        self.executor.submit_call(lambda: read_repository_state(path),
+                                  on_success=lambda snapshot: self._show_snapshot(path, snapshot),
+                                  on_failure=lambda error: self._finish(path, f"失敗：{error}"))
+
+    def _show_snapshot(self, path, snapshot):
+        """
+        以讀取到的倉庫狀態更新表格。
+
+        參數:
+        path (str): 倉庫路徑。
+        snapshot (RepositorySnapshot): 倉庫狀態。
+        """
+        self._set_cell(path, BRANCH_COLUMN, snapshot.branch or f"分離的 HEAD {(snapshot.head_oid or '')[:7]}")
+        self._set_cell(path, AHEAD_BEHIND_COLUMN,
+                       f"↑{snapshot.ahead} ↓{snapshot.behind}" if snapshot.upstream else "沒有上游")
+        self._set_cell(path, CHANGES_COLUMN, str(len(snapshot.changes)))
+        self._set_cell(path, BRANCHES_COLUMN, str(len(snapshot.branches)))
+        self._finish(path, "完成")
+
+    def _finish(self, path, result):
+        """
+        結束一個倉庫的操作，整批操作都完成時顯示總耗時。
+
+        參數:
+        path (str): 倉庫路徑。
+        result (str): 顯示在結果欄位的文字。
+        """
+        self._busy.discard(path)
+        self._tasks.pop(path, None)
+        self._cancelled.discard(path)
+        self._set_cell(path, RESULT_COLUMN, result)
+        self._pending = max(self._pending - 1, 0)
+        if self._pending:
+            return
+        if self._closed:
+            # 最後一個背景操作完成，刪除已關閉的視窗與它的執行器
+            self.deleteLater()
+        else:
+            self.status_label.setText(f"完成，耗時 {self._timer.elapsed() / 1000:.1f} 秒")
+
+    def done(self, result):
+        """
+        關閉視窗時不等待背景命令：仍在執行的 fetch 或 pull 繼續在背景完成，避免被中斷，
+        完成後不再更新表格，最後一個完成時才刪除視窗。
+
+        參數:
+        result (int): 對話框的結果代碼。
+        """
+        self._closed = True
+        super().done(result)
+        if not self._pending:
+            self.deleteLater()
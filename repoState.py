@@ -0,0 +1,307 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtCore import QObject, Signal
+import subprocess
+
+
+class BranchInfo:
+    """
+    一個本地分支的資訊。
+
+    參數:
+    name (str): 分支名稱。
+    oid (str): 分支指向的 commit 雜湊值。
+    upstream (str): 追蹤的遠端分支，沒有時為空字串。
+    is_head (bool): 是否為目前所在的分支。
+    """
+
+    def __init__(self, name, oid, upstream, is_head):
+        self.name = name
+        self.oid = oid
+        self.upstream = upstream
+        self.is_head = is_head
+
+
+class FileChange:
+    """
+    工作目錄中一個有變更的檔案。
+
+    參數:
+    path (str): 檔案路徑。
+    index_status (str): 暫存區的狀態代碼，例如 M、A、D，沒有變更時為 "."。
+    worktree_status (str): 工作目錄的狀態代碼，未追蹤的檔案為 "?"。
+    orig_path (str, optional): 重新命名或複製前的路徑。
+    """
+
+    def __init__(self, path, index_status, worktree_status, orig_path=None):
+        self.path = path
+        self.index_status = index_status
+        self.worktree_status = worktree_status
+        self.orig_path = orig_path
+
+    def is_staged(self):
+        """
+        檢查這個檔案是否有已暫存的變更。
+
+        返回:
+        return (bool): 暫存區有變更時返回 True。
+        """
+        return self.index_status not in (".", "?", "!")
+
+    def is_untracked(self):
+        """
+        檢查這個檔案是否尚未被追蹤。
+
+        返回:
+        return (bool): 未追蹤時返回 True。
+        """
+        return self.worktree_status == "?"
+
+
+class RepositorySnapshot:
+    """
+    某一時刻的倉庫狀態，由 read_repository_state 一次讀取。
+
+    屬性:
+    - branch (str or None): 目前所在的分支，分離 HEAD 時為 None。
+    - head_oid (str or None): HEAD 指向的 commit，尚未有任何 commit 時為 None。
+    - upstream (str or None): 目前分支追蹤的遠端分支。
+    - ahead (int): 領先遠端分支的 commit 數量。
+    - behind (int): 落後遠端分支的 commit 數量。
+    - branches (list of BranchInfo): 所有本地分支，依名稱排序。
+    - changes (list of FileChange): 所有有變更或未追蹤的檔案。
+    """
+
+    def __init__(self):
+        self.branch = None
+        self.head_oid = None
+        self.upstream = None
+        self.ahead = 0
+        self.behind = 0
+        self.branches = []
+        self.changes = []
+
+
+def parse_status(output, snapshot):
+    """
+    解析 `git status --porcelain=v2 --branch -z` 的輸出並填入倉庫狀態。
+
+    參數:
+    output (bytes): git status 的原始輸出。
+    snapshot (RepositorySnapshot): 要填入的倉庫狀態。
+    """
+    entries = output.split(b"\0")
+    position = 0
+    while position < len(entries):
+        entry = entries[position].decode(errors="surrogateescape")
+        position += 1
+        if not entry:
+            continue
+        kind = entry[0]
+        if kind == "#":
+            # 分支資訊，例如 "# branch.head main" 或 "# branch.ab +1 -2"
+            _, key, value = entry.split(" ", 2)
+            if key == "branch.oid":
+                snapshot.head_oid = None if value == "(initial)" else value
+            elif key == "branch.head":
+                snapshot.branch = None if value == "(detached)" else value
+            elif key == "branch.upstream":
+                snapshot.upstream = value
+            elif key == "branch.ab":
+                ahead, behind = value.split()
+                snapshot.ahead, snapshot.behind = int(ahead), -int(behind)
+        elif kind == "1":
+            # 一般變更：1 XY sub mH mI mW hH hI path
+            fields = entry.split(" ", 8)
+            snapshot.changes.append(FileChange(fields[8], fields[1][0], fields[1][1]))
+        elif kind == "2":
+            # 重新命名或複製：2 XY sub mH mI mW hH hI Xscore path，原路徑在下一個項目
+            fields = entry.split(" ", 9)
+            orig_path = entries[position].decode(errors="surrogateescape")
+            position += 1
+            snapshot.changes.append(FileChange(fields[9], fields[1][0], fields[1][1], orig_path))
+        elif kind == "u":
+            # 未合併的衝突：u XY sub m1 m2 m3 mW h1 h2 h3 path
+            fields = entry.split(" ", 10)
+            snapshot.changes.append(FileChange(fields[10], fields[1][0], fields[1][1]))
+        elif kind == "?":
+            snapshot.changes.append(FileChange(entry[2:], "?", "?"))
+
+
+def parse_branches(output, snapshot):
+    """
+    解析 read_repository_state 所用的 `git for-each-ref` 輸出並填入分支列表。
+
+    參數:
+    output (bytes): git for-each-ref 的原始輸出，每行以 Tab 分隔各欄位。
+    snapshot (RepositorySnapshot): 要填入的倉庫狀態。
+    """
+    for line in output.decode(errors="surrogateescape").splitlines():
+        head, name, oid, upstream = line.split("\t")
+        snapshot.branches.append(BranchInfo(name, oid, upstream, head == "*"))
+
+
+def read_repository_state(cwd=None):
+    """
+    以一次批次讀取倉庫狀態：同時啟動 `git status` 與 `git for-each-ref`，兩者都不經過 Shell。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (RepositorySnapshot): 讀取到的倉庫狀態。
+    """
+    # --no-optional-locks 讓背景讀取不會順便改寫 index，避免觸發檔案監看又再讀取一次
+    status = subprocess.Popen(["git", "--no-optional-locks", "status", "--porcelain=v2", "--branch", "-z"], cwd=cwd,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    refs = subprocess.Popen(["git", "for-each-ref", "--format=%(HEAD)\t%(refname:short)\t%(objectname)\t%(upstream:short)",
+                             "refs/heads"], cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    status_output, status_error = status.communicate()
+    refs_output, refs_error = refs.communicate()
+    if status.returncode != 0:
+        raise RuntimeError(status_error.decode(errors="replace").strip())
+    if refs.returncode != 0:
+        raise RuntimeError(refs_error.decode(errors="replace").strip())
+
+    snapshot = RepositorySnapshot()
+    parse_status(status_output, snapshot)
+    parse_branches(refs_output, snapshot)
+    return snapshot
+
+
+class RepositoryState(QObject):
+    """
+    在記憶體中保存的倉庫狀態，由所有操作共用。按鈕與對話框直接讀取這裡的資料，
+    不必每次都執行 Git；寫入操作完成後呼叫 refresh 在背景重新讀取。
+
+    同一時間只會有一次讀取在進行，讀取期間再次要求更新時，會在讀取完成後再讀取一次。
+
+    參數:
+    executor (GitCommandExecutor): 用來在背景讀取狀態的執行器。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    parent (QObject, optional): 父物件，默認為 None。
+
+    訊號:
+    - changed (): 狀態已更新。
+    - failed (str): 讀取狀態失敗時的錯誤訊息，例如目前目錄不是 Git 倉庫。
+    """
+    changed = Signal()
+    failed = Signal(str)
+
+    def __init__(self, executor, cwd=None, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.cwd = cwd
+        self.snapshot = RepositorySnapshot()
+        # 是否已成功讀取過，以及是否正在讀取、讀取期間是否又被要求更新
+        self.loaded = False
+        self._refreshing = False
+        self._refresh_again = False
+        # 等待第一次讀取完成的回呼函數
+        self._waiting = []
+
+    def refresh(self):
+        """
+        在背景重新讀取倉庫狀態。
+        """
+        if self._refreshing:
+            self._refresh_again = True
+            return
+        self._refreshing = True
+        self.executor.submit_call(lambda: read_repository_state(self.cwd),
+                                  on_success=self._apply, on_failure=self._refresh_failed)
+
+    def when_loaded(self, on_loaded, on_failure=None):
+        """
+        狀態已讀取時立即呼叫 on_loaded，否則開始讀取並在讀取完成後呼叫。
+
+        參數:
+        on_loaded (callable): 狀態可用時呼叫的無參數函數。
+        on_failure (callable, optional): 讀取失敗時以錯誤訊息呼叫的函數。
+        """
+        if self.loaded:
+            on_loaded()
+            return
+        self._waiting.append((on_loaded, on_failure))
+        self.refresh()
+
+    def _apply(self, snapshot):
+        """
+        套用背景讀取到的狀態並發出 changed 訊號。
+
+        參數:
+        snapshot (RepositorySnapshot): 新的倉庫狀態。
+        """
+        self.snapshot = snapshot
+        self.loaded = True
+        self._refresh_finished()
+        self.changed.emit()
+        waiting, self._waiting = self._waiting, []
+        for on_loaded, _ in waiting:
+            on_loaded()
+
+    def _refresh_failed(self, error):
+        """
+        讀取失敗時清除狀態並發出 failed 訊號，之後的操作會改為等待下一次成功讀取。
+
+        參數:
+        error (str): 錯誤訊息。
+        """
+        self.loaded = False
+        self.snapshot = RepositorySnapshot()
+        self._refresh_finished()
+        self.failed.emit(error)
+        waiting, self._waiting = self._waiting, []
+        for _, on_failure in waiting:
+            if on_failure is not None:
+                on_failure(error)
+
+    def _refresh_finished(self):
+        """
+        結束一次讀取，如果讀取期間又被要求更新則再讀取一次。
+        """
+        self._refreshing = False
+        if self._refresh_again:
+            self._refresh_again = False
+            self.refresh()
+
+    def is_dirty(self):
+        """
+        檢查工作目錄或暫存區是否有任何變更。
+
+        返回:
+        return (bool): 有變更或未追蹤的檔案時返回 True。
+        """
+        return bool(self.snapshot.changes)
+
+    def branch_names(self):
+        """
+        取得所有本地分支的名稱。
+
+        返回:
+        return (list of str): 依名稱排序的分支名稱。
+        """
+        return [branch.name for branch in self.snapshot.branches]
+
+    def branch_list_text(self):
+        """
+        產生與 `git branch` 相同格式的分支列表，目前分支前面會標示星號。
+
+        返回:
+        return (str): 分支列表。
+        """
+        return "\n".join(("* " if branch.is_head else "  ") + branch.name for branch in self.snapshot.branches)
+
+    def summary(self):
+        """
+        產生顯示在狀態列的簡短描述，例如「main ↑1 ↓2，3 個變更」。
+
+        返回:
+        return (str): 倉庫狀態的描述。
+        """
+        snapshot = self.snapshot
+        text = snapshot.branch or f"分離的 HEAD {(snapshot.head_oid or '')[:7]}"
+        if snapshot.upstream and (snapshot.ahead or snapshot.behind):
+            text += f" ↑{snapshot.ahead} ↓{snapshot.behind}"
+        if snapshot.changes:
+            text += f"，{len(snapshot.changes)} 個變更"
+        return text
@@ -0,0 +1,261 @@
+# 大型倉庫模式：啟用 fsmonitor、untracked cache、index v4 與 split index，並測量設定前後的延遲
+import json
+import os
+import subprocess
+import time
+
+from gitDiff import DiffSource, read_diff_files
+from repoState import read_repository_state
+from repoWatcher import git_dirs
+from stagingEngine import read_changes
+
+# 追蹤的檔案超過這個數量時建議啟用大型倉庫模式
+LARGE_REPO_FILES = 50000
+# 測量延遲時每個操作重複的次數
+TIMING_REPEAT = 3
+# 記錄啟用前各設定原本的值，放在 .git 目錄下的檔名
+STATE_FILE = "threedimgen-large-repo.json"
+
+
+class TuningSetting:
+    """
+    大型倉庫模式的一項設定。
+
+    參數:
+    key (str): git config 的名稱。
+    value (str): 啟用時的值。
+    description (str): 顯示在設定表格中的說明。
+    """
+
+    def __init__(self, key, value, description):
+        self.key = key
+        self.value = value
+        self.description = description
+
+
+# fsmonitor 只在 Git 支援內建的 fsmonitor--daemon 時才會啟用
+SETTINGS = [
+    TuningSetting("core.fsmonitor", "true", "以內建的檔案監看服務取代每次對整個工作目錄的 stat"),
+    TuningSetting("core.untrackedCache", "true", "快取未追蹤檔案的目錄掃描結果"),
+    TuningSetting("index.version", "4", "以路徑前綴壓縮 index，減少讀寫 index 的資料量"),
+    TuningSetting("core.splitIndex", "true", "每次只寫入 index 中變更的部分"),
+    TuningSetting("feature.manyFiles", "true", "Git 針對大量檔案建議的預設值組合"),
+]
+
+
+def _run_git(args, cwd=None, check=True):
+    """
+    執行 Git 命令並返回標準輸出。
+
+    參數:
+    args (list of str): git 之後的參數。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    check (bool, optional): 命令失敗時是否拋出例外，默認為 True。
+
+    返回:
+    return (str): 標準輸出。
+    """
+    result = subprocess.run(["git", *args], cwd=cwd, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout.strip()
+
+
+def fsmonitor_supported():
+    """
+    檢查目前的 Git 是否內建 fsmonitor--daemon（Windows 與 macOS 從 2.36 開始支援）。
+
+    返回:
+    return (bool): 支援時返回 True。
+    """
+    return "fsmonitor--daemon" in _run_git(["version", "--build-options"], check=False)
+
+
+def repository_size(cwd=None):
+    """
+    讀取倉庫的規模：追蹤的檔案數量與物件資料庫的大小。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): files（追蹤的檔案數量）、objects（物件數量）與 size_kb（物件資料庫的 KB 數）。
+    """
+    files = _run_git(["ls-files", "-z"], cwd).count("\0")
+    counts = {}
+    for line in _run_git(["count-objects", "-v"], cwd).splitlines():
+        name, _, value = line.partition(": ")
+        counts[name] = int(value) if value.isdigit() else 0
+    return {"files": files,
+            "objects": counts.get("count", 0) + counts.get("in-pack", 0),
+            "size_kb": counts.get("size", 0) + counts.get("size-pack", 0)}
+
+
+def current_settings(cwd=None):
+    """
+    讀取每項設定目前在倉庫中的值。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): 設定名稱對應目前的值，沒有設定時為 None。
+    """
+    values = {}
+    for setting in SETTINGS:
+        value = _run_git(["config", "--get", setting.key], cwd, check=False)
+        values[setting.key] = value or None
+    return values
+
+
+def _state_path(cwd=None):
+    """
+    取得記錄原本設定值的檔案路徑。倉庫設定由所有工作目錄共用，因此放在共用目錄。
+    """
+    return os.path.join(git_dirs(cwd)[1], STATE_FILE)
+
+
+def _load_previous(cwd=None):
+    """
+    讀取啟用前各設定原本的值。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): 由本工具寫入的設定名稱對應原本在倉庫設定中的值，原本沒有設定時為 None；
+        沒有紀錄時為空字典。
+    """
+    try:
+        with open(_state_path(cwd), encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return previous if isinstance(previous, dict) else {}
+
+
+def _save_previous(previous, cwd=None):
+    """
+    保存啟用前各設定原本的值；先寫入暫存檔再取代，避免留下不完整的檔案。
+
+    參數:
+    previous (dict): _load_previous 的格式。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    """
+    path = _state_path(cwd)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(previous, f)
+    os.replace(path + ".tmp", path)
+
+
+def measure_operations(cwd=None, repeat=TIMING_REPEAT):
+    """
+    測量本工具自己的讀取操作：狀態列的倉庫狀態，以及提交前讀取的變更列表與 git status。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    repeat (int, optional): 每個操作重複的次數，取中位數，默認為 TIMING_REPEAT。
+
+    返回:
+    return (dict): 操作名稱對應中位數耗時（毫秒）。
+    """
+    operations = {
+        "倉庫狀態": lambda: read_repository_state(cwd),
+        "提交前的變更列表": lambda: (read_diff_files(DiffSource(), cwd), read_changes(cwd)),
+    }
+    timings = {}
+    for name, operation in operations.items():
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            operation()
+            samples.append((time.perf_counter() - start) * 1000)
+        timings[name] = sorted(samples)[len(samples) // 2]
+    return timings
+
+
+def enable_large_repo_mode(cwd=None, report=None):
+    """
+    啟用大型倉庫模式並測量前後的延遲。設定寫入倉庫的 .git/config，
+    接著以 update-index 立即改寫 index，並執行一次 git status 建立快取，之後才測量。
+    已經是建議值的設定不會改寫；改寫的設定原本在倉庫中的值記錄在 STATE_FILE，停用時還原。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    report (callable, optional): 以進度文字呼叫的函數。
+
+    返回:
+    return (dict): before 與 after 為 measure_operations 的結果，applied 為實際寫入的設定名稱。
+    """
+    report = report or (lambda line: None)
+    report("正在測量目前的延遲...")
+    before = measure_operations(cwd)
+    use_fsmonitor = fsmonitor_supported()
+    values = current_settings(cwd)
+    changes = [setting for setting in SETTINGS
+               if values[setting.key] != setting.value and (setting.key != "core.fsmonitor" or use_fsmonitor)]
+    # 先記錄原本的值再寫入設定，中途失敗時停用仍可以還原；重複啟用時保留第一次記錄的值。
+    # 只讀取倉庫本身的設定，原本來自全域設定的值在移除倉庫設定後自然恢復
+    previous = _load_previous(cwd)
+    for setting in changes:
+        if setting.key not in previous:
+            value = _run_git(["config", "--local", "--get", setting.key], cwd, check=False)
+            previous[setting.key] = value or None
+    _save_previous(previous, cwd)
+    applied = []
+    for setting in changes:
+        _run_git(["config", setting.key, setting.value], cwd)
+        applied.append(setting.key)
+    report("正在改寫 index...")
+    _run_git(["update-index", "--index-version", "4", "--split-index", "--untracked-cache"], cwd)
+    if use_fsmonitor:
+        # 已在執行時 start 會失敗，不影響結果
+        _run_git(["fsmonitor--daemon", "start"], cwd, check=False)
+    # 第一次 status 會填入 untracked cache 與 fsmonitor 的狀態並寫回 index
+    _run_git(["status", "--porcelain"], cwd)
+    report("正在測量啟用後的延遲...")
+    after = measure_operations(cwd)
+    return {"before": before, "after": after, "applied": applied}
+
+
+def disable_large_repo_mode(cwd=None):
+    """
+    停用大型倉庫模式：只還原啟用時改寫的設定，恢復為原本的值或移除，
+    並依還原後的設定改寫 index、停止 fsmonitor 服務。啟用前就有的設定不會變動。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (list of str): 還原的設定名稱，沒有由本工具改寫的設定時為空列表。
+    """
+    previous = _load_previous(cwd)
+    for key, value in previous.items():
+        if value is None:
+            # 沒有設定時 --unset 以結束碼 5 表示，不是錯誤
+            _run_git(["config", "--unset-all", key], cwd, check=False)
+        else:
+            _run_git(["config", key, value], cwd)
+    # index 的格式依還原後的設定決定，例如使用者原本就設定了 core.splitIndex 時維持 split index
+    flags = []
+    if "index.version" in previous or "feature.manyFiles" in previous:
+        version = _run_git(["config", "--get", "index.version"], cwd, check=False)
+        flags += ["--index-version", version if version in ("2", "3", "4") else "2"]
+    if "core.splitIndex" in previous:
+        split = _run_git(["config", "--bool", "--get", "core.splitIndex"], cwd, check=False)
+        flags.append("--split-index" if split == "true" else "--no-split-index")
+    if "core.untrackedCache" in previous:
+        untracked = _run_git(["config", "--bool", "--get", "core.untrackedCache"], cwd, check=False)
+        flags.append("--untracked-cache" if untracked == "true" else "--no-untracked-cache")
+    if "core.fsmonitor" in previous:
+        if fsmonitor_supported():
+            _run_git(["fsmonitor--daemon", "stop"], cwd, check=False)
+        if previous["core.fsmonitor"] is None:
+            flags.append("--no-fsmonitor")
+    if flags:
+        _run_git(["update-index", *flags], cwd)
+    try:
+        os.remove(_state_path(cwd))
+    except FileNotFoundError:
+        pass
+    return list(previous)
@@ -0,0 +1,151 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
+                               QTableWidgetItem, QAbstractItemView, QHeaderView, QPlainTextEdit)
+
+from repoTuning import (LARGE_REPO_FILES, SETTINGS, current_settings, disable_large_repo_mode,
+                        enable_large_repo_mode, fsmonitor_supported, repository_size)
+
+# 設定表格的欄位
+COLUMNS = ["設定", "目前的值", "建議的值", "說明"]
+
+
+class LargeRepoDialog(QDialog):
+    """
+    大型倉庫模式的管理視窗。顯示倉庫規模與各項設定目前的值，
+    啟用時在背景寫入設定並改寫 index，完成後列出本工具的狀態與提交操作在啟用前後的延遲。
+
+    參數:
+    executor (GitCommandExecutor): 在背景讀取與寫入設定的執行器。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, executor, cwd=None, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.cwd = cwd
+        self.setWindowTitle("大型倉庫模式")
+        self.resize(760, 460)
+
+        self.size_label = QLabel("正在讀取倉庫規模...", self)
+        self.size_label.setStyleSheet("color: #2C662D; font-weight: bold;")
+        self.table = QTableWidget(len(SETTINGS), len(COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionMode(QAbstractItemView.NoSelection)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(len(COLUMNS) - 1, QHeaderView.Stretch)
+        for row, setting in enumerate(SETTINGS):
+            self.table.setItem(row, 0, QTableWidgetItem(setting.key))
+            self.table.setItem(row, 2, QTableWidgetItem(setting.value))
+            self.table.setItem(row, 3, QTableWidgetItem(setting.description))
+        self.log_view = QPlainTextEdit(self)
+        self.log_view.setReadOnly(True)
+        self.enable_button = QPushButton("啟用並測量", self)
+        self.enable_button.clicked.connect(self.enable)
+        self.disable_button = QPushButton("停用", self)
+        self.disable_button.clicked.connect(self.disable)
+        close_button = QPushButton("關閉", self)
+        close_button.clicked.connect(self.reject)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(self.enable_button)
+        buttons.addWidget(self.disable_button)
+        buttons.addWidget(close_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.size_label)
+        layout.addWidget(self.table)
+        layout.addWidget(self.log_view)
+        layout.addLayout(buttons)
+
+        self.refresh()
+
+    def refresh(self):
+        """
+        在背景讀取倉庫規模與各項設定目前的值。
+        """
+        self.executor.submit_call(
+            lambda: (repository_size(self.cwd), current_settings(self.cwd), fsmonitor_supported()),
+            on_success=self.show_settings, on_failure=lambda error: self.size_label.setText(f"無法讀取倉庫：{error}"))
+
+    def show_settings(self, result):
+        """
+        顯示倉庫規模與設定表格。
+
+        參數:
+        result (tuple): (repository_size 的結果, current_settings 的結果, 是否支援 fsmonitor)。
+        """
+        size, values, fsmonitor = result
+        advice = "建議啟用" if size["files"] >= LARGE_REPO_FILES else "檔案數量不多，啟用的效果有限"
+        self.size_label.setText(f"{size['files']} 個追蹤的檔案，{size['objects']} 個物件，"
+                                f"{size['size_kb'] / 1024:.1f} MB（{advice}）")
+        for row, setting in enumerate(SETTINGS):
+            value = values[setting.key]
+            if setting.key == "core.fsmonitor" and not fsmonitor:
+                value = "目前的 Git 不支援"
+            self.table.setItem(row, 1, QTableWidgetItem(value if value is not None else "（未設定）"))
+        self.table.resizeColumnsToContents()
+
+    def _set_busy(self, busy):
+        """
+        執行中停用按鈕，避免重複送出。
+        """
+        self.enable_button.setEnabled(not busy)
+        self.disable_button.setEnabled(not busy)
+
+    def enable(self):
+        """
+        在背景啟用大型倉庫模式，進度與前後的延遲顯示在下方的紀錄中。
+        """
+        self._set_busy(True)
+        self.executor.submit_call(lambda report: enable_large_repo_mode(self.cwd, report), read_only=False,
+                                  on_success=self.show_timings, on_failure=self.failed,
+                                  on_progress=self.log_view.appendPlainText, reports_progress=True)
+
+    def show_timings(self, result):
+        """
+        列出各操作在啟用前後的延遲。
+
+        參數:
+        result (dict): enable_large_repo_mode 的結果。
+        """
+        self._set_busy(False)
+        self.log_view.appendPlainText("已啟用：" + "、".join(result["applied"]))
+        for name, before in result["before"].items():
+            after = result["after"][name]
+            ratio = before / after if after > 0 else float("inf")
+            self.log_view.appendPlainText(f"{name}：{before:.1f} ms → {after:.1f} ms（{ratio:.1f} 倍）")
+        self.refresh()
+
+    def disable(self):
+        """
+        在背景停用大型倉庫模式。
+        """
+        self._set_busy(True)
+        self.executor.submit_call(lambda: disable_large_repo_mode(self.cwd), read_only=False,
+                                  on_success=self.show_restored, on_failure=self.failed)
+
+    def show_restored(self, restored):
+        """
+        列出停用時還原的設定。
+
+        參數:
+        restored (list of str): disable_large_repo_mode 的結果。
+        """
+        self._set_busy(False)
+        if restored:
+            self.log_view.appendPlainText("已停用大型倉庫模式，還原：" + "、".join(restored))
+        else:
+            self.log_view.appendPlainText("沒有由本工具啟用的設定需要還原")
+        self.refresh()
+
+    def failed(self, error):
+        """
+        顯示錯誤訊息。
+
+        參數:
+        error (str): 錯誤訊息。
+        """
+        self._set_busy(False)
+        self.log_view.appendPlainText(f"失敗：{error}")
@@ -0,0 +1,180 @@
+# 匯入所需的 PySide6 和其他模組
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+import subprocess
+import os
+
+
+def git_dirs(cwd=None):
+    """
+    取得倉庫的 .git 目錄與共用目錄。一般倉庫兩者相同；在 `git worktree` 建立的工作目錄中，
+    HEAD 與 index 在各自的 .git 目錄，refs 與 packed-refs 則在共用目錄。
+
+    參數:
+    cwd (str, optional): 倉庫中的任意路徑，默認為目前目錄。
+
+    返回:
+    return (tuple of str): (.git 目錄, 共用目錄) 的絕對路徑。
+    """
+    result = subprocess.run(["git", "rev-parse", "--absolute-git-dir", "--git-common-dir"],
+                            cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    git_dir, common_dir = result.stdout.splitlines()
+    return git_dir, os.path.abspath(os.path.join(cwd or os.getcwd(), common_dir))
+
+
+def _file_signature(path):
+    """
+    取得檔案的修改時間、大小與 inode，用來判斷檔案是否真的改變。
+
+    參數:
+    path (str): 檔案路徑。
+
+    返回:
+    return (tuple or None): 檔案的特徵值，檔案不存在時返回 None。
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class RepositoryWatcher(QObject):
+    """
+    監看 .git/HEAD、.git/refs、.git/packed-refs 與 .git/index，只有在這些檔案真的改變時才發出訊號，
+    取代輪詢或每次點擊都重新執行 Git。事件會先合併一小段時間再處理，
+    因此一次 Git 命令產生的多個檔案事件只會觸發一次更新。
+
+    Git 更新這些檔案時會先寫入 .lock 檔再重新命名，被取代的檔案會從監看清單中消失，
+    所以這裡同時監看所在的目錄，並在每次處理事件後重新加入消失或新建的路徑。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    delay (int, optional): 合併事件的等待時間（毫秒），默認為 100。
+    parent (QObject, optional): 父物件，默認為 None。
+
+    訊號:
+    - refsChanged (): HEAD、分支、標籤或其他 ref 改變。
+    - indexChanged (): 暫存區改變。
+    - changed (): 上述任一項改變，同一批事件只發出一次。
+    """
+    refsChanged = Signal()
+    indexChanged = Signal()
+    changed = Signal()
+
+    def __init__(self, cwd=None, delay=100, parent=None):
+        super().__init__(parent)
+        self.cwd = cwd
+        self.git_dir = None
+        self.common_dir = None
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_path_changed)
+        self.watcher.directoryChanged.connect(self._on_path_changed)
+        # 合併短時間內連續事件的計時器
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self._process_events)
+        # 上次處理事件時 HEAD、packed-refs 與 index 的特徵值，以及等待處理期間 refs 目錄是否有事件
+        self._signatures = {}
+        self._refs_dirty = False
+
+    def start(self):
+        """
+        開始監看目前倉庫。目前目錄還不是 Git 倉庫時返回 False，可以在倉庫初始化後再呼叫一次。
+
+        返回:
+        return (bool): 是否成功開始監看。
+        """
+        try:
+            self.git_dir, self.common_dir = git_dirs(self.cwd)
+        except RuntimeError:
+            return False
+        self._signatures = self._read_signatures()
+        self._watch_paths()
+        return True
+
+    def is_active(self):
+        """
+        檢查是否正在監看倉庫。
+
+        返回:
+        return (bool): 已開始監看時返回 True。
+        """
+        return self.git_dir is not None
+
+    def stop(self):
+        """
+        停止監看並清除所有監看路徑。
+        """
+        self.timer.stop()
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.git_dir = self.common_dir = None
+
+    def _watched_files(self):
+        """
+        取得需要比對特徵值的檔案。
+
+        返回:
+        return (dict): 名稱對應到要比對特徵值的檔案路徑。
+        """
+        return {"HEAD": os.path.join(self.git_dir, "HEAD"),
+                "packed-refs": os.path.join(self.common_dir, "packed-refs"),
+                "index": os.path.join(self.git_dir, "index")}
+
+    def _read_signatures(self):
+        """
+        讀取所有監看檔案目前的特徵值。
+
+        返回:
+        return (dict): 名稱對應到特徵值。
+        """
+        return {name: _file_signature(path) for name, path in self._watched_files().items()}
+
+    def _watch_paths(self):
+        """
+        將監看檔案、它們所在的目錄，以及 refs 底下所有的子目錄加入監看清單，已在清單中的路徑會略過。
+        """
+        paths = {self.git_dir, self.common_dir}
+        paths.update(path for path in self._watched_files().values() if os.path.exists(path))
+        # refs/heads/feature/x 這類分支放在子目錄中，每一層目錄都需要監看
+        for root, _, _ in os.walk(os.path.join(self.common_dir, "refs")):
+            paths.add(root)
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        missing = sorted(paths - watched)
+        if missing:
+            self.watcher.addPaths(missing)
+
+    def _on_path_changed(self, path):
+        """
+        收到檔案或目錄事件時記錄下來，並重新開始計時，等事件停止後再一起處理。
+
+        參數:
+        path (str): 發生事件的路徑。
+        """
+        if os.path.commonpath([path, os.path.join(self.common_dir, "refs")]) == os.path.join(self.common_dir, "refs"):
+            self._refs_dirty = True
+        self.timer.start()
+
+    def _process_events(self):
+        """
+        比對檔案特徵值，只針對真的改變的部分發出訊號，並補回監看清單中消失的路徑。
+        """
+        if not self.is_active():
+            return
+        signatures = self._read_signatures()
+        changed = {name for name in signatures if signatures[name] != self._signatures.get(name)}
+        self._signatures = signatures
+        refs_dirty, self._refs_dirty = self._refs_dirty, False
+        self._watch_paths()
+
+        refs_changed = refs_dirty or "HEAD" in changed or "packed-refs" in changed
+        if refs_changed:
+            self.refsChanged.emit()
+        if "index" in changed:
+            self.indexChanged.emit()
+        if refs_changed or "index" in changed:
+            self.changed.emit()
@@ -0,0 +1,137 @@
+# 部分複製（--filter=blob:none）與 cone 模式的稀疏檢出
+import subprocess
+import time
+
+
+def _run_git(args, cwd=None, check=True):
+    """
+    執行 Git 命令並返回標準輸出。
+
+    參數:
+    args (list of str): git 之後的參數。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    check (bool, optional): 命令失敗時是否拋出例外，默認為 True。
+
+    返回:
+    return (str): 標準輸出。
+    """
+    result = subprocess.run(["git", *args], cwd=cwd, stdin=subprocess.DEVNULL, capture_output=True,
+                            text=True, errors="surrogateescape")
+    if check and result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+def clone_command(url, destination, partial=True, sparse=True):
+    """
+    建立 git clone 的命令。部分複製只下載 commit 與 tree，檔案內容在檢出時才下載；
+    稀疏檢出以 cone 模式開始，只檢出根目錄的檔案，之後再加入需要的目錄。
+    以 file:// 複製本機倉庫時，來源倉庫需要設定 uploadpack.allowFilter 才會套用部分複製。
+
+    參數:
+    url (str): 遠端倉庫的 URL。
+    destination (str): 複製到的目錄。
+    partial (bool, optional): 是否使用 --filter=blob:none，默認為 True。
+    sparse (bool, optional): 是否使用 cone 模式的稀疏檢出，默認為 True。
+
+    返回:
+    return (list of str): 命令與參數，可以交給 GitProgressDialog 執行。
+    """
+    args = ["git", "clone", "--progress"]
+    if partial:
+        args.append("--filter=blob:none")
+    if sparse:
+        args.append("--sparse")
+    return args + ["--", url, destination]
+
+
+def set_command(directories):
+    """
+    建立以 cone 模式設定稀疏檢出目錄的命令；尚未啟用稀疏檢出時會同時啟用。
+    部分複製的倉庫會在這時下載新加入目錄的檔案內容。
+
+    參數:
+    directories (list of str): 要檢出的目錄，相對於倉庫根目錄。
+
+    返回:
+    return (list of str): 命令與參數。
+    """
+    return ["git", "sparse-checkout", "set", "--cone", *sorted(directories)]
+
+
+def disable_command():
+    """
+    建立停用稀疏檢出、檢出所有檔案的命令。
+
+    返回:
+    return (list of str): 命令與參數。
+    """
+    return ["git", "sparse-checkout", "disable"]
+
+
+def sparse_state(cwd=None):
+    """
+    讀取倉庫的稀疏檢出與部分複製設定。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): enabled（是否啟用稀疏檢出）、cone（是否為 cone 模式）、
+        directories（檢出的目錄列表）與 filter（部分複製的過濾條件，沒有時為 None）。
+    """
+    enabled = _run_git(["config", "--bool", "core.sparseCheckout"], cwd, check=False).strip() == "true"
+    cone = _run_git(["config", "--bool", "core.sparseCheckoutCone"], cwd, check=False).strip() == "true"
+    directories = []
+    if enabled and cone:
+        directories = [line for line in _run_git(["sparse-checkout", "list"], cwd).splitlines() if line]
+    # 部分複製的過濾條件記錄在遠端的設定中，例如 remote.origin.partialclonefilter
+    filters = _run_git(["config", "--get-regexp", r"^remote\..*\.partialclonefilter$"], cwd, check=False).split()
+    return {"enabled": enabled, "cone": cone, "directories": directories,
+            "filter": filters[1] if len(filters) >= 2 else None}
+
+
+def list_directories(prefix="", cwd=None):
+    """
+    列出 HEAD 中某個目錄下一層的子目錄。只讀取 tree 物件，部分複製的倉庫不需要下載任何檔案內容。
+
+    參數:
+    prefix (str, optional): 父目錄，相對於倉庫根目錄，空字串表示根目錄。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (list of str): 子目錄的完整路徑，還沒有任何 commit 時為空列表。
+    """
+    tree = "HEAD:" + prefix if prefix else "HEAD^{tree}"
+    result = subprocess.run(["git", "ls-tree", "-d", "-z", "--name-only", tree], cwd=cwd, stdin=subprocess.DEVNULL,
+                            capture_output=True)
+    if result.returncode != 0:
+        return []
+    names = [name.decode(errors="surrogateescape") for name in result.stdout.split(b"\0") if name]
+    return [f"{prefix}/{name}" if prefix else name for name in names]
+
+
+def checkout_stats(cwd=None):
+    """
+    讀取工作目錄的規模：實際檢出的檔案數量、追蹤的檔案總數、物件資料庫的大小與 git status 的耗時，
+    用來比較稀疏檢出前後的差異。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (dict): checked_out、tracked、size_kb 與 status_ms。
+    """
+    # ls-files -t 以 S 標示設定了 skip-worktree、沒有檢出的檔案
+    entries = [entry for entry in _run_git(["ls-files", "-t", "-z"], cwd).split("\0") if entry]
+    skipped = sum(1 for entry in entries if entry.startswith("S "))
+    size_kb = 0
+    for line in _run_git(["count-objects", "-v"], cwd).splitlines():
+        name, _, value = line.partition(": ")
+        if name in ("size", "size-pack"):
+            size_kb += int(value)
+    start = time.perf_counter()
+    _run_git(["--no-optional-locks", "status", "--porcelain"], cwd)
+    status_ms = (time.perf_counter() - start) * 1000
+    return {"checked_out": len(entries) - skipped, "tracked": len(entries), "size_kb": size_kb,
+            "status_ms": status_ms}
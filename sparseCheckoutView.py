@@ -0,0 +1,322 @@
+# 匯入所需的 PySide6 模組
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QLineEdit,
+                               QCheckBox, QFileDialog, QTreeWidget, QTreeWidgetItem, QMessageBox)
+from PySide6.QtCore import Qt
+import os
+import time
+
+from gitProgressView import GitProgressDialog
+from sparseCheckout import (checkout_stats, clone_command, disable_command, list_directories, set_command,
+                            sparse_state)
+
+
+class CloneDialog(QDialog):
+    """
+    複製倉庫的設定視窗，可以選擇部分複製（--filter=blob:none）與 cone 模式的稀疏檢出。
+    按下「複製」後以進度視窗執行 git clone，完成後顯示耗時；啟用稀疏檢出時接著開啟目錄選擇視窗。
+
+    參數:
+    executor (GitCommandExecutor): 在背景執行 git clone 的執行器。
+    url (str, optional): 預設的遠端倉庫 URL。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, executor, url="", parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.setWindowTitle("複製倉庫")
+        self.resize(560, 200)
+
+        self.url_entry = QLineEdit(url, self)
+        self.destination_entry = QLineEdit(self)
+        if url:
+            name = url.rstrip("/").rsplit("/", 1)[-1]
+            self.destination_entry.setText(os.path.join(os.getcwd(), name[:-4] if name.endswith(".git") else name))
+        browse_button = QPushButton("選擇...", self)
+        browse_button.clicked.connect(self.browse)
+        self.partial_box = QCheckBox("部分複製：只下載 commit 與目錄結構，檔案內容在檢出時才下載", self)
+        self.partial_box.setChecked(True)
+        self.sparse_box = QCheckBox("稀疏檢出：只檢出選擇的目錄（cone 模式）", self)
+        self.sparse_box.setChecked(True)
+        clone_button = QPushButton("複製", self)
+        clone_button.clicked.connect(self.clone)
+        cancel_button = QPushButton("取消", self)
+        cancel_button.clicked.connect(self.reject)
+
+        layout = QGridLayout(self)
+        layout.addWidget(QLabel("遠端倉庫:", self), 0, 0)
+        layout.addWidget(self.url_entry, 0, 1, 1, 2)
+        layout.addWidget(QLabel("複製到:", self), 1, 0)
+        layout.addWidget(self.destination_entry, 1, 1)
+        layout.addWidget(browse_button, 1, 2)
+        layout.addWidget(self.partial_box, 2, 0, 1, 3)
+        layout.addWidget(self.sparse_box, 3, 0, 1, 3)
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(clone_button)
+        buttons.addWidget(cancel_button)
+        layout.addLayout(buttons, 4, 0, 1, 3)
+
+    def browse(self):
+        """
+        選擇複製到的目錄。
+        """
+        path = QFileDialog.getExistingDirectory(self, "選擇複製到的目錄")
+        if path:
+            name = os.path.basename(self.destination_entry.text()) or "repository"
+            self.destination_entry.setText(os.path.join(path, name))
+
+    def clone(self):
+        """
+        以進度視窗執行 git clone，成功後關閉設定視窗。
+        """
+        url, destination = self.url_entry.text().strip(), self.destination_entry.text().strip()
+        if not url or not destination:
+            QMessageBox.warning(self, "複製倉庫", "請輸入遠端倉庫與複製到的目錄。")
+            return
+        started = time.monotonic()
+        finished = []
+        # 複製到新的目錄不影響目前的倉庫，以唯讀任務提交，不必等待其他寫入命令
+        dialog = GitProgressDialog(self.executor, clone_command(url, destination, self.partial_box.isChecked(),
+                                                                self.sparse_box.isChecked()),
+                                   "複製倉庫", read_only=True,
+                                   on_success=lambda output: finished.append(time.monotonic() - started), parent=self)
+        dialog.exec()
+        dialog.deleteLater()
+        if not finished:
+            return
+        QMessageBox.information(self, "複製倉庫", f"已複製到 {destination}，耗時 {finished[0]:.1f} 秒。")
+        self.accept()
+        if self.sparse_box.isChecked():
+            SparseCheckoutDialog(self.executor, cwd=destination, parent=self.parentWidget()).exec()
+
+
+class SparseCheckoutDialog(QDialog):
+    """
+    稀疏檢出的目錄選擇視窗。以樹狀列出 HEAD 中的目錄，展開時才讀取下一層，只讀取 tree 物件；
+    勾選的目錄（包含它底下的所有檔案）會被檢出，在 cone 模式下，勾選目錄的各層父目錄中的檔案也會檢出。
+    上方顯示檢出的檔案數量、物件資料庫大小與 git status 的耗時，套用後重新測量以比較差異。
+
+    參數:
+    executor (GitCommandExecutor): 在背景讀取目錄與執行 sparse-checkout 的執行器。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    parent (QWidget, optional): 父級窗口，默認為 None。
+    """
+
+    def __init__(self, executor, cwd=None, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.cwd = cwd
+        self.setWindowTitle("稀疏檢出")
+        self.resize(560, 600)
+
+        self.mode_label = QLabel("正在讀取稀疏檢出設定...", self)
+        self.mode_label.setStyleSheet("color: #2C662D; font-weight: bold;")
+        self.stats_label = QLabel("", self)
+        self.tree = QTreeWidget(self)
+        self.tree.setHeaderLabels(["目錄"])
+        self.tree.itemExpanded.connect(self.load_children)
+        self.tree.itemChanged.connect(self.update_children)
+        self.apply_button = QPushButton("套用", self)
+        self.apply_button.clicked.connect(self.apply)
+        self.disable_button = QPushButton("停用稀疏檢出", self)
+        self.disable_button.clicked.connect(self.disable)
+        close_button = QPushButton("關閉", self)
+        close_button.clicked.connect(self.reject)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch(1)
+        buttons.addWidget(self.apply_button)
+        buttons.addWidget(self.disable_button)
+        buttons.addWidget(close_button)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.mode_label)
+        layout.addWidget(self.stats_label)
+        layout.addWidget(self.tree)
+        layout.addLayout(buttons)
+
+        # 目前設定中的目錄，以及套用前的規模（用來顯示前後的差異）
+        self.directories = set()
+        self.previous_stats = None
+        self.stats = None
+        self.refresh()
+
+    def refresh(self):
+        """
+        在背景讀取稀疏檢出設定、根目錄下的目錄與工作目錄的規模。
+        """
+        self.executor.submit_call(
+            lambda: (sparse_state(self.cwd), list_directories("", self.cwd), checkout_stats(self.cwd)),
+            on_success=self.show_state, on_failure=lambda error: self.mode_label.setText(f"無法讀取倉庫：{error}"))
+
+    def show_state(self, result):
+        """
+        顯示設定與規模，並重建目錄樹。
+
+        參數:
+        result (tuple): (sparse_state 的結果, 根目錄下的目錄, checkout_stats 的結果)。
+        """
+        state, directories, stats = result
+        self.directories = set(state["directories"])
+        partial = f"部分複製（{state['filter']}）" if state["filter"] else "完整複製"
+        if not state["enabled"]:
+            mode = "未啟用稀疏檢出，所有檔案都已檢出；勾選目錄後套用即可啟用"
+        elif not state["cone"]:
+            mode = "使用非 cone 模式的稀疏檢出，套用後會改為 cone 模式"
+        else:
+            mode = f"cone 模式稀疏檢出，{len(self.directories)} 個目錄"
+        self.mode_label.setText(f"{partial}，{mode}")
+        self.disable_button.setEnabled(state["enabled"])
+        self.previous_stats, self.stats = self.stats, stats
+        self.stats_label.setText(self._describe_stats())
+
+        self.tree.blockSignals(True)
+        self.tree.clear()
+        self._add_items(self.tree.invisibleRootItem(), directories, False)
+        self.tree.blockSignals(False)
+
+    def _describe_stats(self):
+        """
+        描述工作目錄的規模；套用過設定時同時顯示套用前的數值。
+        """
+        def describe(stats):
+            return (f"檢出 {stats['checked_out']}/{stats['tracked']} 個檔案，物件 {stats['size_kb'] / 1024:.1f} MB，"
+                    f"status {stats['status_ms']:.0f} ms")
+        text = describe(self.stats)
+        if self.previous_stats is not None:
+            text = f"套用前：{describe(self.previous_stats)}\n套用後：{text}"
+        return text
+
+    def _add_items(self, parent, directories, inherited):
+        """
+        加入一層目錄。每個目錄先加入一個空白子項目，讓它可以展開，展開時才讀取真正的子目錄。
+
+        參數:
+        parent (QTreeWidgetItem): 父項目。
+        directories (list of str): 目錄的完整路徑。
+        inherited (bool): 父目錄是否已勾選；已勾選時子目錄一定會檢出，不能單獨取消。
+        """
+        for path in directories:
+            item = QTreeWidgetItem([path.rsplit("/", 1)[-1]])
+            item.setData(0, Qt.UserRole, path)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(0, Qt.Checked if inherited or path in self.directories else Qt.Unchecked)
+            item.setDisabled(inherited)
+            item.addChild(QTreeWidgetItem([""]))
+            parent.addChild(item)
+
+    def load_children(self, item):
+        """
+        第一次展開目錄時在背景讀取它的子目錄。
+
+        參數:
+        item (QTreeWidgetItem): 展開的目錄。
+        """
+        if item.childCount() != 1 or item.child(0).data(0, Qt.UserRole) is not None:
+            return
+        path = item.data(0, Qt.UserRole)
+        self.executor.submit_call(lambda: list_directories(path, self.cwd),
+                                  on_success=lambda directories: self._set_children(item, directories),
+                                  on_failure=lambda error: item.child(0).setText(0, f"無法讀取：{error}"))
+
+    def _set_children(self, item, directories):
+        """
+        以讀到的子目錄取代空白子項目。
+
+        參數:
+        item (QTreeWidgetItem): 父目錄。
+        directories (list of str): 子目錄的完整路徑。
+        """
+        if item.treeWidget() is None:
+            # 讀取期間目錄樹已經重建
+            return
+        self.tree.blockSignals(True)
+        item.takeChildren()
+        self._add_items(item, directories, item.checkState(0) == Qt.Checked)
+        self.tree.blockSignals(False)
+
+    def update_children(self, item, column):
+        """
+        勾選目錄時子目錄都會檢出，因此一併勾選並停用；取消勾選時恢復子目錄原本的選擇。
+
+        參數:
+        item (QTreeWidgetItem): 改變的目錄。
+        column (int): 改變的欄位。
+        """
+        checked = item.checkState(0) == Qt.Checked
+        self.tree.blockSignals(True)
+        stack = [item.child(index) for index in range(item.childCount())]
+        while stack:
+            child = stack.pop()
+            path = child.data(0, Qt.UserRole)
+            if path is None:
+                continue
+            child.setDisabled(checked)
+            child.setCheckState(0, Qt.Checked if checked or path in self.directories else Qt.Unchecked)
+            stack.extend(child.child(index) for index in range(child.childCount()))
+        self.tree.blockSignals(False)
+
+    def selected_directories(self):
+        """
+        取得勾選的目錄，父目錄已勾選的子目錄不重複列出。
+
+        返回:
+        return (list of str): 目錄的完整路徑。
+        """
+        selected = []
+        stack = [self.tree.topLevelItem(index) for index in range(self.tree.topLevelItemCount())]
+        while stack:
+            item = stack.pop()
+            path = item.data(0, Qt.UserRole)
+            if path is None:
+                continue
+            if item.checkState(0) == Qt.Checked:
+                selected.append(path)
+            else:
+                stack.extend(item.child(index) for index in range(item.childCount()))
+        # 尚未展開的目錄中可能還有之前設定的子目錄
+        for path in self.directories:
+            if not any(path == other or path.startswith(other + "/") for other in selected) and \
+                    self._unloaded(path):
+                selected.append(path)
+        return sorted(selected)
+
+    def _unloaded(self, path):
+        """
+        檢查目錄是否在尚未展開讀取的父目錄底下，因此不會出現在目錄樹中。
+        """
+        parts = path.split("/")
+        parent = self.tree.invisibleRootItem()
+        for depth in range(1, len(parts) + 1):
+            prefix = "/".join(parts[:depth])
+            match = None
+            for index in range(parent.childCount()):
+                if parent.child(index).data(0, Qt.UserRole) == prefix:
+                    match = parent.child(index)
+                    break
+            if match is None:
+                # 父項目只有空白子項目，表示尚未展開
+                return parent.childCount() == 1 and parent.child(0).data(0, Qt.UserRole) is None
+            parent = match
+        return False
+
+    def apply(self):
+        """
+        以勾選的目錄設定稀疏檢出，部分複製的倉庫會在這時下載需要的檔案內容，完成後重新測量規模。
+        """
+        dialog = GitProgressDialog(self.executor, set_command(self.selected_directories()), "套用稀疏檢出",
+                                   cwd=self.cwd, on_success=lambda output: self.refresh(), parent=self)
+        dialog.exec()
+        dialog.deleteLater()
+
+    def disable(self):
+        """
+        停用稀疏檢出並檢出所有檔案；部分複製的倉庫會下載所有檔案內容，因此先確認。
+        """
+        confirm = QMessageBox.question(self, "停用稀疏檢出", "停用後會檢出所有檔案，部分複製的倉庫需要下載所有檔案內容，是否繼續？")
+        if confirm != QMessageBox.Yes:
+            return
+        dialog = GitProgressDialog(self.executor, disable_command(), "停用稀疏檢出", cwd=self.cwd,
+                                   on_success=lambda output: self.refresh(), parent=self)
+        dialog.exec()
+        dialog.deleteLater()
@@ -0,0 +1,197 @@
+# 選擇性暫存：只暫存使用者選擇的路徑，取代會掃描整個工作目錄的 `git add .`
+import subprocess
+
+# 每次 `git update-index` 最多暫存的路徑數量，分批以便回報進度
+BATCH_SIZE = 5000
+
+
+class StagingChange:
+    """
+    `git status --porcelain -z` 中的一個項目。
+
+    參數:
+    path (str): 檔案路徑。
+    index_status (str): 暫存區的狀態代碼，沒有變更時為空白，未追蹤的檔案為 "?"。
+    worktree_status (str): 工作目錄的狀態代碼，沒有變更時為空白，未追蹤的檔案為 "?"。
+    orig_path (str, optional): 已暫存的重新命名或複製前的路徑。
+    """
+
+    def __init__(self, path, index_status, worktree_status, orig_path=None):
+        self.path = path
+        self.index_status = index_status
+        self.worktree_status = worktree_status
+        self.orig_path = orig_path
+
+    def paths(self):
+        """
+        取得這個項目涉及的所有路徑。
+
+        返回:
+        return (list of str): 路徑，重新命名時包含原路徑。
+        """
+        return [self.path] if self.orig_path is None else [self.path, self.orig_path]
+
+    def is_staged(self):
+        """
+        檢查暫存區是否有此檔案的變更。
+
+        返回:
+        return (bool): 暫存區有變更時返回 True。
+        """
+        return self.index_status not in (" ", "?", "!")
+
+    def needs_staging(self):
+        """
+        檢查工作目錄是否有尚未暫存的變更，包含未追蹤的檔案與未合併的衝突。
+
+        返回:
+        return (bool): 需要暫存時返回 True。
+        """
+        return self.worktree_status != " "
+
+
+def _run_git(args, cwd=None, input=None):
+    """
+    執行 Git 命令並返回標準輸出的 bytes。
+
+    參數:
+    args (list of str): git 之後的參數。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    input (bytes, optional): 傳給標準輸入的資料。
+
+    返回:
+    return (bytes): 標準輸出。
+    """
+    result = subprocess.run(["git", *args], cwd=cwd, input=input, capture_output=True,
+                            stdin=None if input is not None else subprocess.DEVNULL)
+    if result.returncode != 0:
+        # 例如 git commit 沒有可提交的變更時，原因寫在標準輸出
+        raise RuntimeError((result.stderr or result.stdout).decode(errors="replace").strip()
+                           or f"返回碼 {result.returncode}")
+    return result.stdout
+
+
+def top_level(cwd=None):
+    """
+    取得倉庫的根目錄。git status --porcelain 的路徑一律相對於根目錄，
+    update-index 與 reset 的路徑則相對於執行的目錄，因此暫存時都在根目錄執行。
+
+    參數:
+    cwd (str, optional): 倉庫中的任一目錄，默認為目前目錄。
+
+    返回:
+    return (str): 根目錄的絕對路徑。
+    """
+    return _run_git(["rev-parse", "--show-toplevel"], cwd).decode(errors="surrogateescape").strip()
+
+
+def parse_porcelain(output):
+    """
+    解析 `git status --porcelain -z` 的輸出。
+
+    參數:
+    output (bytes): git status 的原始輸出。
+
+    返回:
+    return (list of StagingChange): 所有有變更或未追蹤的檔案。
+    """
+    changes = []
+    entries = output.split(b"\0")
+    position = 0
+    while position < len(entries):
+        entry = entries[position].decode(errors="surrogateescape")
+        position += 1
+        if len(entry) < 4:
+            continue
+        # "XY 路徑"；重新命名與複製的原路徑在下一個項目
+        orig_path = None
+        if entry[0] in "RC":
+            orig_path = entries[position].decode(errors="surrogateescape")
+            position += 1
+        changes.append(StagingChange(entry[3:], entry[0], entry[1], orig_path))
+    return changes
+
+
+def read_changes(cwd=None):
+    """
+    以一次 `git status --porcelain -z` 取得所有變更的路徑，未追蹤的目錄會展開成個別檔案。
+    倉庫設定了 core.fsmonitor 或 core.untrackedCache 時，git status 會自動使用它們，
+    不必逐一檢查每個檔案；這裡刻意不加 --no-optional-locks，讓 git status 把更新後的快取寫回 index。
+
+    參數:
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+
+    返回:
+    return (list of StagingChange): 所有有變更或未追蹤的檔案。
+    """
+    return parse_porcelain(_run_git(["status", "--porcelain", "-z", "--untracked-files=all"], cwd))
+
+
+def stage_paths(paths, cwd=None, batch_size=BATCH_SIZE, on_progress=None):
+    """
+    以 `git update-index --add --remove -z --stdin` 分批暫存指定的路徑。
+    只會讀取與雜湊這些路徑，已刪除的檔案會從暫存區移除。
+
+    參數:
+    paths (list of str): 要暫存的路徑，必須是檔案而不是目錄。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    batch_size (int, optional): 每次 update-index 的路徑數量，默認為 BATCH_SIZE。
+    on_progress (callable, optional): 每批完成後以 (已暫存數量, 總數量) 呼叫的函數。
+
+    返回:
+    return (int): 暫存的路徑數量。
+    """
+    for start in range(0, len(paths), batch_size):
+        batch = paths[start:start + batch_size]
+        _run_git(["update-index", "--add", "--remove", "-z", "--stdin"], cwd,
+                 input=b"".join(path.encode(errors="surrogateescape") + b"\0" for path in batch))
+        if on_progress is not None:
+            on_progress(start + len(batch), len(paths))
+    return len(paths)
+
+
+def unstage_paths(paths, cwd=None):
+    """
+    把指定路徑的暫存區內容恢復為 HEAD 的版本，工作目錄的檔案不變。
+
+    參數:
+    paths (list of str): 要取消暫存的路徑。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    """
+    if not paths:
+        return
+    pathspecs = b"".join(path.encode(errors="surrogateescape") + b"\0" for path in paths)
+    has_head = subprocess.run(["git", "rev-parse", "--verify", "-q", "HEAD"], cwd=cwd, stdin=subprocess.DEVNULL,
+                              capture_output=True).returncode == 0
+    # 路徑以字面比對，例如 "a[1]" 不會被當成萬用字元而連帶取消暫存 "a1"；
+    # 還沒有任何 commit 時沒有 HEAD 可以恢復，直接從暫存區移除
+    args = ["--literal-pathspecs"] + (["reset", "-q"] if has_head else ["rm", "--cached", "-q", "-r"])
+    _run_git(args + ["--pathspec-from-file=-", "--pathspec-file-nul"], cwd, input=pathspecs)
+
+
+def commit_selected(selected, message, cwd=None, on_progress=None):
+    """
+    只提交選擇的檔案：暫存選擇的檔案在工作目錄中的變更，取消暫存其他已暫存的檔案，然後提交。
+    變更的路徑只讀取一次，不會像 `git add .` 一樣重新雜湊整個工作目錄。
+
+    參數:
+    selected (set of str or None): 要提交的路徑（相對於倉庫根目錄），重新命名時應同時包含新舊路徑；
+        None 表示提交所有變更，結果與 `git add . && git commit` 相同。
+    message (str): 提交訊息。
+    cwd (str, optional): Git 倉庫的路徑，默認為目前目錄。
+    on_progress (callable, optional): 暫存每批完成後以 (已暫存數量, 總數量) 呼叫的函數。
+
+    返回:
+    return (str): git commit 的輸出。
+    """
+    root = top_level(cwd)
+    to_stage, to_unstage = [], []
+    for change in read_changes(root):
+        if selected is None or any(path in selected for path in change.paths()):
+            if change.needs_staging():
+                to_stage.append(change.path)
+        elif change.is_staged():
+            to_unstage.extend(change.paths())
+    unstage_paths(to_unstage, root)
+    stage_paths(to_stage, root, on_progress=on_progress)
+    return _run_git(["commit", "-m", message], root).decode(errors="replace").strip()